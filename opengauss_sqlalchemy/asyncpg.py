@@ -10,6 +10,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import collections
 import decimal
 import json as _py_json
@@ -24,19 +25,53 @@ from sqlalchemy.dialects.postgresql.base import *
 from sqlalchemy.dialects.postgresql.types import *
 from sqlalchemy.dialects.postgresql.asyncpg import *
 
+import numpy as np
 from sqlalchemy import exc, pool, util
 
 from sqlalchemy.engine import AdaptedConnection, processors
 from sqlalchemy.sql import sqltypes
-from sqlalchemy.util.concurrency import asyncio, await_fallback, await_only
+from sqlalchemy.util.concurrency import await_only
 
-from opengauss_sqlalchemy.base import OpenGaussIdentifierPreparer, OpenGaussCompiler
+from opengauss_sqlalchemy.base import OpenGaussExecutionContext, OpenGaussIdentifierPreparer, OpenGaussCompiler
+from opengauss_sqlalchemy.parallel import _DONE, _Failure, _vector_text_statement
+from opengauss_sqlalchemy.register_async import _vector_types
+from opengauss_sqlalchemy.utils import Bit, Vector
 
 if TYPE_CHECKING:
     from typing import Iterable
 
 
-class OpenGaussExecutionContext_asyncpg(PGExecutionContext_asyncpg):
+_VECTOR_TYPES_QUERY = (
+    "SELECT t.typname, t.oid FROM pg_catalog.pg_type t "
+    "JOIN pg_catalog.pg_namespace n ON n.oid = t.typnamespace "
+    "WHERE n.nspname = 'pg_catalog' AND t.typname = ANY($1::text[])"
+)
+
+
+def _type_cache_connection_class(asyncpg, type_cache):
+    if not hasattr(asyncpg.Connection, "_introspect_type"):
+        # a private method of asyncpg, the types are looked up by each
+        # connection without it
+        return None
+
+    class Connection(asyncpg.Connection):
+        """asyncpg connection looking up the types of set_type_codec in the
+        ``type_cache`` shared by the connections of an engine.
+
+        The cache lives as long as the dialect, its vector types are checked
+        against the OIDs of the server on each connect.
+        """
+
+        async def _introspect_type(self, typename, schema):
+            key = (typename, schema)
+            if key not in type_cache:
+                type_cache[key] = await super(Connection, self)._introspect_type(typename, schema)
+            return type_cache[key]
+
+    return Connection
+
+
+class OpenGaussExecutionContext_asyncpg(OpenGaussExecutionContext, PGExecutionContext_asyncpg):
     pass
 
 class OpenGaussCompiler_asyncpg(OpenGaussCompiler):
@@ -61,8 +96,120 @@ class OpenGaussDialect_asyncpg(PGDialect_asyncpg):
     statement_compiler = OpenGaussCompiler_asyncpg
     preparer = OpenGaussIdentifierPreparer_asyncpg
 
+    def __init__(self, register_vector_codecs=True, **kwargs):
+        super().__init__(**kwargs)
+        self.register_vector_codecs = register_vector_codecs
+        # vector types of the server, and asyncpg type records shared by
+        # the connections of an engine
+        self._vector_types = None
+        self._type_cache = {}
+        self._connection_class = None
+
     def _get_server_version_info(self, connection):
         # most of opengauss features are same with postgres 9.2.4
         return (9, 2, 4)
 
+    def connect(self, *cargs, **cparams):
+        if self.register_vector_codecs and "async_creator_fn" not in cparams:
+            if self._connection_class is None:
+                self._connection_class = _type_cache_connection_class(self.loaded_dbapi.asyncpg, self._type_cache)
+            if self._connection_class:
+                cparams.setdefault("connection_class", self._connection_class)
+        return super().connect(*cargs, **cparams)
+
+    async def setup_asyncpg_vector_codecs(self, conn):
+        """set up the binary VECTOR / HALFVEC / SPARSEVEC / BIT codecs for
+        asyncpg, for the vector types of the server.
+        """
+        asyncpg_connection = conn._connection
+        # one query instead of the introspection of each type, which also
+        # finds the types dropped and created again since the last connect
+        oids = dict(tuple(row) for row in await asyncpg_connection.fetch(_VECTOR_TYPES_QUERY, list(_vector_types)))
+        self._vector_types = frozenset(oids)
+        for key, info in list(self._type_cache.items()):
+            if key[0] in _vector_types and oids.get(key[0]) != info["oid"]:
+                self._type_cache.pop(key, None)
+
+        codecs = [(typename, _vector_types[typename]) for typename in _vector_types if typename in self._vector_types]
+        for typename, cls in codecs + [("bit", Bit)]:
+            await asyncpg_connection.set_type_codec(
+                typename,
+                schema="pg_catalog",
+                encoder=cls._to_db_binary,
+                decoder=cls._from_db_binary,
+                format="binary",
+            )
+
+    def on_connect(self):
+        super_connect = super().on_connect()
+        if not self.register_vector_codecs:
+            return super_connect
+
+        def connect(conn):
+            if super_connect is not None:
+                super_connect(conn)
+            await_only(self.setup_asyncpg_vector_codecs(conn))
+
+        return connect
+
+
+async def stream_vectors(connection, statement, batch_size=1000, max_buffered=2, executor=None):
+    """Stream the ``(id, vector)`` rows selected by ``statement`` on the
+    AsyncConnection ``connection`` as ``(ids, matrix)`` batches of up to
+    ``batch_size`` rows, ``matrix`` being a ``(n, dim)`` float32 ndarray::
+
+        stmt = select(tbl.c.id, tbl.c.embedding).where(tbl.c.updated > since)
+        async for ids, matrix in stream_vectors(conn, stmt, batch_size=5000):
+            ...
+
+    The vectors are fetched as text with a server side cursor and each
+    batch is decoded at once on ``executor`` (the default executor of the
+    loop if None), so the event loop isn't blocked by the decoding. The
+    next batches are fetched while one is decoded, up to ``max_buffered``
+    batches ahead of the consumer. NULL vectors are rows of NaN. The
+    connection isn't available for other statements until the stream is
+    exhausted or closed.
+    """
+    statement, dim = _vector_text_statement(statement)
+    statement = statement.execution_options(yield_per=batch_size)
+    loop = asyncio.get_running_loop()
+    buffer = asyncio.Queue(max_buffered)
+
+    def decode(rows):
+        ids, texts = zip(*rows)
+        return np.asarray(ids), Vector._from_db_rows(texts, dim)
+
+    async def fetch():
+        try:
+            # the server side cursor is closed on cancel too
+            async with connection.stream(statement) as result:
+                async for rows in result.partitions(batch_size):
+                    await buffer.put(loop.run_in_executor(executor, decode, rows))
+        except Exception as error:
+            await buffer.put(_Failure(error))
+        else:
+            await buffer.put(_DONE)
+
+    fetcher = asyncio.ensure_future(fetch())
+    try:
+        while True:
+            item = await buffer.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                raise item.error
+            yield await item
+    finally:
+        fetcher.cancel()
+        await asyncio.gather(fetcher, return_exceptions=True)
+        # the decodings of the batches left in the queue
+        pending = []
+        while not buffer.empty():
+            item = buffer.get_nowait()
+            if isinstance(item, asyncio.Future):
+                item.cancel()
+                pending.append(item)
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
 dialect = OpenGaussDialect_asyncpg
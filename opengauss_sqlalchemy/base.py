@@ -7,10 +7,19 @@
 # This module is part of SQLAlchemy and is released under
 # the MIT License: https://www.opensource.org/licenses/mit-license.php
 
+import collections
+import decimal
+import itertools
+import re
+import weakref
+
 from sqlalchemy.dialects.postgresql.base import IDX_USING, PGCompiler, PGDDLCompiler, PGIdentifierPreparer
+from sqlalchemy.dialects.postgresql.base import PGExecutionContext
+from sqlalchemy.engine.cursor import BufferedRowCursorFetchStrategy
 from sqlalchemy.dialects.postgresql.base import RESERVED_WORDS as _RESERVED_WORDS
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.sql import coercions, expression, roles, elements
-from sqlalchemy import types
+from sqlalchemy import exc, types, util
 
 
 _distributable_types = (
@@ -50,11 +59,223 @@ RESERVED_WORDS = _RESERVED_WORDS.union(
     ]
 )
 
+_GUC_NAME = re.compile(r"^[a-z_][a-z0-9_]*(\.[a-z_][a-z0-9_]*)?$", re.I)
+
+# execution options for vector index scans, see opengauss_sqlalchemy.search
+_search_settings = {
+    "opengauss_ef_search": "hnsw_ef_search",
+    "opengauss_probes": "ivfflat_probes",
+}
+
+
+def _render_setting_value(value):
+    if isinstance(value, bool):
+        return "on" if value else "off"
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return str(value)
+    return "'%s'" % str(value).replace("'", "''")
+
+
+def _row_bytes(row):
+    # approximate size of a fetched row, before the result processing
+    size = 16
+    for value in row:
+        if isinstance(value, (str, bytes, bytearray, memoryview)):
+            size += len(value)
+        else:
+            size += getattr(value, "nbytes", 8)
+    return size
+
+
+class AdaptiveBufferedRowCursorFetchStrategy(BufferedRowCursorFetchStrategy):
+    """Rows of a server side cursor fetched in batches holding about
+    ``max_buffer_bytes``, sized after the average size of the rows fetched
+    so far, at most ``max_row_buffer`` rows if given.
+    """
+
+    __slots__ = ("_max_buffer_bytes", "_average_row_bytes")
+
+    # rows of a batch whose size is measured
+    _sample_rows = 32
+
+    def __init__(self, dbapi_cursor, execution_options):
+        self._max_buffer_bytes = execution_options["max_buffer_bytes"]
+        self._average_row_bytes = None
+        super(AdaptiveBufferedRowCursorFetchStrategy, self).__init__(dbapi_cursor, execution_options)
+        self._max_row_buffer = execution_options.get("max_row_buffer")
+        self._resize(self._rowbuffer)
+
+    def _resize(self, rows):
+        if not rows or self._max_buffer_bytes is None:
+            return
+        sample = list(itertools.islice(rows, 0, None, max(1, len(rows) // self._sample_rows)))
+        row_bytes = sum(_row_bytes(row) for row in sample) / float(len(sample))
+        if self._average_row_bytes is not None:
+            row_bytes = 0.5 * self._average_row_bytes + 0.5 * row_bytes
+        self._average_row_bytes = row_bytes
+        size = max(1, int(self._max_buffer_bytes // row_bytes))
+        if self._max_row_buffer:
+            size = min(size, self._max_row_buffer)
+        self._bufsize = size
+
+    def _buffer_rows(self, result, dbapi_cursor):
+        try:
+            new_rows = dbapi_cursor.fetchmany(self._bufsize)
+        except BaseException as e:
+            self.handle_exception(result, dbapi_cursor, e)
+
+        if not new_rows:
+            return
+        self._rowbuffer = collections.deque(new_rows)
+        self._resize(new_rows)
+
+    def yield_per(self, result, dbapi_cursor, num):
+        # a fixed batch size
+        self._max_buffer_bytes = None
+        super(AdaptiveBufferedRowCursorFetchStrategy, self).yield_per(result, dbapi_cursor, num)
+
+
+class OpenGaussExecutionContext(PGExecutionContext):
+    def pre_exec(self):
+        super(OpenGaussExecutionContext, self).pre_exec()
+
+        settings = dict(self.execution_options.get("opengauss_settings") or {})
+        for option, name in _search_settings.items():
+            if self.execution_options.get(option) is not None:
+                settings[name] = self.execution_options[option]
+        if settings:
+            self._set_local_settings(settings)
+
+        self._restore_settings = None
+        if self.isddl and isinstance(self.compiled.statement, CreateIndex):
+            build_settings = self.compiled.statement.element.dialect_options["opengauss"]["build_settings"]
+            if build_settings:
+                self._restore_settings = self._set_local_settings(build_settings, save_previous=True)
+
+    def post_exec(self):
+        super(OpenGaussExecutionContext, self).post_exec()
+
+        if self._is_server_side and self.execution_options.get("max_buffer_bytes"):
+            # Support fetch batches sized to a memory budget when streaming.
+            # Usage: `conn.execution_options(stream_results=True, max_buffer_bytes=4 * 1024 * 1024)`
+            self.cursor_fetch_strategy = AdaptiveBufferedRowCursorFetchStrategy(self.cursor, self.execution_options)
+
+        if self._restore_settings:
+            self._restore_local_settings(self._restore_settings)
+
+    def _local_settings(self):
+        """Return the settings applied with ``SET LOCAL`` in the current
+        transaction or savepoint, tracked on the pooled connection.
+
+        ``SET LOCAL`` is reverted by the server on commit / rollback, which
+        includes the reset of a connection returned to the pool, so the
+        tracked settings are discarded together with the transaction.
+        """
+        connection = self.root_connection
+        transaction = connection.get_nested_transaction() or connection.get_transaction()
+        info = connection.connection.info
+        applied_in, applied = info.get("opengauss_settings", (None, None))
+        if applied_in is None or applied_in() is not transaction:
+            applied = {}
+            info["opengauss_settings"] = (weakref.ref(transaction), applied)
+        return applied
+
+    def _set_local_settings(self, settings, save_previous=False):
+        """Emit ``SET LOCAL`` for the settings not yet applied in the current
+        transaction and, with ``save_previous``, return the previous values of
+        the changed ones for :meth:`_restore_local_settings`.
+        """
+        if getattr(self._dbapi_connection, "autocommit", False):
+            util.warn(
+                "opengauss settings are ignored in AUTOCOMMIT mode, "
+                "SET LOCAL requires a transaction block"
+            )
+            return None
+
+        applied = self._local_settings()
+        changed = []
+        for name, value in settings.items():
+            if not _GUC_NAME.match(name):
+                raise exc.ArgumentError("Invalid setting name %r" % name)
+            value = _render_setting_value(value)
+            if applied.get(name) != value:
+                changed.append((name, value))
+        previous = None
+        if save_previous and changed:
+            # the values set by the user with a plain SET, or the server
+            # defaults, are read back so that they are not lost by the restore
+            previous = [
+                (name, applied[name], None) if name in applied else (name, None, self._current_setting(name))
+                for name, _ in changed
+            ]
+        self._execute_local_settings(changed)
+        return previous
+
+    def _current_setting(self, name):
+        statement = "SELECT current_setting('%s')" % name
+        return self._run_settings_statement(statement, fetch=True)
+
+    def _restore_local_settings(self, previous):
+        """Restore the settings saved by :meth:`_set_local_settings`."""
+        applied = self._local_settings()
+        tracked = []
+        for name, value, current in previous:
+            if value is not None:
+                tracked.append((name, value))
+                continue
+            # set_config() parses the value as the server rendered it,
+            # including list settings such as search_path
+            self._run_settings_statement(
+                "SELECT set_config('%s', '%s', true)" % (name, current.replace("'", "''"))
+            )
+            applied.pop(name, None)
+        self._execute_local_settings(tracked)
+
+    def _run_settings_statement(self, statement, fetch=False):
+        connection = self.root_connection
+        cursor = self._dbapi_connection.cursor()
+        try:
+            if connection._echo:
+                connection._log_info(statement)
+            try:
+                cursor.execute(statement)
+                if fetch:
+                    return cursor.fetchone()[0]
+            except Exception as e:
+                connection._handle_dbapi_exception(e, statement, {}, cursor, self)
+        finally:
+            cursor.close()
+
+    def _execute_local_settings(self, settings):
+        if not settings:
+            return
+
+        applied = self._local_settings()
+        for name, value in settings:
+            self._run_settings_statement("SET LOCAL %s = %s" % (name, value))
+            applied[name] = value
+
 
 class OpenGaussCompiler(PGCompiler):
     def get_cte_preamble(self, recursive):
         return "WITH RECURSIVE"
 
+    def visit_select(self, select_stmt, **kw):
+        toplevel = not self.stack
+        text = super(OpenGaussCompiler, self).visit_select(select_stmt, **kw)
+        if toplevel and getattr(self.dialect, "colocation_check", None) is not None:
+            # checked once per compiled statement, on the statement of the
+            # compile state in which the ORM entities are resolved to tables
+            self.dialect._check_colocation(getattr(self.compile_state, "statement", select_stmt))
+        return text
+
+    def format_from_hint_text(self, sqltext, table, hint, iscrud):
+        # Support reading one partition of a table.
+        # Usage: `select(tbl).with_hint(tbl, "PARTITION (p1)", "opengauss")`
+        if hint.upper().startswith("PARTITION"):
+            return "%s %s" % (sqltext, hint)
+        return super(OpenGaussCompiler, self).format_from_hint_text(sqltext, table, hint, iscrud)
+
     def visit_on_conflict_do_nothing(self, on_conflict, **kw):
         return "ON DUPLICATE KEY UPDATE NOTHING"
 
@@ -260,11 +481,15 @@ class OpenGaussDDLCompiler(PGDDLCompiler):
             )
 
         if self.dialect._supports_table_distribute_by:
-            if gauss_opts["distribute_by"]:
+            distribute_by = gauss_opts["distribute_by"]
+            if distribute_by:
                 # Support DISTRIBUTE BY in distributed opengauss.
                 # Usage: `Table("some_table", opengauss_distribute_by='HASH(column_name)')`
+                # or `Table("some_table", opengauss_distribute_by=DistributeByHash("column_name"))`
                 # See https://support.huaweicloud.com/devg-opengauss/opengauss_devg_0402.html
-                table_opts.append("\n DISTRIBUTE BY %s" % gauss_opts["distribute_by"])
+                if not isinstance(distribute_by, str):
+                    distribute_by = distribute_by.render(self, table)
+                table_opts.append("\n DISTRIBUTE BY %s" % distribute_by)
             else:
                 for col in table.columns:
                     if isinstance(col.type, _distributable_types) and str(col.type) not in _undistributable_types:
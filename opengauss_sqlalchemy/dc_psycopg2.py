@@ -7,8 +7,52 @@
 # This module is part of SQLAlchemy and is released under
 # the MIT License: https://www.opensource.org/licenses/mit-license.php
 
+import threading
+import time
+import weakref
+
+from sqlalchemy import exc, text, util
+
+from opengauss_sqlalchemy.distribution import (
+    _from_table, analyze_colocation, DistributeByHash, DistributeByReplication
+)
 from opengauss_sqlalchemy.psycopg2 import OpenGaussDialect_psycopg2
 
+_DISTRIBUTION_QUERY = text(
+    "SELECT c.relname, x.pclocatortype, "
+    "ARRAY(SELECT a.attname FROM generate_series(array_lower(x.pcattnum, 1), array_upper(x.pcattnum, 1)) AS i "
+    "JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum = x.pcattnum[i] ORDER BY i) AS columns "
+    "FROM pgxc_class x JOIN pg_class c ON c.oid = x.pcrelid "
+    "JOIN pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = :schema"
+)
+
+
+class _Coordinator(object):
+    __slots__ = ("host", "port", "connections", "connects", "failures", "available_at")
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self.connects = 0
+        self.failures = 0
+        self.available_at = 0.0
+
+
+def _check_coordinators(dialect_ref, interval):
+    # runs while the dialect has open connections, i.e. until the engine is
+    # disposed of or garbage collected, started again by the next connect
+    while True:
+        time.sleep(interval)
+        dialect = dialect_ref()
+        if dialect is None or not dialect._keep_checking():
+            return
+        try:
+            dialect.check_coordinators()
+        except Exception as error:
+            util.warn("Checking the coordinators failed: %s" % error)
+        del dialect
+
 
 class OpenGaussDialect_dc_psycopg2(OpenGaussDialect_psycopg2):
     name = "opengauss"
@@ -20,5 +64,215 @@ class OpenGaussDialect_dc_psycopg2(OpenGaussDialect_psycopg2):
     _supports_drop_index_concurrently = False
     _supports_table_distribute_by = True
 
+    def __init__(self, load_balance=False, coordinator_backoff=1.0, coordinator_max_backoff=60.0,
+                 coordinator_check_interval=None, colocation_check=None, **kwargs):
+        OpenGaussDialect_psycopg2.__init__(self, **kwargs)
+        if colocation_check not in (None, "warn") and not callable(colocation_check):
+            raise exc.ArgumentError("colocation_check must be 'warn' or a callable, not %r" % (colocation_check,))
+        self.colocation_check = colocation_check
+        self.load_balance = load_balance
+        self.coordinator_backoff = coordinator_backoff
+        self.coordinator_max_backoff = coordinator_max_backoff
+        self.coordinator_check_interval = coordinator_check_interval
+        self._coordinators = None
+        self._connect_args = None
+        # the coordinator of each DBAPI connection, forgotten with it
+        self._coordinator_of = weakref.WeakKeyDictionary()
+        self._coordinator_lock = threading.Lock()
+        self._checker = None
+
+    def _init_coordinators(self, cparams):
+        hosts = cparams["host"].split(",")
+        ports = str(cparams.get("port") or "").split(",")
+        if len(ports) == 1:
+            ports = ports * len(hosts)
+        return [_Coordinator(host, port or None) for host, port in zip(hosts, ports)]
+
+    def _pick_coordinators(self):
+        # the available CNs with the fewest open connections first, then
+        # the ones still backing off, soonest available first
+        now = time.monotonic()
+        with self._coordinator_lock:
+            available = [c for c in self._coordinators if c.available_at <= now]
+            backing_off = [c for c in self._coordinators if c.available_at > now]
+            available.sort(key=lambda c: (c.connections, c.connects))
+            backing_off.sort(key=lambda c: c.available_at)
+            return available + backing_off
+
+    def _coordinator_failed(self, coordinator):
+        with self._coordinator_lock:
+            coordinator.failures += 1
+            backoff = min(
+                self.coordinator_backoff * 2 ** (coordinator.failures - 1), self.coordinator_max_backoff
+            )
+            coordinator.available_at = time.monotonic() + backoff
+
+    def _coordinator_up(self, coordinator):
+        with self._coordinator_lock:
+            coordinator.failures = 0
+            coordinator.available_at = 0.0
+
+    @staticmethod
+    def _coordinator_params(coordinator, cparams):
+        params = dict(cparams, host=coordinator.host)
+        if coordinator.port:
+            params["port"] = coordinator.port
+        else:
+            params.pop("port", None)
+        return params
+
+    def connect(self, *cargs, **cparams):
+        """Connect to one of the coordinators of a multi-host URL with
+        ``load_balance``, spreading the pooled connections over them.
+
+        A coordinator failing to connect, or whose connection is lost, is
+        skipped for ``coordinator_backoff`` seconds, doubled on each
+        consecutive failure up to ``coordinator_max_backoff``. With
+        ``coordinator_check_interval``, the coordinators are also probed by
+        :meth:`check_coordinators` on a background thread at that interval,
+        while the dialect has open connections.
+        """
+        if not self.load_balance or "," not in cparams.get("host", ""):
+            return OpenGaussDialect_psycopg2.connect(self, *cargs, **cparams)
+
+        if self._coordinators is None:
+            with self._coordinator_lock:
+                if self._coordinators is None:
+                    self._connect_args = (cargs, cparams)
+                    self._coordinators = self._init_coordinators(cparams)
+        if self.coordinator_check_interval:
+            self._start_checker()
+        error = None
+        for coordinator in self._pick_coordinators():
+            try:
+                dbapi_connection = OpenGaussDialect_psycopg2.connect(
+                    self, *cargs, **self._coordinator_params(coordinator, cparams)
+                )
+            except self.loaded_dbapi.OperationalError as err:
+                self._coordinator_failed(coordinator)
+                error = err
+                continue
+            self._coordinator_up(coordinator)
+            with self._coordinator_lock:
+                coordinator.connections += 1
+                coordinator.connects += 1
+                self._coordinator_of[dbapi_connection] = coordinator
+            return dbapi_connection
+        raise error
+
+    def _start_checker(self):
+        with self._coordinator_lock:
+            if self._checker is None:
+                self._checker = threading.Thread(
+                    target=_check_coordinators,
+                    args=(weakref.ref(self), self.coordinator_check_interval),
+                    name="opengauss-coordinator-check",
+                    daemon=True,
+                )
+                self._checker.start()
+
+    def _keep_checking(self):
+        with self._coordinator_lock:
+            if any(c.connections for c in self._coordinators):
+                return True
+            # no connection left, e.g. after engine.dispose()
+            self._checker = None
+            return False
+
+    def _probe(self, coordinator):
+        cargs, cparams = self._connect_args
+        params = self._coordinator_params(coordinator, cparams)
+        # a coordinator not answering in time is down for the check
+        params.setdefault("connect_timeout", 5)
+        try:
+            dbapi_connection = OpenGaussDialect_psycopg2.connect(self, *cargs, **params)
+            try:
+                cursor = dbapi_connection.cursor()
+                cursor.execute("SELECT 1")
+                cursor.close()
+            finally:
+                dbapi_connection.close()
+        except self.loaded_dbapi.Error:
+            return False
+        return True
+
+    def check_coordinators(self):
+        """Probe each coordinator with a new connection running ``SELECT 1``,
+        making the ones answering available at once and backing off from the
+        others, and return :meth:`coordinator_stats`.
+        """
+        for coordinator in list(self._coordinators or ()):
+            if self._probe(coordinator):
+                self._coordinator_up(coordinator)
+            else:
+                self._coordinator_failed(coordinator)
+        return self.coordinator_stats()
+
+    def do_close(self, dbapi_connection):
+        with self._coordinator_lock:
+            coordinator = self._coordinator_of.pop(dbapi_connection, None)
+            if coordinator is not None:
+                coordinator.connections -= 1
+        OpenGaussDialect_psycopg2.do_close(self, dbapi_connection)
+
+    def is_disconnect(self, e, connection, cursor):
+        disconnect = OpenGaussDialect_psycopg2.is_disconnect(self, e, connection, cursor)
+        if disconnect and connection is not None:
+            coordinator = self._coordinator_of.get(connection)
+            if coordinator is not None:
+                self._coordinator_failed(coordinator)
+        return disconnect
+
+    def coordinator_stats(self):
+        """Return the open connections, the successful connects and the
+        consecutive failures of each coordinator, and whether it is
+        available or backing off.
+        """
+        now = time.monotonic()
+        with self._coordinator_lock:
+            return [
+                {
+                    "host": c.host,
+                    "port": c.port,
+                    "connections": c.connections,
+                    "connects": c.connects,
+                    "failures": c.failures,
+                    "available": c.available_at <= now,
+                }
+                for c in self._coordinators or ()
+            ]
+
+    def _check_colocation(self, statement):
+        """Warn, or call ``colocation_check``, for each join of a compiled
+        SELECT whose tables aren't co-located.
+        """
+        for join in analyze_colocation(statement):
+            if self.colocation_check == "warn":
+                util.warn(
+                    "Join of %s and %s is not co-located, %s; the rows are redistributed between the datanodes"
+                    % (_from_table(join.left).name, _from_table(join.right).name, join.reason)
+                )
+            else:
+                self.colocation_check(join)
+
+    def get_multi_table_options(self, connection, schema, filter_names, scope, kind, **kw):
+        # HASH and REPLICATION distributions of the tables, reflected as
+        # opengauss_distribute_by
+        table_options = dict(
+            super(OpenGaussDialect_dc_psycopg2, self).get_multi_table_options(
+                connection, schema, filter_names, scope, kind, **kw
+            )
+        )
+        rows = connection.execute(_DISTRIBUTION_QUERY, {"schema": schema or self.default_schema_name})
+        for relname, locator_type, columns in rows:
+            options = table_options.get((schema, relname))
+            if options is None:
+                continue
+            if locator_type == "H":
+                options["opengauss_distribute_by"] = DistributeByHash(*columns)
+            elif locator_type == "R":
+                options["opengauss_distribute_by"] = DistributeByReplication()
+        return table_options.items()
+
 
 dialect = OpenGaussDialect_dc_psycopg2
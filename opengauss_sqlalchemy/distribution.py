@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2005-2022 the SQLAlchemy authors and contributors
+# <see AUTHORS file>
+#
+# Copyright (C) 2025-2025 Huawei Technologies Co.,Ltd.
+#
+# This module is part of SQLAlchemy and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+import abc
+import collections
+import re
+
+from sqlalchemy import column, func, literal_column, select, Table, tablesample, text
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.elements import BinaryExpression, ColumnClause
+
+from opengauss_sqlalchemy.base import _distributable_types, _undistributable_types
+
+
+class _Keyword(object):
+    def __init__(self, keyword):
+        self.keyword = keyword
+
+    def __repr__(self):
+        return self.keyword
+
+
+MAXVALUE = _Keyword("MAXVALUE")
+DEFAULT = _Keyword("DEFAULT")
+
+
+class DistributeBy(abc.ABC):
+    """Typed ``opengauss_distribute_by`` of a Table, rendered by the DDL
+    compiler of distributed openGauss.
+    """
+
+    kind = None
+
+    def __init__(self, *columns):
+        self.columns = columns
+
+    def _column_names(self, table):
+        return [c if isinstance(c, str) else c.name for c in self.columns]
+
+    def _render_columns(self, compiler, table):
+        return ", ".join(compiler.preparer.quote(name) for name in self._column_names(table))
+
+    def _render_value(self, compiler, table, value, name):
+        if isinstance(value, _Keyword):
+            return value.keyword
+        return compiler.sql_compiler.render_literal_value(value, table.c[name].type)
+
+    def _render_values(self, compiler, table, values):
+        if not isinstance(values, (list, tuple)):
+            values = (values,)
+        names = self._column_names(table)
+        return ", ".join(
+            self._render_value(compiler, table, value, names[i % len(names)]) for i, value in enumerate(values)
+        )
+
+    @abc.abstractmethod
+    def render(self, compiler, table):
+        """Return the clause following ``DISTRIBUTE BY``."""
+
+
+class DistributeByHash(DistributeBy):
+    """``DISTRIBUTE BY HASH(columns)``."""
+
+    kind = "hash"
+
+    def render(self, compiler, table):
+        return "HASH(%s)" % self._render_columns(compiler, table)
+
+
+class DistributeByReplication(DistributeBy):
+    """``DISTRIBUTE BY REPLICATION``."""
+
+    kind = "replication"
+
+    def render(self, compiler, table):
+        return "REPLICATION"
+
+
+class DistributeByRange(DistributeBy):
+    """``DISTRIBUTE BY RANGE(columns)`` with ``slices`` of ``(name, upper
+    bound)``, the last bound usually being MAXVALUE::
+
+        DistributeByRange("id", slices=[("s1", 1000), ("s2", MAXVALUE)])
+    """
+
+    kind = "range"
+
+    def __init__(self, *columns, slices=()):
+        super(DistributeByRange, self).__init__(*columns)
+        self.slices = list(slices)
+
+    def render(self, compiler, table):
+        return "RANGE(%s) (%s)" % (
+            self._render_columns(compiler, table),
+            ", ".join(
+                "SLICE %s VALUES LESS THAN (%s)" % (
+                    compiler.preparer.quote(name), self._render_values(compiler, table, bound)
+                )
+                for name, bound in self.slices
+            ),
+        )
+
+
+class DistributeByList(DistributeBy):
+    """``DISTRIBUTE BY LIST(column)`` with ``slices`` of ``(name, values)``,
+    the last values usually being DEFAULT::
+
+        DistributeByList("region", slices=[("s1", ["north", "east"]), ("s2", DEFAULT)])
+    """
+
+    kind = "list"
+
+    def __init__(self, *columns, slices=()):
+        super(DistributeByList, self).__init__(*columns)
+        self.slices = list(slices)
+
+    def render(self, compiler, table):
+        return "LIST(%s) (%s)" % (
+            self._render_columns(compiler, table),
+            ", ".join(
+                "SLICE %s VALUES (%s)" % (compiler.preparer.quote(name), self._render_values(compiler, table, values))
+                for name, values in self.slices
+            ),
+        )
+
+
+DistributionCandidate = collections.namedtuple(
+    "DistributionCandidate", ["column", "skew", "distinct_ratio", "join_column", "score"]
+)
+
+SkewReport = collections.namedtuple("SkewReport", ["table", "rows", "skew", "datanode_rows"])
+
+
+def _skew(counts, datanodes):
+    """Return how much the largest datanode exceeds the mean, 0 for an even
+    distribution.
+    """
+    total = sum(counts)
+    if not total:
+        return 0.0
+    mean = total / float(max(datanodes, len(counts)))
+    return max(counts) / mean - 1
+
+
+def _datanode_count(connection):
+    return connection.execute(text("SELECT count(*) FROM pgxc_node WHERE node_type = 'D'")).scalar()
+
+
+def _hash_distribution(connection, table, col, sample_rows):
+    # rows per datanode if table was distributed by HASH(col)
+    rows = connection.execute(
+        select(literal_column("num")).select_from(
+            func.table_skewness(table.fullname, col.name, sample_rows).table_valued(column("num"))
+        )
+    )
+    return [int(num) for num, in rows]
+
+
+def _sample_percent(connection, table, sample_rows):
+    # from the row count estimated by the last ANALYZE, the table isn't counted
+    rows = connection.execute(
+        text("SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+        {"table": connection.dialect.identifier_preparer.format_table(table)},
+    ).scalar()
+    if not rows or rows <= sample_rows:
+        return None
+    return 100.0 * sample_rows / rows
+
+
+def _distinct_ratio(connection, col, sample_rows):
+    # rows sampled at random with TABLESAMPLE BERNOULLI, not the first rows
+    # of a table clustered on col, which have fewer distinct values than the
+    # table, nor a sort of the whole table
+    percent = _sample_percent(connection, col.table, sample_rows)
+    if percent is not None:
+        col = tablesample(col.table, func.bernoulli(percent), name="sample").c[col.name]
+    sample = select(col.label("value")).limit(sample_rows).subquery()
+    distinct, total = connection.execute(
+        select(func.count(sample.c.value.distinct()), func.count())
+    ).one()
+    return distinct / float(total) if total else 0.0
+
+
+def _join_columns(table):
+    # foreign key columns, and columns referenced by the foreign keys of
+    # the other tables of the MetaData
+    join_columns = set(fk.parent for fk in table.foreign_keys)
+    for other in table.metadata.tables.values():
+        for fk in other.foreign_keys:
+            if fk.column.table is table:
+                join_columns.add(fk.column)
+    return join_columns
+
+
+def _distributable(col):
+    return isinstance(col.type, _distributable_types) and str(col.type) not in _undistributable_types
+
+
+def advise_distribution(connection, table, columns=None, sample_rows=100000, replication_rows=None,
+                        join_weight=0.1):
+    """Return the DistributionCandidate of each of ``columns`` of ``table``,
+    best first, and the recommended DistributeBy.
+
+    The candidates default to the primary key, the foreign key columns and
+    the columns referenced by foreign keys in the MetaData. The skew of each
+    is estimated on ``sample_rows`` rows with ``table_skewness()``, columns
+    with few distinct values in about ``sample_rows`` rows sampled with
+    ``TABLESAMPLE BERNOULLI`` are penalized, and join columns, which avoid
+    redistributing rows for the joins, get a bonus of ``join_weight``.
+    Tables of at most ``replication_rows`` rows are recommended REPLICATION.
+    """
+    join_columns = _join_columns(table)
+    if columns is None:
+        columns = [c for c in table.columns if (c.primary_key or c in join_columns) and _distributable(c)]
+    else:
+        columns = [table.c[c] if isinstance(c, str) else c for c in columns]
+
+    if replication_rows is not None:
+        rows = connection.execute(select(func.count()).select_from(table)).scalar()
+        if rows <= replication_rows:
+            return [], DistributeByReplication()
+
+    datanodes = _datanode_count(connection)
+    results = []
+    for col in columns:
+        skew = _skew(_hash_distribution(connection, table, col, sample_rows), datanodes)
+        distinct_ratio = _distinct_ratio(connection, col, sample_rows)
+        join_column = col in join_columns
+        score = skew + (1 - distinct_ratio) - (join_weight if join_column else 0)
+        results.append(DistributionCandidate(col, skew, distinct_ratio, join_column, score))
+    results.sort(key=lambda candidate: candidate.score)
+    if not results:
+        return results, DistributeByReplication()
+    return results, DistributeByHash(results[0].column.name)
+
+
+def check_skew(connection, tables, threshold=0.2):
+    """Return a SkewReport for each of the distributed ``tables`` whose
+    largest datanode holds more than ``threshold`` rows over the mean.
+    """
+    datanodes = _datanode_count(connection)
+    reports = []
+    for table in tables:
+        node_id = column("xc_node_id")
+        counts = [
+            count for _, count in connection.execute(
+                select(node_id, func.count()).select_from(table).group_by(node_id)
+            )
+        ]
+        skew = _skew(counts, datanodes)
+        if skew > threshold:
+            reports.append(SkewReport(table, sum(counts), skew, counts))
+    return reports
+
+
+NonColocatedJoin = collections.namedtuple("NonColocatedJoin", ["left", "right", "pairs", "reason"])
+
+_DISTRIBUTE_BY_RE = re.compile(r"\s*(\w+)\s*(?:\(([^)]*)\))?", re.I)
+
+
+def _from_table(from_):
+    # the Table of a table or of an alias of it, None for a subquery
+    while not isinstance(from_, Table):
+        from_ = getattr(from_, "element", None)
+        if from_ is None:
+            return None
+    return from_
+
+
+def _distribution(table):
+    """Return the kind, the columns and the slices of the typed or textual
+    ``opengauss_distribute_by`` of ``table``, None if it has none.
+    """
+    distribute_by = table.kwargs.get("opengauss_distribute_by")
+    if distribute_by is None:
+        return None
+    if isinstance(distribute_by, str):
+        match = _DISTRIBUTE_BY_RE.match(distribute_by)
+        if match is None:
+            return None
+        columns = match.group(2)
+        columns = tuple(c.strip().strip('"') for c in columns.split(",")) if columns else ()
+        return match.group(1).lower(), columns, None
+    return distribute_by.kind, tuple(distribute_by._column_names(table)), getattr(distribute_by, "slices", None)
+
+
+def _render_distribution(distribution):
+    kind, columns, _ = distribution
+    if not columns:
+        return kind.upper()
+    return "%s(%s)" % (kind.upper(), ", ".join(columns))
+
+
+def _colocation_issue(left, left_distribution, right, right_distribution, pairs):
+    # why rows of left and right are redistributed to be joined on pairs,
+    # None if the join runs on each datanode
+    left_kind, left_columns, left_slices = left_distribution
+    right_kind, right_columns, right_slices = right_distribution
+    if "replication" in (left_kind, right_kind):
+        return None
+    if left.kwargs.get("opengauss_to") != right.kwargs.get("opengauss_to"):
+        return "the tables are in different node groups"
+    if (
+        left_kind != right_kind
+        or not left_columns
+        or len(left_columns) != len(right_columns)
+        or (left_kind != "hash" and (left_slices is None or left_slices != right_slices))
+    ):
+        return "the tables are distributed by %s and %s" % (
+            _render_distribution(left_distribution), _render_distribution(right_distribution)
+        )
+    joined = set((a.name, b.name) for a, b in pairs)
+    if all(key in joined for key in zip(left_columns, right_columns)):
+        return None
+    return "joined on %s, not on the distribution keys %s and %s" % (
+        ", ".join("%s = %s" % (a.name, b.name) for a, b in pairs),
+        _render_distribution(left_distribution),
+        _render_distribution(right_distribution),
+    )
+
+
+def analyze_colocation(statement):
+    """Return a NonColocatedJoin for each pair of tables joined by
+    ``statement`` that are not co-located, i.e. whose rows are
+    redistributed between the datanodes (Streaming operators) to be joined.
+
+    The equality conditions between the columns of two FROMs, in the ON
+    clauses as well as in the WHERE clauses, are checked against the
+    ``opengauss_distribute_by`` of the tables, typed or reflected. Joins
+    with a REPLICATION table are co-located, joins of tables without
+    ``opengauss_distribute_by`` are not checked.
+    """
+    groups = {}
+    seen = set()
+    for element in visitors.iterate(statement):
+        if (
+            not isinstance(element, BinaryExpression)
+            or element.operator is not operators.eq
+            or id(element) in seen
+        ):
+            continue
+        seen.add(id(element))
+        left, right = element.left, element.right
+        if not isinstance(left, ColumnClause) or not isinstance(right, ColumnClause):
+            continue
+        if left.table is None or right.table is None or left.table is right.table:
+            continue
+        key = (id(left.table), id(right.table))
+        if key not in groups and (key[1], key[0]) in groups:
+            key = (key[1], key[0])
+            left, right = right, left
+        groups.setdefault(key, (left.table, right.table, []))[2].append((left, right))
+
+    issues = []
+    for left, right, pairs in groups.values():
+        left_table, right_table = _from_table(left), _from_table(right)
+        if left_table is None or right_table is None:
+            continue
+        left_distribution, right_distribution = _distribution(left_table), _distribution(right_table)
+        if left_distribution is None or right_distribution is None:
+            continue
+        reason = _colocation_issue(left_table, left_distribution, right_table, right_distribution, pairs)
+        if reason is not None:
+            issues.append(NonColocatedJoin(left, right, pairs, reason))
+    return issues
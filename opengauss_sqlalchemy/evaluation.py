@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2005-2022 the SQLAlchemy authors and contributors
+# <see AUTHORS file>
+#
+# Copyright (C) 2025-2025 Huawei Technologies Co.,Ltd.
+#
+# This module is part of SQLAlchemy and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+import collections
+import time
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.sql import coercions, roles
+
+from opengauss_sqlalchemy.search import ann_select
+from opengauss_sqlalchemy.utils import top_k
+
+_BLOCK_BYTES = 1 << 25
+
+SweepResult = collections.namedtuple("SweepResult", ["label", "settings", "recall", "p50", "p99", "qps"])
+
+
+def fetch_dataset(connection, column, id_column=None, limit=None):
+    """Fetch ``(ids, matrix)`` from a vector column, ``ids`` defaulting to the
+    single primary key column of the table.
+    """
+    if id_column is None:
+        id_column, = column.table.primary_key.columns
+    stmt = select(coercions.expect(roles.ColumnsClauseRole, id_column), column).order_by(id_column)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    rows = connection.execute(stmt).all()
+    if not rows:
+        return np.empty(0), np.empty((0, 0), dtype=np.float32)
+    ids, vectors = zip(*rows)
+    return np.asarray(ids), np.stack(vectors)
+
+
+def sample_queries(data, n, seed=None):
+    """Return ``n`` rows of ``data`` picked at random without replacement."""
+    data = np.asarray(data)
+    rng = np.random.default_rng(seed)
+    return data[rng.choice(len(data), size=min(n, len(data)), replace=False)]
+
+
+def _distances(data, queries, distance, data_norms):
+    products = queries @ data.T
+    if distance == "l2_distance":
+        squared = data_norms[np.newaxis, :] - 2 * products + np.einsum("ij,ij->i", queries, queries)[:, np.newaxis]
+        return np.sqrt(np.maximum(squared, 0))
+    if distance == "cosine_distance":
+        query_norms = np.linalg.norm(queries, axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return 1 - products / (query_norms[:, np.newaxis] * data_norms[np.newaxis, :])
+    # negative inner product, as the <#> operator
+    return -products
+
+
+def exact_top_k(data, queries, k, distance="l2_distance", ids=None):
+    """Return the exact ``(ids, distances)`` of the ``k`` nearest rows of
+    ``data`` for each of ``queries``, both of shape ``(len(queries), k)``.
+
+    ``distance`` is ``l2_distance``, ``cosine_distance`` or
+    ``max_inner_product``. The distances are computed with matrix products
+    over blocks of queries, ``ids`` default to the row indices of ``data``.
+    """
+    if distance not in ("l2_distance", "cosine_distance", "max_inner_product"):
+        raise ValueError("unsupported distance %r" % distance)
+    data = np.asarray(data, dtype=np.float32)
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    if distance == "l2_distance":
+        data_norms = np.einsum("ij,ij->i", data, data)
+    elif distance == "cosine_distance":
+        data_norms = np.linalg.norm(data, axis=1)
+    else:
+        data_norms = None
+
+    # bound the (block, len(data)) distance matrix
+    block = max(1, _BLOCK_BYTES // (4 * max(len(data), 1)))
+    indices, distances = [], []
+    for start in range(0, len(queries), block):
+        block_indices, block_distances = top_k(_distances(data, queries[start:start + block], distance, data_norms), k)
+        indices.append(block_indices)
+        distances.append(block_distances)
+    indices = np.concatenate(indices) if indices else np.empty((0, k), dtype=np.intp)
+    distances = np.concatenate(distances) if distances else np.empty((0, k), dtype=np.float32)
+    if ids is not None:
+        indices = np.asarray(ids)[indices]
+    return indices, distances
+
+
+def recall_at_k(results, ground_truth, k):
+    """Return the mean fraction of the ``k`` true nearest ids found in the
+    first ``k`` ids of each result.
+    """
+    if not len(ground_truth):
+        return 0.0
+    found = sum(
+        len(np.intersect1d(np.asarray(result)[:k], truth[:k])) for result, truth in zip(results, ground_truth)
+    )
+    return found / float(len(ground_truth) * k)
+
+
+def sweep(search, queries, ground_truth, k, settings=({},), label=None, warmup=0):
+    """Run ``search(query, k, **setting)`` for each query with each of
+    ``settings`` and return a SweepResult per setting, with the recall@k, the
+    p50 / p99 latencies in milliseconds and the queries per second.
+
+    ``search`` returns the ids of the nearest rows, e.g. ann_search_provider
+    for a server, or any stand-in computing them locally. If it has a
+    ``begin()`` method, as the one of ann_search_provider, the queries of
+    each setting run in the transaction it returns, rolled back afterwards,
+    so that the ``SET LOCAL`` of a setting doesn't carry over to the next.
+    """
+    begin = getattr(search, "begin", None)
+    results = []
+    for setting in settings:
+        transaction = begin() if begin is not None else None
+        try:
+            for query in queries[:warmup]:
+                search(query, k, **setting)
+            found, latencies = [], []
+            for query in queries:
+                start = time.perf_counter()
+                found.append(search(query, k, **setting))
+                latencies.append(time.perf_counter() - start)
+        finally:
+            if transaction is not None:
+                transaction.rollback()
+        latencies = np.asarray(latencies)
+        total = latencies.sum()
+        results.append(SweepResult(
+            label,
+            dict(setting),
+            recall_at_k(found, ground_truth, k),
+            float(np.percentile(latencies, 50)) * 1000 if len(latencies) else 0.0,
+            float(np.percentile(latencies, 99)) * 1000 if len(latencies) else 0.0,
+            len(latencies) / total if total else 0.0,
+        ))
+    return results
+
+
+def ann_search_provider(connection, column, id_column=None, distance="l2_distance"):
+    """Return a ``search(query, k, ef_search=None, probes=None)`` callable
+    running ann_select on ``connection`` for sweep.
+
+    Its ``begin()`` starts the transaction of one setting, a savepoint if
+    the connection is already in a transaction, e.g. the one creating the
+    index of index_sweep.
+    """
+    if id_column is None:
+        id_column, = column.table.primary_key.columns
+
+    def search(query, k, ef_search=None, probes=None):
+        stmt = ann_select(column, query, k, columns=[id_column], distance=distance,
+                          ef_search=ef_search, probes=probes)
+        return [row[0] for row in connection.execute(stmt)]
+
+    def begin():
+        if connection.in_transaction():
+            return connection.begin_nested()
+        return connection.begin()
+
+    search.begin = begin
+    return search
+
+
+def index_sweep(connection, indexes, search, queries, ground_truth, k, settings=({},), warmup=0):
+    """Create each of ``indexes`` in turn, e.g. HnswIndex with different ``m``
+    / ``ef_construction``, run sweep against it and drop it.
+
+    The results are labelled with the index names.
+    """
+    results = []
+    for index in indexes:
+        index.create(connection)
+        try:
+            results.extend(sweep(search, queries, ground_truth, k, settings, label=index.name, warmup=warmup))
+        finally:
+            index.drop(connection)
+    return results
+
+
+def format_report(results):
+    """Format SweepResult rows as a text table."""
+    header = ("label", "settings", "recall", "p50 ms", "p99 ms", "qps")
+    rows = [
+        (
+            result.label or "",
+            ", ".join("%s=%s" % item for item in sorted(result.settings.items())),
+            "%.4f" % result.recall,
+            "%.3f" % result.p50,
+            "%.3f" % result.p99,
+            "%.1f" % result.qps,
+        )
+        for result in results
+    ]
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    return "\n".join(
+        "  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip()
+        for row in [header] + rows
+    )
@@ -0,0 +1,474 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2005-2022 the SQLAlchemy authors and contributors
+# <see AUTHORS file>
+#
+# Copyright (C) 2025-2025 Huawei Technologies Co.,Ltd.
+#
+# This module is part of SQLAlchemy and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+import asyncio
+import collections
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import heapq
+from multiprocessing import shared_memory
+import os
+import queue
+import re
+import threading
+
+import numpy as np
+from sqlalchemy import and_, cast, collate, column, exc, func, String, Table, Text, text
+
+from opengauss_sqlalchemy.utils import Vector
+
+_DONE = object()
+
+
+class _Failure(object):
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
+def _put(buffer, item, stop):
+    # put item in the bounded buffer unless the consumer went away
+    while not stop.is_set():
+        try:
+            buffer.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _produce(task, buffer, stop):
+    if stop.is_set():
+        return
+    batches = None
+    try:
+        batches = task()
+        for batch in batches:
+            if not _put(buffer, batch, stop):
+                return
+    except BaseException as error:
+        _put(buffer, _Failure(error), stop)
+    else:
+        _put(buffer, _DONE, stop)
+    finally:
+        # closes the connection of a task stopped early
+        close = getattr(batches, "close", None)
+        if close is not None:
+            close()
+
+
+def _consume(buffer, producers):
+    while producers:
+        item = buffer.get()
+        if item is _DONE:
+            producers -= 1
+        elif isinstance(item, _Failure):
+            raise item.error
+        else:
+            yield item
+
+
+def _parallel_batches(tasks, workers, max_buffered):
+    """Run the ``tasks``, callables returning an iterable of batches, on
+    ``workers`` threads and yield their batches as they come, at most
+    ``max_buffered`` being held in memory.
+    """
+    buffer = queue.Queue(max_buffered)
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(min(workers or len(tasks), len(tasks)) or 1)
+    try:
+        for task in tasks:
+            executor.submit(_produce, task, buffer, stop)
+        for batch in _consume(buffer, len(tasks)):
+            yield batch
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
+
+
+def _rows(batches):
+    for batch in batches:
+        for row in batch:
+            yield row
+
+
+def _merged_rows(tasks, key, reverse, max_buffered):
+    """Run each of the ``tasks``, whose batches are sorted by ``key``, on its
+    own thread and yield their rows merged in order.
+    """
+    buffers = [queue.Queue(max_buffered) for _ in tasks]
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(len(tasks) or 1)
+    try:
+        for task, buffer in zip(tasks, buffers):
+            executor.submit(_produce, task, buffer, stop)
+        for row in heapq.merge(*[_rows(_consume(buffer, 1)) for buffer in buffers], key=key, reverse=reverse):
+            yield row
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
+
+
+def _fetch_batches(engine, statement, batch_size, stream_results=False):
+    with engine.connect() as conn:
+        if stream_results:
+            conn = conn.execution_options(stream_results=True, max_row_buffer=batch_size)
+        result = conn.execute(statement)
+        while True:
+            batch = result.fetchmany(batch_size)
+            if not batch:
+                break
+            yield batch
+
+
+def list_datanodes(connection):
+    """Return the names of the datanodes of distributed openGauss."""
+    return connection.execute(
+        text("SELECT node_name FROM pgxc_node WHERE node_type = 'D' ORDER BY node_name")
+    ).scalars().all()
+
+
+def _execute_direct(dialect, statement, datanode):
+    if isinstance(statement, str):
+        sql, columns = statement, None
+    else:
+        sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+        if dialect.identifier_preparer._double_percents:
+            # doubled again by text()
+            sql = sql.replace("%%", "%")
+        columns = [column(c.name, c.type) for c in statement.selected_columns]
+    direct = "EXECUTE DIRECT ON (%s) '%s'" % (dialect.identifier_preparer.quote(datanode), sql.replace("'", "''"))
+    direct = text(re.sub(r":", r"\\:", direct))
+    if columns is not None:
+        # the result columns keep the types of the statement
+        direct = direct.columns(*columns)
+    return direct
+
+
+def datanode_scan(engine, statement, datanodes=None, order_by=None, descending=False, batch_size=1000,
+                  max_buffered=4):
+    """Run ``statement`` with ``EXECUTE DIRECT`` on each datanode of
+    distributed openGauss, concurrently on a connection per datanode, and
+    yield the rows of all of them.
+
+    This is meant for administrative bulk reads: each datanode returns its
+    own rows at its own snapshot, there is no consistency across datanodes.
+    The SELECT is rendered with literal values. ``datanodes`` default to all
+    of them. With ``order_by``, names of result columns, the statement is
+    ordered by them on each datanode and the rows are merged in that order,
+    NULLs last (first if ``descending``) and strings by code point, i.e.
+    with the ``"C"`` collation.
+
+    ``EXECUTE DIRECT`` can't run in a server side cursor, so the result of
+    each datanode is loaded in client memory by the DBAPI when it is
+    executed, and the statement has to select a result that fits in memory
+    per datanode, e.g. by ranges of a column. The rows are then converted
+    ``batch_size`` at a time, and at most ``max_buffered`` batches per
+    datanode wait for the consumer.
+    """
+    if not getattr(engine.dialect, "_supports_table_distribute_by", False):
+        raise exc.ArgumentError("EXECUTE DIRECT requires distributed openGauss (opengauss+dc_psycopg2)")
+    if datanodes is None:
+        with engine.connect() as conn:
+            datanodes = list_datanodes(conn)
+
+    if order_by is not None:
+        if isinstance(order_by, str):
+            order_by = [order_by]
+        clauses = [statement.selected_columns[name] for name in order_by]
+        # the order of str in python
+        clauses = [collate(c, "C") if isinstance(c.type, String) else c for c in clauses]
+        statement = statement.order_by(*[c.desc() if descending else c for c in clauses])
+
+    tasks = [
+        lambda datanode=datanode: _fetch_batches(
+            engine, _execute_direct(engine.dialect, statement, datanode), batch_size
+        )
+        for datanode in datanodes
+    ]
+    if order_by is None:
+        return _rows(_parallel_batches(tasks, len(tasks), max_buffered * len(tasks)))
+
+    def key(row):
+        # NULLs sort after any value, as on the server
+        return tuple((1, 0) if value is None else (0, value) for value in (row._mapping[name] for name in order_by))
+
+    return _merged_rows(tasks, key, descending, max_buffered)
+
+
+def list_partitions(connection, table):
+    """Return the names of the partitions of ``table``."""
+    return connection.execute(
+        text(
+            "SELECT relname FROM pg_partition WHERE parttype = 'p' AND parentid = CAST(:table AS regclass) "
+            "ORDER BY oid"
+        ),
+        {"table": connection.dialect.identifier_preparer.format_table(table)},
+    ).scalars().all()
+
+
+def _range_bounds(low, high, splits):
+    if isinstance(low, int) and isinstance(high, int):
+        bounds = [low + (high - low) * i // splits for i in range(1, splits)]
+    else:
+        # floats, decimals, dates and timestamps
+        bounds = [low + (high - low) * i / splits for i in range(1, splits)]
+    result = []
+    for bound in bounds:
+        if bound > low and (not result or bound > result[-1]):
+            result.append(bound)
+    return result
+
+
+def _split_statements(connection, statement, split_by, splits):
+    if statement._limit_clause is not None or statement._offset_clause is not None:
+        raise exc.ArgumentError("parallel_select can't split a statement with LIMIT or OFFSET")
+
+    if isinstance(split_by, (str, list, tuple)):
+        tables = [t for t in statement.get_final_froms() if isinstance(t, Table)]
+        if len(tables) != 1:
+            raise exc.ArgumentError("parallel_select splits by partitions the statements of one table")
+        table = tables[0]
+        if split_by == "partitions":
+            split_by = list_partitions(connection, table)
+        elif isinstance(split_by, str):
+            raise exc.ArgumentError("split_by must be a column, partition names or 'partitions', not %r" % split_by)
+        preparer = connection.dialect.identifier_preparer
+        return [
+            statement.with_hint(table, "PARTITION (%s)" % preparer.quote(name), "opengauss")
+            for name in split_by
+        ]
+
+    low, high = connection.execute(
+        statement.with_only_columns(func.min(split_by), func.max(split_by)).order_by(None)
+    ).one()
+    statements = []
+    if low is not None:
+        previous = None
+        for bound in _range_bounds(low, high, splits):
+            statements.append(statement.where(
+                split_by < bound if previous is None else and_(split_by >= previous, split_by < bound)
+            ))
+            previous = bound
+        statements.append(statement.where(split_by >= previous if previous is not None else split_by.isnot(None)))
+    if getattr(split_by, "nullable", True):
+        statements.append(statement.where(split_by.is_(None)))
+    return statements
+
+
+def parallel_select(engine, statement, split_by, workers=4, splits=None, batch_size=10000, max_buffered=None):
+    """Read the rows of ``statement`` on ``workers`` connections at once and
+    yield them in batches of up to ``batch_size`` rows, in no particular
+    order.
+
+    The scan is split in ranges of the ``split_by`` column, ``splits`` of
+    them between its minimum and maximum (``4 * workers`` by default, so
+    that the workers stay busy with uneven ranges), or by the partitions of
+    the table with ``split_by`` a list of partition names or
+    ``"partitions"`` for all of them. Each piece is read with a server side
+    cursor and at most ``max_buffered`` batches (``2 * workers`` by default)
+    wait for the consumer.
+
+    With an Engine the pieces are read on a thread pool. With an
+    AsyncEngine they are read with ``asyncio.gather`` and an async iterator
+    is returned::
+
+        async for batch in parallel_select(async_engine, select(tbl), tbl.c.id, workers=8):
+            ...
+
+    The pieces are read in separate transactions, rows changed during the
+    scan may be missed or read twice.
+    """
+    splits = splits or 4 * workers
+    max_buffered = max_buffered or 2 * workers
+    if hasattr(engine, "sync_engine"):
+        return _async_parallel_select(engine, statement, split_by, workers, splits, batch_size, max_buffered)
+
+    with engine.connect() as conn:
+        statements = _split_statements(conn, statement, split_by, splits)
+    tasks = [
+        lambda statement=statement: _fetch_batches(engine, statement, batch_size, stream_results=True)
+        for statement in statements
+    ]
+    return _parallel_batches(tasks, workers, max_buffered)
+
+
+async def _async_parallel_select(engine, statement, split_by, workers, splits, batch_size, max_buffered):
+    async with engine.connect() as conn:
+        statements = await conn.run_sync(_split_statements, statement, split_by, splits)
+
+    buffer = asyncio.Queue(max_buffered)
+    semaphore = asyncio.Semaphore(workers)
+
+    async def read(statement):
+        try:
+            async with semaphore:
+                async with engine.connect() as conn:
+                    result = await conn.stream(statement)
+                    async for batch in result.partitions(batch_size):
+                        await buffer.put(batch)
+        except Exception as error:
+            await buffer.put(_Failure(error))
+        else:
+            await buffer.put(_DONE)
+
+    readers = asyncio.gather(*[read(statement) for statement in statements])
+    try:
+        remaining = len(statements)
+        while remaining:
+            item = await buffer.get()
+            if item is _DONE:
+                remaining -= 1
+            elif isinstance(item, _Failure):
+                raise item.error
+            else:
+                yield item
+    finally:
+        readers.cancel()
+        await asyncio.gather(readers, return_exceptions=True)
+
+
+def _vector_text_statement(statement):
+    """Return ``statement`` selecting ``(id, vector)`` with the vector as
+    text, to be decoded by batches, and the dimensions of the vector
+    column if known.
+    """
+    id_column, vector_column = statement.selected_columns
+    return (
+        statement.with_only_columns(id_column, cast(vector_column, Text)),
+        getattr(vector_column.type, "dim", None),
+    )
+
+
+class SharedMatrix(object):
+    """A ``(n, dim)`` float32 matrix at the start of a
+    ``multiprocessing.shared_memory`` block, which other processes can map
+    by ``name``. ``close()`` releases the block, after which ``array`` must
+    not be used anymore.
+    """
+
+    def __init__(self, shm, shape):
+        self.shm = shm
+        self.array = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        if self.array is not None:
+            self.array = None
+            self.shm.close()
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _decode_into(name, start, shape, texts):
+    # runs in a worker process
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        matrix = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        matrix[start:start + len(texts)] = Vector._from_db_rows(texts, shape[1])
+        del matrix
+    finally:
+        shm.close()
+
+
+def _grow(matrix, rows, dim, pending):
+    """Return a SharedMatrix of at least ``rows`` rows holding the rows of
+    ``matrix``, doubling its capacity, once the pending decodings into it
+    are done.
+    """
+    capacity = matrix.array.shape[0] if matrix is not None else 0
+    if matrix is not None and rows <= capacity:
+        return matrix
+    _wait(pending)
+    capacity = max(rows, 2 * capacity)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, capacity * dim * 4))
+    grown = SharedMatrix(shm, (capacity, dim))
+    if matrix is not None:
+        grown.array[:matrix.array.shape[0]] = matrix.array
+        matrix.close()
+    return grown
+
+
+def _wait(pending, keep=0):
+    while len(pending) > keep:
+        pending.popleft().result()
+
+
+def fetch_vectors_shared(connection, statement, workers=None, chunk_rows=20000, executor=None):
+    """Fetch the ``(id, vector)`` rows selected by ``statement`` as
+    ``(ids, SharedMatrix)``, the vectors being decoded on a process pool
+    into one shared memory float32 matrix::
+
+        with ProcessPoolExecutor(8) as pool:
+            ids, vectors = fetch_vectors_shared(conn, select(tbl.c.id, tbl.c.embedding), executor=pool)
+            with vectors:
+                index.add(vectors.array)
+
+    The vectors are fetched as text with a server side cursor, and each
+    chunk of ``chunk_rows`` texts is parsed by a worker as soon as it is
+    fetched, without holding the GIL of the caller, at most ``2 * workers``
+    chunks waiting for the workers. The matrix grows by doubling its
+    capacity. ``executor`` is a ProcessPoolExecutor to reuse, one of
+    ``workers`` processes is started for the call otherwise. A single chunk
+    is parsed by the caller. NULL vectors are rows of NaN.
+    """
+    statement, dim = _vector_text_statement(statement)
+    workers = workers or os.cpu_count() or 1
+    result = connection.execution_options(stream_results=True, max_row_buffer=chunk_rows).execute(statement)
+    ids = []
+    # chunks fetched before the dimensions are known, or the first one
+    # until a second shows there is work for a pool
+    waiting = []
+    pending = collections.deque()
+    matrix = None
+    own_executor = executor is None
+    try:
+        for rows in result.partitions(chunk_rows):
+            chunk_ids, texts = zip(*rows)
+            waiting.append((len(ids), texts))
+            ids.extend(chunk_ids)
+            if dim is None:
+                dim = next((t.count(",") + 1 for t in texts if t is not None), None)
+            if dim is None or len(ids) == len(texts):
+                continue
+
+            matrix = _grow(matrix, len(ids), dim, pending)
+            if executor is None:
+                executor = ProcessPoolExecutor(workers)
+            for start, texts in waiting:
+                pending.append(executor.submit(_decode_into, matrix.name, start, matrix.array.shape, texts))
+            waiting = []
+            _wait(pending, keep=2 * workers)
+
+        matrix = _grow(matrix, len(ids), dim or 0, pending)
+        _wait(pending)
+        for start, texts in waiting:
+            _decode_into(matrix.name, start, matrix.array.shape, texts)
+    except BaseException:
+        for future in pending:
+            future.cancel()
+        if matrix is not None:
+            matrix.close()
+        raise
+    finally:
+        result.close()
+        if own_executor and executor is not None:
+            executor.shutdown()
+    # a view of the first rows of the block, the unused capacity is never
+    # written so it takes no memory
+    matrix.array = matrix.array[:len(ids)]
+    return np.asarray(ids), matrix
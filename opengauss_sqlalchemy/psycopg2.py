@@ -8,12 +8,13 @@
 # the MIT License: https://www.opensource.org/licenses/mit-license.php
 from sqlalchemy import schema
 from sqlalchemy import util
-from sqlalchemy.dialects.postgresql.psycopg2 import PGDialect_psycopg2
+from sqlalchemy.dialects.postgresql.psycopg2 import PGDialect_psycopg2, PGExecutionContext_psycopg2
 from sqlalchemy.ext.compiler import compiles
 from collections import defaultdict
 import functools
 
 from opengauss_sqlalchemy.base import OpenGaussDDLCompiler, OpenGaussIdentifierPreparer, OpenGaussCompiler
+from opengauss_sqlalchemy.base import OpenGaussExecutionContext
 
 # If alembic is installed, register an alias in its dialect mapping.
 try:
@@ -76,6 +77,10 @@ else:
     migrate_dialects["opengauss"] = OGDialect
 
 
+class OpenGaussExecutionContext_psycopg2(OpenGaussExecutionContext, PGExecutionContext_psycopg2):
+    pass
+
+
 class OpenGaussDialect_psycopg2(PGDialect_psycopg2):
     name = "opengauss"
     driver = "psycopg2"
@@ -83,6 +88,7 @@ class OpenGaussDialect_psycopg2(PGDialect_psycopg2):
     cte_follows_insert = True
     supports_statement_cache = True
 
+    execution_ctx_cls = OpenGaussExecutionContext_psycopg2
     statement_compiler = OpenGaussCompiler
     ddl_compiler = OpenGaussDDLCompiler
     preparer = OpenGaussIdentifierPreparer
@@ -98,6 +104,7 @@ class OpenGaussDialect_psycopg2(PGDialect_psycopg2):
                 "with": {},
                 "tablespace": None,
                 "where": None,
+                "build_settings": {},
             },
         ),
         (
@@ -134,6 +141,24 @@ class OpenGaussDialect_psycopg2(PGDialect_psycopg2):
         # most of opengauss features are same with postgres 9.2.4
         return (9, 2, 4)
 
+    def get_multi_indexes(self, connection, **kw):
+        # reflected index options are named after the postgresql dialect,
+        # rename the ones known by opengauss so that the index round-trips
+        # through OpenGaussDDLCompiler.visit_create_index
+        index_options = set(dict(self.construct_arguments)[schema.Index])
+        result = []
+        for key, indexes in super(OpenGaussDialect_psycopg2, self).get_multi_indexes(connection, **kw):
+            for index in indexes:
+                if index.get("dialect_options"):
+                    index["dialect_options"] = dict(
+                        ("opengauss_" + name[len("postgresql_"):], value)
+                        if name.startswith("postgresql_") and name[len("postgresql_"):] in index_options
+                        else (name, value)
+                        for name, value in index["dialect_options"].items()
+                    )
+            result.append((key, indexes))
+        return result
+
     def get_isolation_level_values(self, dbapi_conn):
         # note the generic dialect doesn't have AUTOCOMMIT, however
         # all postgresql dialects should include AUTOCOMMIT.
@@ -1,4 +1,11 @@
-from opengauss_sqlalchemy.utils import Vector, SparseVector
+from opengauss_sqlalchemy.utils import Vector, Bit, HalfVector, SparseVector
+
+# types with a binary codec, bit being a built-in type
+_vector_types = {
+    'vector': Vector,
+    'halfvec': HalfVector,
+    'sparsevec': SparseVector,
+}
 
 async def register_vector(conn, schema='pg_catalog'):
     await conn.set_type_codec(
@@ -9,6 +16,26 @@ async def register_vector(conn, schema='pg_catalog'):
         format='binary'
     )
 
+    await conn.set_type_codec(
+        'bit',
+        schema='pg_catalog',
+        encoder=Bit._to_db_binary,
+        decoder=Bit._from_db_binary,
+        format='binary'
+    )
+
+    try:
+        await conn.set_type_codec(
+            'halfvec',
+            schema=schema,
+            encoder=HalfVector._to_db_binary,
+            decoder=HalfVector._from_db_binary,
+            format='binary'
+        )
+    except ValueError as e:
+        if not str(e).startswith('unknown type:'):
+            raise e
+
     try:
         await conn.set_type_codec(
             'sparsevec',
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2005-2022 the SQLAlchemy authors and contributors
+# <see AUTHORS file>
+#
+# Copyright (C) 2025-2025 Huawei Technologies Co.,Ltd.
+#
+# This module is part of SQLAlchemy and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import threading
+import time
+
+from sqlalchemy import create_engine, event, exc, util
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+PRIMARY = "primary"
+STANDBY = "standby"
+
+# SQLSTATE of a write on a standby, i.e. the primary changed
+_READ_ONLY_SQL_TRANSACTION = "25006"
+
+# local_role of pg_stat_get_stream_replications(), a single node being
+# "Normal"; the other roles (Pending, Unknown...) take no statements
+_LOCAL_ROLES = {
+    "primary": PRIMARY,
+    "normal": PRIMARY,
+    "standby": STANDBY,
+    "cascade standby": STANDBY,
+}
+
+
+def _query_values(url, key):
+    values = url.query.get(key, ())
+    if isinstance(values, str):
+        values = (values,)
+    return [v for value in values for v in value.split(",") if v]
+
+
+def split_hosts(url):
+    """Return a URL per host of a multi-host URL, given as
+    ``?host=a,b,c`` (with an optional ``port=5432,5433,5434``) or as
+    ``?host=a:5432&host=b:5433``.
+    """
+    url = make_url(url)
+    hosts = _query_values(url, "host")
+    ports = _query_values(url, "port")
+    if not hosts:
+        return [url]
+
+    base = url.difference_update_query(["host", "port"])
+    urls = []
+    for i, host in enumerate(hosts):
+        port = url.port
+        if ":" in host:
+            host, port = host.rsplit(":", 1)
+        elif ports:
+            port = ports[i] if len(ports) > 1 else ports[0]
+        urls.append(base.set(host=host, port=int(port) if port else None))
+    return urls
+
+
+class HostRouter(object):
+    """Engines for the hosts of an openGauss primary / standby cluster,
+    routing writes to the primary and reads to the standbys.
+
+    The roles of the hosts are detected with the ``local_role`` of
+    ``pg_stat_get_stream_replications()``, on a new connection per host
+    given ``connect_timeout`` seconds, all the hosts at once. They are
+    detected again every ``check_interval`` seconds on a background thread,
+    the last known roles being used meanwhile, and at once after a
+    disconnect or a write rejected by a former primary. Standbys are picked
+    in turn with ``policy="round_robin"``, or by the lowest latency of the
+    role checks with ``policy="least_latency"``. ``engine_kwargs`` are
+    passed to create_engine for each host.
+    """
+
+    def __init__(self, url, policy="round_robin", check_interval=30.0, connect_timeout=5, **engine_kwargs):
+        if policy not in ("round_robin", "least_latency"):
+            raise exc.ArgumentError("policy must be 'round_robin' or 'least_latency', not %r" % policy)
+        self.policy = policy
+        self.check_interval = check_interval
+        self.connect_timeout = connect_timeout
+        self._connect_args = engine_kwargs.get("connect_args", {})
+        self.engines = [create_engine(host_url, **engine_kwargs) for host_url in split_hosts(url)]
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._handle_error)
+
+        self._roles = {}
+        self._latencies = {}
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+
+    def _detect_role(self, engine):
+        dialect = engine.dialect
+        cargs, cparams = dialect.create_connect_args(engine.url)
+        cparams.update(self._connect_args)
+        # a host not answering in time is unreachable for the check
+        cparams.setdefault("connect_timeout", self.connect_timeout)
+        try:
+            dbapi_connection = dialect.connect(*cargs, **cparams)
+            try:
+                cursor = dbapi_connection.cursor()
+                cursor.execute("SELECT local_role FROM pg_stat_get_stream_replications()")
+                row = cursor.fetchone()
+                cursor.close()
+            finally:
+                dbapi_connection.close()
+        except dialect.loaded_dbapi.Error:
+            return None
+        # a host promoted or demoted is "Pending" until it is ready
+        return _LOCAL_ROLES.get(((row[0] if row else None) or "").lower())
+
+    def _check(self, engine):
+        start = time.perf_counter()
+        try:
+            role = self._detect_role(engine)
+        except exc.DBAPIError:
+            role = None
+        return role, time.perf_counter() - start
+
+    def refresh(self):
+        """Detect the role of each host, ``None`` for the unreachable ones."""
+        with ThreadPoolExecutor(len(self.engines)) as executor:
+            checks = dict(zip(self.engines, executor.map(self._check, self.engines)))
+
+        roles, latencies = {}, {}
+        for engine, (role, latency) in checks.items():
+            roles[engine] = role
+            if role is None:
+                continue
+            previous = self._latencies.get(engine)
+            # moving average, so one slow check doesn't move the reads away
+            latencies[engine] = latency if previous is None else 0.7 * previous + 0.3 * latency
+
+        for engine, role in roles.items():
+            previous = self._roles.get(engine)
+            if previous is not None and previous != role:
+                # the pooled connections belong to the former role
+                engine.dispose()
+        self._roles = roles
+        self._latencies = latencies
+        self._checked_at = time.monotonic()
+        return roles
+
+    def _current_roles(self):
+        checked_at = self._checked_at
+        if checked_at is None:
+            # not detected yet, or after an error: the first caller detects
+            # the roles, the others wait for them only if none are known
+            if self._lock.acquire(blocking=not self._roles):
+                try:
+                    if self._checked_at is None:
+                        self.refresh()
+                finally:
+                    self._lock.release()
+        elif time.monotonic() - checked_at > self.check_interval:
+            if self._lock.acquire(blocking=False):
+                threading.Thread(target=self._refresh_in_background, name="opengauss-role-check", daemon=True).start()
+        return self._roles
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception as error:
+            util.warn("Detecting the roles of the hosts failed: %s" % error)
+        finally:
+            self._lock.release()
+
+    def _handle_error(self, context):
+        sqlstate = getattr(context.original_exception, "pgcode", None)
+        if context.is_disconnect or sqlstate == _READ_ONLY_SQL_TRANSACTION:
+            self._checked_at = None
+
+    @property
+    def roles(self):
+        return dict(self._current_roles())
+
+    def get_engine(self, route=None):
+        """Return the engine of the primary, or of a standby for
+        ``route="standby"``, falling back to the primary when no standby is
+        available.
+        """
+        if route not in (None, PRIMARY, STANDBY):
+            raise exc.ArgumentError("opengauss_route must be 'primary' or 'standby', not %r" % route)
+        roles = self._current_roles()
+        if route == STANDBY:
+            standbys = [engine for engine in self.engines if roles.get(engine) == STANDBY]
+            if standbys:
+                if self.policy == "least_latency":
+                    return min(standbys, key=lambda engine: self._latencies.get(engine, float("inf")))
+                return standbys[next(self._counter) % len(standbys)]
+
+        for engine in self.engines:
+            if roles.get(engine) == PRIMARY:
+                return engine
+        raise exc.DisconnectionError("No primary host available among %s" % ", ".join(
+            str(engine.url.host) for engine in self.engines))
+
+    def connect(self, route=None):
+        """Connect to the engine of ``route``, detecting the roles again and
+        retrying once if the host can't be reached.
+        """
+        try:
+            return self.get_engine(route).connect()
+        except exc.OperationalError:
+            self.refresh()
+            return self.get_engine(route).connect()
+
+    def dispose(self):
+        for engine in self.engines:
+            engine.dispose()
+
+
+class RoutingSession(Session):
+    """Session binding writes and flushes to the primary of a HostRouter and
+    reads to a standby, for statements with the
+    ``opengauss_route="standby"`` or ``postgresql_readonly=True`` execution
+    options or for all the reads of a session created with
+    ``route="standby"``.
+
+    A transaction reads from one host: the engine of its first statement is
+    kept for the following reads, so they share the snapshot of one standby,
+    and after a write or a flush the reads go to the primary, which has the
+    changes.
+    """
+
+    def __init__(self, router=None, route=None, **kwargs):
+        super(RoutingSession, self).__init__(**kwargs)
+        self.router = router
+        self.route = route
+        self._read_engine = None
+
+    def _read_route(self, clause):
+        route = self.route
+        if hasattr(clause, "get_execution_options"):
+            options = clause.get_execution_options()
+            if options.get("postgresql_readonly"):
+                route = STANDBY
+            route = options.get("opengauss_route", route)
+        return route
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.router is None:
+            return super(RoutingSession, self).get_bind(mapper, clause=clause, **kwargs)
+        if not self.in_transaction():
+            # the bind of the first statement is looked up before the
+            # transaction begins, the engine is kept until it ends
+            self._read_engine = None
+        if self._flushing or getattr(clause, "is_dml", False) or getattr(clause, "_for_update_arg", None) is not None:
+            self._read_engine = self.router.get_engine(PRIMARY)
+        elif self._read_engine is None:
+            self._read_engine = self.router.get_engine(self._read_route(clause))
+        return self._read_engine
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2005-2022 the SQLAlchemy authors and contributors
+# <see AUTHORS file>
+#
+# Copyright (C) 2025-2025 Huawei Technologies Co.,Ltd.
+#
+# This module is part of SQLAlchemy and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+import numpy as np
+from sqlalchemy import cast, exc, func, Integer, select, true, values
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.sql import coercions, expression, roles
+from sqlalchemy.sql import util as sql_util
+
+from opengauss_sqlalchemy.usertype.vector import _NormalizedCosineDistance
+from opengauss_sqlalchemy.utils import binary_quantize
+
+# the maximum value of hnsw_ef_search accepted by the server
+_MAX_EF_SEARCH = 1000
+
+
+def _default_ef_search(candidate_limit):
+    return min(candidate_limit, _MAX_EF_SEARCH)
+
+
+def _search_options(ef_search=None, probes=None):
+    options = {}
+    if ef_search is not None:
+        options["opengauss_ef_search"] = ef_search
+    if probes is not None:
+        options["opengauss_probes"] = probes
+    return options
+
+
+def ann_select(column, query, k, columns=None, distance="l2_distance", where=None,
+               ef_search=None, probes=None, overfetch=None):
+    """Return a SELECT of the ``k`` rows nearest to ``query`` on a vector column.
+
+    The rows are ordered by ``distance``, one of the comparator methods of the
+    column type (``l2_distance``, ``cosine_distance``, ``max_inner_product``,
+    ``hamming_distance``...), which is returned as the ``distance`` column.
+
+    ``ef_search`` and ``probes`` set ``hnsw_ef_search`` / ``ivfflat_probes``
+    for the statement through the ``opengauss_ef_search`` /
+    ``opengauss_probes`` execution options.
+
+    With ``overfetch``, the ``k * overfetch`` nearest rows are selected first
+    and ``where`` is applied to those candidates only, which keeps the index
+    scan usable for restrictive filters. ``ef_search`` then defaults to the
+    number of candidates, as an HNSW scan returns at most ``hnsw_ef_search``
+    rows, capped to 1000, the maximum accepted by the server.
+    """
+    table = column.table
+    if columns is None:
+        columns = list(table.c)
+    columns = [coercions.expect(roles.ColumnsClauseRole, c) for c in columns]
+
+    if overfetch and where is not None:
+        candidate_limit = k * overfetch
+        if ef_search is None:
+            ef_search = _default_ef_search(candidate_limit)
+        candidate_distance = getattr(column, distance)(query).label("distance")
+        candidates = (
+            select(*table.c, candidate_distance)
+            .order_by(candidate_distance)
+            .limit(candidate_limit)
+            .subquery("candidates")
+        )
+        adapter = sql_util.ClauseAdapter(candidates)
+        stmt = (
+            select(*[adapter.traverse(c) for c in columns], candidates.c.distance)
+            .where(adapter.traverse(where))
+            .order_by(candidates.c.distance)
+            .limit(k)
+        )
+    else:
+        distance_expr = getattr(column, distance)(query).label("distance")
+        stmt = select(*columns, distance_expr).order_by(distance_expr).limit(k)
+        if where is not None:
+            stmt = stmt.where(where)
+
+    return stmt.execution_options(**_search_options(ef_search, probes))
+
+
+def rescore_select(bit_column, vector_column, query, k, columns=None, distance="cosine_distance",
+                   overfetch=10, where=None, ef_search=None):
+    """Return a two-stage SELECT of the ``k`` rows nearest to ``query``.
+
+    The ``k * overfetch`` candidates nearest by ``hamming_distance`` to the
+    binary quantized ``query`` are selected on ``bit_column``, which can use
+    a small HNSW index, then they are rescored by ``distance`` on the full
+    precision ``vector_column``, all in one statement.
+    """
+    table = vector_column.table
+    if columns is None:
+        columns = list(table.c)
+    columns = [coercions.expect(roles.ColumnsClauseRole, c) for c in columns]
+
+    candidate_limit = k * overfetch
+    if ef_search is None:
+        ef_search = _default_ef_search(candidate_limit)
+    query_bits = binary_quantize([query])[0]
+    candidates = (
+        select(*table.c)
+        .order_by(bit_column.hamming_distance(query_bits))
+        .limit(candidate_limit)
+    )
+    if where is not None:
+        candidates = candidates.where(where)
+    candidates = candidates.subquery("candidates")
+
+    adapter = sql_util.ClauseAdapter(candidates)
+    distance_expr = getattr(adapter.traverse(vector_column), distance)(query).label("distance")
+    stmt = (
+        select(*[adapter.traverse(c) for c in columns], distance_expr)
+        .order_by(distance_expr)
+        .limit(k)
+    )
+    return stmt.execution_options(**_search_options(ef_search))
+
+
+def batch_ann_select(column, queries, k, id_column=None, distance="l2_distance", ef_search=None, probes=None):
+    """Return a SELECT of the ``k`` nearest rows of each of ``queries``.
+
+    The query vectors are bound as a VALUES list joined to a LATERAL top-k
+    subquery, so the whole batch runs in one statement. The rows are
+    ``(query index, id, distance)``, ordered by query index and distance.
+    """
+    table = column.table
+    if id_column is None:
+        if len(table.primary_key.columns) != 1:
+            raise exc.ArgumentError("id_column is required for table %s" % table.name)
+        id_column, = table.primary_key.columns
+
+    query_values = values(
+        expression.column("query_index", Integer),
+        expression.column("query", column.type),
+        name="queries",
+    ).data([
+        # a bare parameter of VALUES is text, which the binary vector
+        # codecs of asyncpg can't be bound to
+        (query_index, cast(query, column.type))
+        for query_index, query in enumerate(queries)
+    ])
+    distance_expr = getattr(column, distance)(query_values.c.query).label("distance")
+    nearest = (
+        select(coercions.expect(roles.ColumnsClauseRole, id_column).label("id"), distance_expr)
+        .order_by(distance_expr)
+        .limit(k)
+        .lateral("nearest")
+    )
+    stmt = (
+        select(query_values.c.query_index, nearest.c.id, nearest.c.distance)
+        .select_from(query_values)
+        .join(nearest, true())
+        .order_by(query_values.c.query_index, nearest.c.distance)
+    )
+    return stmt.execution_options(**_search_options(ef_search, probes))
+
+
+def batch_ann_search(connection, column, queries, k, id_column=None, distance="l2_distance",
+                     ef_search=None, probes=None, batch_size=1000):
+    """Run batch_ann_select for ``queries`` in batches of ``batch_size``.
+
+    Return a list with an ``(ids, distances)`` pair of NumPy arrays per
+    query, in the order of ``queries``.
+    """
+    results = []
+    for start in range(0, len(queries), batch_size):
+        batch = queries[start:start + batch_size]
+        stmt = batch_ann_select(column, batch, k, id_column, distance, ef_search, probes)
+        rows = connection.execute(stmt).all()
+        results.extend(_group_by_query(rows, len(batch)))
+    return results
+
+
+def _group_by_query(rows, count):
+    if rows:
+        query_index, ids, distances = (np.asarray(c) for c in zip(*rows))
+    else:
+        query_index, ids, distances = np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+    distances = distances.astype(np.float64)
+    # rows are ordered by query index, split them at each query boundary
+    bounds = np.searchsorted(query_index, np.arange(1, count))
+    return list(zip(np.split(ids, bounds), np.split(distances, bounds)))
+
+
+def _ranked(stmt, descending, name):
+    # rank the candidates after the ORDER BY ... LIMIT of stmt, so that the
+    # window function doesn't prevent an index scan
+    candidates = stmt.subquery()
+    order = candidates.c.score.desc() if descending else candidates.c.score
+    return select(
+        candidates.c.id,
+        candidates.c.score,
+        func.row_number().over(order_by=order).label("rank"),
+    ).subquery(name)
+
+
+def hybrid_select(id_column, text_column, text_query, vector_column, query, k, candidates=None,
+                  distance="cosine_distance", fusion="rrf", rrf_k=60, weights=(1.0, 1.0),
+                  language="english", ef_search=None, probes=None):
+    """Return a SELECT of the ``k`` best ``(id, score)`` rows of a full-text
+    and a vector search fused in one statement.
+
+    The full-text candidates match ``plainto_tsquery(language, text_query)``
+    on ``text_column``, a TSVECTOR column or a text column searched through
+    ``to_tsvector(language, text_column)`` (which can use a GIN index on the
+    same expression), ranked by ``ts_rank``. The vector candidates are the
+    nearest rows to ``query`` by ``distance``. ``candidates`` rows, by
+    default ``k * 4``, are taken from each search.
+
+    With ``fusion="rrf"``, the score is the reciprocal rank fusion
+    ``sum(weight / (rrf_k + rank))``. With ``fusion="weighted"``, it is
+    ``weights[0] * ts_rank + weights[1] * (1 - distance)``, meant for
+    ``cosine_distance``.
+    """
+    if fusion not in ("rrf", "weighted"):
+        raise exc.ArgumentError("fusion must be 'rrf' or 'weighted', not %r" % fusion)
+    if candidates is None:
+        candidates = k * 4
+    id_column = coercions.expect(roles.ColumnsClauseRole, id_column)
+
+    # a literal regconfig, matching the expression of a GIN index
+    regconfig = expression.literal_column("'%s'" % language.replace("'", "''"))
+    if isinstance(text_column.type, TSVECTOR):
+        document = text_column
+    else:
+        document = func.to_tsvector(regconfig, text_column)
+    tsquery = func.plainto_tsquery(regconfig, text_query)
+    text_score = func.ts_rank(document, tsquery)
+    text_search = _ranked(
+        select(id_column.label("id"), text_score.label("score"))
+        .where(document.bool_op("@@")(tsquery))
+        .order_by(text_score.desc())
+        .limit(candidates),
+        True, "text_search",
+    )
+
+    vector_distance = getattr(vector_column, distance)(query)
+    vector_search = _ranked(
+        select(id_column.label("id"), vector_distance.label("score"))
+        .order_by(vector_distance)
+        .limit(candidates),
+        False, "vector_search",
+    )
+
+    text_weight, vector_weight = weights
+    if fusion == "rrf":
+        text_part = text_weight / (rrf_k + text_search.c.rank)
+        vector_part = vector_weight / (rrf_k + vector_search.c.rank)
+    else:
+        text_part = text_weight * text_search.c.score
+        if isinstance(vector_search.c.score.type, _NormalizedCosineDistance):
+            # -(a <#> b) is already 1 - cosine_distance
+            vector_part = vector_weight * -vector_search.c.score
+        else:
+            vector_part = vector_weight * (1 - vector_search.c.score)
+    score = (func.coalesce(text_part, 0) + func.coalesce(vector_part, 0)).label("score")
+
+    stmt = (
+        select(func.coalesce(text_search.c.id, vector_search.c.id).label("id"), score)
+        .select_from(text_search)
+        .join(vector_search, text_search.c.id == vector_search.c.id, full=True)
+        .order_by(score.desc())
+        .limit(k)
+    )
+    return stmt.execution_options(**_search_options(ef_search, probes))
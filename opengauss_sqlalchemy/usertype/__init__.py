@@ -8,15 +8,29 @@
 # the MIT License: https://www.opensource.org/licenses/mit-license.php
 
 from .bit import BIT
+from .functions import l2_normalize, subvector, vector_avg, vector_dims, vector_norm, vector_sum
+from .halfvec import HALFVEC
+from .index import HnswIndex, IvfflatIndex
 from .sparsevec import SPARSEVEC
 from .vector import VECTOR
 from .vector import VECTOR as Vector
+from .vector import vector_rows
 from ..utils import SparseVector
 
 __all__ = [
     'Vector',
     'VECTOR',
     'BIT',
+    'HALFVEC',
     'SPARSEVEC',
+    'HnswIndex',
+    'IvfflatIndex',
+    'vector_rows',
+    'vector_avg',
+    'vector_sum',
+    'l2_normalize',
+    'subvector',
+    'vector_dims',
+    'vector_norm',
     'SparseVector'
 ]
\ No newline at end of file
@@ -8,11 +8,13 @@
 # the MIT License: https://www.opensource.org/licenses/mit-license.php
 
 from sqlalchemy.dialects.postgresql.base import ischema_names
-from sqlalchemy.types import UserDefinedType, Float
+from sqlalchemy.types import UserDefinedType, Float, String
+from ..utils import Bit
 
 
 class BIT(UserDefinedType):
     cache_ok = True
+    _string = String()
 
     def __init__(self, length=None):
         super(UserDefinedType, self).__init__()
@@ -23,6 +25,29 @@ class BIT(UserDefinedType):
             return 'BIT'
         return 'BIT(%d)' % self.length
 
+    def bind_processor(self, dialect):
+        if getattr(dialect, 'register_vector_codecs', False):
+            # passed through by the binary codecs of the asyncpg dialect
+            def process(value):
+                return Bit._to_db_binary(value, self.length)
+            return process
+
+        def process(value):
+            return Bit._to_db(value, self.length)
+        return process
+
+    def literal_processor(self, dialect):
+        string_literal_processor = self._string._cached_literal_processor(dialect)
+
+        def process(value):
+            return string_literal_processor(Bit._to_db(value, self.length))
+        return process
+
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            return Bit._from_db(value)
+        return process
+
     class comparator_factory(UserDefinedType.Comparator):
         def hamming_distance(self, other):
             return self.op('<~>', return_type=Float)(other)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2021-2025 Andrew Kane
+# <see AUTHORS file>
+#
+# Copyright (C) 2021-2022 Huawei Technologies Co.,Ltd.
+#
+# This module is part of pgvector-python and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+# https://docs.sqlalchemy.org/en/20/core/functions.html#sqlalchemy.sql.functions.GenericFunction
+from sqlalchemy.sql.functions import GenericFunction, ReturnTypeFromArgs
+from sqlalchemy.types import Float, Integer
+
+from .bit import BIT
+
+
+class _VectorAggregate(ReturnTypeFromArgs):
+    def __init__(self, *args, **kwargs):
+        super(_VectorAggregate, self).__init__(*args, **kwargs)
+        # the result of normalized vectors is not normalized
+        if hasattr(self.type, '_unnormalized'):
+            self.type = self.type._unnormalized()
+
+
+class vector_avg(_VectorAggregate):
+    # not named avg / sum, which would shadow the builtins on import *
+    name = 'avg'
+    inherit_cache = True
+    package = 'opengauss'
+
+
+class vector_sum(_VectorAggregate):
+    name = 'sum'
+    inherit_cache = True
+    package = 'opengauss'
+
+
+class l2_normalize(ReturnTypeFromArgs):
+    inherit_cache = True
+    package = 'opengauss'
+
+
+class subvector(ReturnTypeFromArgs):
+    inherit_cache = True
+    package = 'opengauss'
+
+    def __init__(self, *args, **kwargs):
+        super(subvector, self).__init__(*args, **kwargs)
+        # the result has count dimensions, not the ones of the argument
+        if getattr(self.type, 'dim', None) is not None:
+            self.type = self.type.__class__()
+
+
+class vector_dims(GenericFunction):
+    type = Integer()
+    inherit_cache = True
+    package = 'opengauss'
+
+
+class vector_norm(GenericFunction):
+    type = Float()
+    inherit_cache = True
+    package = 'opengauss'
+
+
+class binary_quantize(GenericFunction):
+    # used as func.opengauss.binary_quantize, the client side quantization
+    # is opengauss_sqlalchemy.utils.binary_quantize
+    type = BIT()
+    inherit_cache = True
+    package = 'opengauss'
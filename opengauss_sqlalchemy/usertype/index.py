@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2021-2025 Andrew Kane
+# <see AUTHORS file>
+#
+# Copyright (C) 2021-2022 Huawei Technologies Co.,Ltd.
+#
+# This module is part of pgvector-python and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+from sqlalchemy import Index
+
+
+def _index_ops(expressions, ops):
+    if ops is None:
+        # inner product operator class for cosine_distance on normalized columns
+        return dict(
+            (expr.key, 'vector_ip_ops')
+            for expr in expressions
+            if getattr(getattr(expr, 'type', None), 'normalized', False)
+        )
+    if isinstance(ops, dict):
+        return ops
+    return dict(
+        (expr if isinstance(expr, str) else expr.key, ops)
+        for expr in expressions
+        if isinstance(expr, str) or hasattr(expr, 'key')
+    )
+
+
+class _VectorIndex(Index):
+    _index_method = None
+
+    def __init__(self, name, *expressions, ops=None, build_settings=None, storage_parameters=None, **kw):
+        self.build_settings = dict(build_settings or {})
+        super(_VectorIndex, self).__init__(
+            name,
+            *expressions,
+            opengauss_using=self._index_method,
+            opengauss_ops=_index_ops(expressions, ops),
+            opengauss_with=dict((k, v) for k, v in storage_parameters.items() if v is not None),
+            opengauss_build_settings=self.build_settings,
+            **kw
+        )
+
+
+class HnswIndex(_VectorIndex):
+    """``USING hnsw`` index on a VECTOR / SPARSEVEC / BIT column.
+
+    ``build_settings`` are set with ``SET LOCAL`` for the ``CREATE INDEX``
+    only, e.g. ``{"maintenance_work_mem": "8GB"}``.
+    """
+
+    _index_method = 'hnsw'
+
+    def __init__(self, name, *expressions, m=None, ef_construction=None, ops=None, build_settings=None, **kw):
+        self.m = m
+        self.ef_construction = ef_construction
+        super(HnswIndex, self).__init__(
+            name,
+            *expressions,
+            ops=ops,
+            build_settings=build_settings,
+            storage_parameters={'m': m, 'ef_construction': ef_construction},
+            **kw
+        )
+
+
+class IvfflatIndex(_VectorIndex):
+    """``USING ivfflat`` index on a VECTOR column.
+
+    ``build_settings`` are set with ``SET LOCAL`` for the ``CREATE INDEX``
+    only, e.g. ``{"maintenance_work_mem": "8GB"}``.
+    """
+
+    _index_method = 'ivfflat'
+
+    def __init__(self, name, *expressions, lists=None, ops=None, build_settings=None, **kw):
+        self.lists = lists
+        super(IvfflatIndex, self).__init__(
+            name,
+            *expressions,
+            ops=ops,
+            build_settings=build_settings,
+            storage_parameters={'lists': lists},
+            **kw
+        )
@@ -26,6 +26,12 @@ class SPARSEVEC(UserDefinedType):
         return 'SPARSEVEC(%d)' % self.dim
 
     def bind_processor(self, dialect):
+        if getattr(dialect, 'register_vector_codecs', False):
+            # passed through by the binary codecs of the asyncpg dialect
+            def process(value):
+                return SparseVector._to_db_binary(value, self.dim)
+            return process
+
         def process(value):
             return SparseVector._to_db(value, self.dim)
         return process
@@ -7,42 +7,93 @@
 # This module is part of pgvector-python and is released under
 # the MIT License: https://www.opensource.org/licenses/mit-license.php
 
+from sqlalchemy import type_coerce
 from sqlalchemy.dialects.postgresql.base import ischema_names
-from sqlalchemy.types import UserDefinedType, Float, String
-from ..utils import Vector
+from sqlalchemy.sql import operators
+from sqlalchemy.types import TypeDecorator, UserDefinedType, Float, String
+from ..utils import LazyVector, Vector
 
 
 class VECTOR(UserDefinedType):
+    """``VECTOR(dim)`` column, fetched as float32 ndarrays.
+
+    With ``lazy``, the values are fetched as LazyVector proxies decoded on
+    first access. ORM attributes are deferred with the usual
+    ``deferred(Column(VECTOR(dim)))`` or
+    ``mapped_column(VECTOR(dim), deferred=True)``.
+
+    With ``normalized``, the bound values are L2-normalized client side and
+    ``cosine_distance`` is computed with the cheaper ``<#>`` operator, which
+    HNSW / IVFFlat indexes on the column use ``vector_ip_ops`` for.
+    """
+
     cache_ok = True
     _string = String()
 
-    def __init__(self, dim=None):
+    def __init__(self, dim=None, lazy=False, normalized=False):
         super(UserDefinedType, self).__init__()
         self.dim = dim
+        self.lazy = lazy
+        self.normalized = normalized
 
     def get_col_spec(self, **kw):
         if self.dim is None:
             return 'VECTOR'
         return 'VECTOR(%d)' % self.dim
 
+    def _unnormalized(self):
+        # sums and averages of unit vectors are not unit vectors
+        if not self.normalized:
+            return self
+        return VECTOR(self.dim, lazy=self.lazy)
+
+    def bind_rows(self, value, dialect=None):
+        """Encode a (n, dim) array, or a float32 buffer, to a list of bind
+        values in one pass, e.g. for an executemany INSERT. The values are
+        binary for a ``dialect`` binding the vectors with binary codecs.
+        """
+        if getattr(dialect, 'register_vector_codecs', False):
+            return Vector._to_db_binary_rows(value, self.dim, self.normalized)
+        return Vector._to_db_rows(value, self.dim, self.normalized)
+
     def bind_processor(self, dialect):
+        if getattr(dialect, 'register_vector_codecs', False):
+            # passed through by the binary codecs of the asyncpg dialect
+            def process(value):
+                return Vector._to_db_binary(value, self.dim, self.normalized)
+            return process
+
         def process(value):
-            return Vector._to_db(value, self.dim)
+            return Vector._to_db(value, self.dim, self.normalized)
         return process
 
     def literal_processor(self, dialect):
         string_literal_processor = self._string._cached_literal_processor(dialect)
 
         def process(value):
-            return string_literal_processor(Vector._to_db(value, self.dim))
+            return string_literal_processor(Vector._to_db(value, self.dim, self.normalized))
         return process
 
     def result_processor(self, dialect, coltype):
+        if self.lazy:
+            def process(value):
+                # the asyncpg codec returns decoded ndarrays
+                if value is None or not isinstance(value, str):
+                    return value
+                return LazyVector(value)
+            return process
+
         def process(value):
             return Vector._from_db(value)
         return process
 
     class comparator_factory(UserDefinedType.Comparator):
+        def _adapt_expression(self, op, other_comparator):
+            op, type_ = super()._adapt_expression(op, other_comparator)
+            if isinstance(type_, VECTOR):
+                type_ = type_._unnormalized()
+            return op, type_
+
         def l2_distance(self, other):
             return self.op('<->', return_type=Float)(other)
 
@@ -50,11 +101,65 @@ class VECTOR(UserDefinedType):
             return self.op('<#>', return_type=Float)(other)
 
         def cosine_distance(self, other):
+            if self.type.normalized:
+                # 1 - a . b == 1 + (a <#> b) for unit vectors, kept as a bare
+                # <#> so that an ORDER BY can use the index
+                return self.op('<#>', return_type=_NormalizedCosineDistance)(other)
             return self.op('<=>', return_type=Float)(other)
 
         def l1_distance(self, other):
             return self.op('<+>', return_type=Float)(other)
 
 
+class _NormalizedCosineDistance(TypeDecorator):
+    """``<#>`` of normalized vectors, fetched and compared as the cosine
+    distance, i.e. offset by 1. Arithmetic operates on the ``<#>`` value.
+    """
+
+    impl = Float
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else value - 1
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else value + 1
+
+    class comparator_factory(TypeDecorator.Comparator):
+        _arithmetic_ops = frozenset([
+            operators.add, operators.sub, operators.mul, operators.truediv,
+            operators.floordiv, operators.mod, operators.neg,
+        ])
+
+        def operate(self, op, *other, **kwargs):
+            if op in self._arithmetic_ops:
+                return op(type_coerce(self.expr, Float()), *other, **kwargs)
+            return super().operate(op, *other, **kwargs)
+
+        def reverse_operate(self, op, other, **kwargs):
+            if op in self._arithmetic_ops:
+                return op(other, type_coerce(self.expr, Float()), **kwargs)
+            return super().reverse_operate(op, other, **kwargs)
+
+
+def vector_rows(column, value, bind=None, **columns):
+    """Return the parameters of an executemany INSERT of a (n, dim) array
+    into the VECTOR ``column``, with the other ``columns`` given as sequences
+    of n values::
+
+        conn.execute(insert(items), vector_rows(items.c.embedding, embeddings, conn, id=ids))
+
+    ``bind`` is the dialect, or the engine or connection, the parameters are
+    executed with. The rows are encoded to the binary format for the asyncpg
+    dialect with vector codecs, and to text otherwise.
+    """
+    rows = column.type.bind_rows(value, getattr(bind, 'dialect', bind))
+    keys = list(columns)
+    return [
+        dict(zip(keys, values), **{column.key: row})
+        for row, values in zip(rows, zip(*columns.values()) if keys else iter(tuple, None))
+    ]
+
+
 # for reflection
 ischema_names['vector'] = VECTOR
@@ -8,11 +8,23 @@
 # the MIT License: https://www.opensource.org/licenses/mit-license.php
 
 from .bit import Bit
+from .halfvec import HalfVector
 from .sparsevec import SparseVector
-from .vector import Vector
+from .vector import LazyVector, Vector
+from .distance import hamming_distance, jaccard_distance, pack_bits, top_k
+from .quantize import binary_quantize, scalar_quantize, scalar_dequantize
 
 __all__ = [
     'Vector',
+    'LazyVector',
     'Bit',
-    'SparseVector'
+    'HalfVector',
+    'SparseVector',
+    'binary_quantize',
+    'scalar_quantize',
+    'scalar_dequantize',
+    'hamming_distance',
+    'jaccard_distance',
+    'pack_bits',
+    'top_k'
 ]
\ No newline at end of file
@@ -12,63 +12,113 @@ from struct import pack, unpack_from
 
 
 class Bit:
+    __slots__ = ('_data', '_length')
+
     def __init__(self, value):
         if isinstance(value, str):
-            self._value = self.from_text(value)._value
+            value = self.from_text(value)
+            self._data = value._data
+            self._length = value._length
+            return
+
+        if isinstance(value, np.ndarray):
+            if value.dtype == np.uint8:
+                if value.ndim != 1:
+                    raise ValueError('expected ndim to be 1')
+
+                self._data = value
+                self._length = len(value) * 8
+                return
+            elif value.dtype != np.bool_:
+                raise ValueError('expected dtype to be bool or uint8')
         else:
-            if isinstance(value, np.ndarray):
-                if value.dtype == np.uint8:
-                    value = np.unpackbits(value).astype(bool)
-                elif value.dtype != np.bool_:
-                    raise ValueError('expected dtype to be bool or uint8')
-            else:
-                value = np.asarray(value, dtype=bool)
+            value = np.asarray(value, dtype=bool)
 
-            if value.ndim != 1:
-                raise ValueError('expected ndim to be 1')
+        if value.ndim != 1:
+            raise ValueError('expected ndim to be 1')
 
-            self._value = value
+        self._data = np.packbits(value)
+        self._length = len(value)
 
     def __repr__(self):
         return f'Bit({self.to_text()})'
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return np.array_equal(self.to_numpy(), other.to_numpy())
+            return self._length == other._length and np.array_equal(self._data, other._data)
         return False
 
     def to_list(self):
-        return self._value.tolist()
+        return self.to_numpy().tolist()
 
     def to_numpy(self):
-        return self._value
+        return np.unpackbits(self._data, count=self._length).view(np.bool_)
 
     def to_text(self):
-        return ''.join(self._value.astype(np.uint8).astype(str))
+        bits = np.unpackbits(self._data, count=self._length)
+        bits += ord('0')
+        return bits.tobytes().decode('ascii')
 
     def to_binary(self):
-        return pack('>i', len(self._value)) + np.packbits(self._value).tobytes()
+        return pack('>i', self._length) + self._data.tobytes()
 
     @classmethod
     def from_text(cls, value):
-        return cls(np.asarray([v != '0' for v in value], dtype=bool))
+        bits = np.frombuffer(value.encode('ascii'), dtype=np.uint8) != ord('0')
+        return cls._from_parts(np.packbits(bits), len(bits))
 
     @classmethod
     def from_binary(cls, value):
         count = unpack_from('>i', value)[0]
-        buf = np.frombuffer(value, dtype=np.uint8, offset=4)
-        return cls(np.unpackbits(buf, count=count).astype(bool))
+        # a read-only view on value, no copy
+        data = np.frombuffer(value, dtype=np.uint8, count=(count + 7) // 8, offset=4)
+        return cls._from_parts(data, count)
+
+    @classmethod
+    def _from_parts(cls, data, length):
+        bit = cls.__new__(cls)
+        bit._data = data
+        bit._length = length
+        return bit
 
     @classmethod
-    def _to_db(cls, value):
+    def _to_db(cls, value, length=None):
+        if value is None:
+            return value
+
         if not isinstance(value, cls):
-            raise ValueError('expected bit')
+            value = cls(value)
+
+        if length is not None and value._length != length:
+            raise ValueError('expected %d bits, not %d' % (length, value._length))
 
         return value.to_text()
 
     @classmethod
-    def _to_db_binary(cls, value):
-        if not isinstance(value, cls):
-            raise ValueError('expected bit')
+    def _to_db_binary(cls, value, length=None):
+        if value is None:
+            return value
+
+        if isinstance(value, (bytes, bytearray)):
+            value = cls.from_binary(value)
+        elif not isinstance(value, cls):
+            value = cls(value)
+
+        if length is not None and value._length != length:
+            raise ValueError('expected %d bits, not %d' % (length, value._length))
 
         return value.to_binary()
+
+    @classmethod
+    def _from_db(cls, value):
+        if value is None or isinstance(value, cls):
+            return value
+
+        return cls.from_text(value)
+
+    @classmethod
+    def _from_db_binary(cls, value):
+        if value is None or isinstance(value, cls):
+            return value
+
+        return cls.from_binary(value)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2021-2025 Andrew Kane
+# <see AUTHORS file>
+#
+# Copyright (C) 2021-2022 Huawei Technologies Co.,Ltd.
+#
+# This module is part of pgvector-python and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+import numpy as np
+
+from .bit import Bit
+
+_BLOCK_BYTES = 1 << 25
+
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(value):
+    if hasattr(np, 'bitwise_count'):
+        # numpy 2.0+
+        return np.bitwise_count(value)
+    return _POPCOUNT_TABLE[value]
+
+
+def pack_bits(values):
+    """Return a (n, bytes) uint8 matrix of packed bits.
+
+    ``values`` is a sequence of Bit of the same length, a (n, bits) bool
+    matrix, or an already packed uint8 matrix / single uint8 row.
+    """
+    if isinstance(values, np.ndarray):
+        if values.dtype == np.bool_:
+            values = np.packbits(values, axis=-1)
+        elif values.dtype != np.uint8:
+            raise ValueError('expected dtype to be bool or uint8')
+    elif isinstance(values, Bit):
+        values = values._data
+    else:
+        values = np.stack([Bit._from_db(v)._data if isinstance(v, str) else v._data for v in values])
+
+    if values.ndim == 1:
+        values = values[np.newaxis]
+    if values.ndim != 2:
+        raise ValueError('expected ndim to be 2')
+    return values
+
+
+def _pairwise(bits, queries, kernel):
+    bits = pack_bits(bits)
+    single = isinstance(queries, Bit) or (isinstance(queries, np.ndarray) and queries.ndim == 1)
+    queries = pack_bits(queries)
+    if queries.shape[1] != bits.shape[1]:
+        raise ValueError('expected %d bytes, not %d' % (bits.shape[1], queries.shape[1]))
+
+    # bound the memory of the broadcast (queries, rows, bytes) intermediate
+    block = max(1, _BLOCK_BYTES // max(1, bits.size))
+    result = None
+    for i in range(0, len(queries), block):
+        distances = kernel(bits[np.newaxis], queries[i:i + block, np.newaxis])
+        if result is None:
+            result = np.empty((len(queries), len(bits)), dtype=distances.dtype)
+        result[i:i + block] = distances
+    return result[0] if single else result
+
+
+def _hamming(bits, queries):
+    return _popcount(bits ^ queries).sum(axis=-1, dtype=np.int64)
+
+
+def _jaccard(bits, queries):
+    intersection = _popcount(bits & queries).sum(axis=-1, dtype=np.int64)
+    union = _popcount(bits | queries).sum(axis=-1, dtype=np.int64)
+    distance = np.ones(intersection.shape, dtype=np.float64)
+    np.subtract(1, intersection / np.maximum(union, 1), out=distance, where=intersection != 0)
+    return distance
+
+
+def hamming_distance(bits, queries):
+    """Hamming distances between packed bit rows and one or many queries.
+
+    Return a (n,) array for a single query (a Bit or a 1-d uint8 row) or a
+    (m, n) array for m queries, like the ``<~>`` operator.
+    """
+    return _pairwise(bits, queries, _hamming)
+
+
+def jaccard_distance(bits, queries):
+    """Jaccard distances between packed bit rows and one or many queries.
+
+    Same shapes as hamming_distance, like the ``<%>`` operator, which is 1
+    when the bits have no bit set in common.
+    """
+    return _pairwise(bits, queries, _jaccard)
+
+
+def top_k(distances, k):
+    """Return the indices and distances of the k smallest distances along the
+    last axis, sorted by distance.
+    """
+    distances = np.asarray(distances)
+    k = min(k, distances.shape[-1])
+    if k < distances.shape[-1]:
+        indices = np.argpartition(distances, k - 1, axis=-1)[..., :k]
+    else:
+        indices = np.broadcast_to(np.arange(k), distances.shape)
+    selected = np.take_along_axis(distances, indices, axis=-1)
+    order = np.argsort(selected, axis=-1, kind='stable')
+    return np.take_along_axis(indices, order, axis=-1), np.take_along_axis(selected, order, axis=-1)
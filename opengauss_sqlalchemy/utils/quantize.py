@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2021-2025 Andrew Kane
+# <see AUTHORS file>
+#
+# Copyright (C) 2021-2022 Huawei Technologies Co.,Ltd.
+#
+# This module is part of pgvector-python and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+import numpy as np
+
+from .bit import Bit
+
+
+def _as_matrix(embeddings):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if embeddings.ndim != 2:
+        raise ValueError('expected ndim to be 2')
+    return embeddings
+
+
+def binary_quantize(embeddings):
+    """Return one Bit per row of a (n, dim) matrix, with the bits of the
+    positive values set, as done by the binary_quantize() server function.
+    """
+    embeddings = _as_matrix(embeddings)
+    packed = np.packbits(embeddings > 0, axis=1)
+    dim = embeddings.shape[1]
+    return [Bit._from_parts(row, dim) for row in packed]
+
+
+def scalar_quantize(embeddings, low=None, high=None):
+    """Quantize a (n, dim) matrix to int8 codes.
+
+    Each dimension is mapped linearly from [low, high] to [-128, 127], where
+    low and high default to the per dimension minimum and maximum of the
+    matrix. Return the codes together with low and high, which are needed by
+    scalar_dequantize and to quantize queries the same way.
+    """
+    embeddings = _as_matrix(embeddings)
+    low = embeddings.min(axis=0) if low is None else np.asarray(low, dtype=np.float32)
+    high = embeddings.max(axis=0) if high is None else np.asarray(high, dtype=np.float32)
+
+    scale = (high - low) / 255
+    # low and high can be scalars
+    scale = np.where(scale == 0, 1, scale)
+    codes = np.rint((embeddings - low) / scale)
+    np.clip(codes, 0, 255, out=codes)
+    codes -= 128
+    return codes.astype(np.int8), low, high
+
+
+def scalar_dequantize(codes, low, high):
+    scale = (np.asarray(high, dtype=np.float32) - low) / 255
+    return (np.asarray(codes, dtype=np.float32) + 128) * scale + low
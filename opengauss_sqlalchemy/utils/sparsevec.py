@@ -146,13 +146,20 @@ class SparseVector:
         return value.to_text()
 
     @classmethod
-    def _to_db_binary(cls, value):
+    def _to_db_binary(cls, value, dim=None):
         if value is None:
             return value
 
-        if not isinstance(value, cls):
+        if isinstance(value, (bytes, bytearray)):
+            value = cls.from_binary(value)
+        elif isinstance(value, str):
+            value = cls.from_text(value)
+        elif not isinstance(value, cls):
             value = cls(value)
 
+        if dim is not None and value.dimensions() != dim:
+            raise ValueError('expected %d dimensions, not %d' % (dim, value.dimensions()))
+
         return value.to_binary()
 
     @classmethod
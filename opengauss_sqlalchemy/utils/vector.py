@@ -12,6 +12,101 @@ from struct import pack, unpack_from
 import ast
 
 
+class VectorText(str):
+    """Text of a vector already encoded by Vector._to_db_rows, passed
+    through as is by Vector._to_db.
+    """
+
+    __slots__ = ()
+
+
+class VectorBinary(bytes):
+    """Binary vector already encoded by Vector._to_db_binary_rows, not
+    normalized again by Vector._to_db_binary.
+    """
+
+    __slots__ = ()
+
+
+def _as_rows(value, dim=None):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        if dim is None:
+            raise ValueError('expected dimensions for a buffer')
+        value = np.frombuffer(value, dtype=np.float32)
+    value = np.asarray(value, dtype=np.float32)
+
+    if value.ndim == 1 and dim is not None:
+        if value.size % dim:
+            raise ValueError('expected a multiple of %d values, not %d' % (dim, value.size))
+        value = value.reshape(-1, dim)
+    if value.ndim != 2:
+        raise ValueError('expected ndim to be 2')
+    if dim is not None and value.shape[1] != dim:
+        raise ValueError('expected %d dimensions, not %d' % (dim, value.shape[1]))
+    return value
+
+
+def _normalize_rows(value):
+    norms = np.linalg.norm(value, axis=1, keepdims=True)
+    # zero vectors are left as is
+    return np.divide(value, norms, out=np.zeros_like(value), where=norms > 0)
+
+
+class LazyVector:
+    """Text of a vector fetched from the database, decoded to a float32
+    ndarray on first access.
+    """
+
+    __slots__ = ('_text', '_value')
+
+    def __init__(self, text):
+        self._text = text
+        self._value = None
+
+    def to_numpy(self):
+        if self._value is None:
+            self._value = Vector._from_db(self._text)
+            self._text = None
+        return self._value
+
+    @property
+    def is_decoded(self):
+        return self._value is not None
+
+    def to_list(self):
+        return self.to_numpy().tolist()
+
+    def dimensions(self):
+        return len(self.to_numpy())
+
+    def __array__(self, dtype=None, copy=None):
+        value = self.to_numpy()
+        if dtype is not None and value.dtype != dtype:
+            return value.astype(dtype)
+        return value.copy() if copy else value
+
+    def __len__(self):
+        return self.dimensions()
+
+    def __iter__(self):
+        return iter(self.to_numpy())
+
+    def __getitem__(self, index):
+        return self.to_numpy()[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (LazyVector, np.ndarray)):
+            return np.array_equal(self.to_numpy(), np.asarray(other))
+        return False
+
+    __hash__ = None
+
+    def __repr__(self):
+        if self._value is None:
+            return 'LazyVector(<not decoded>)'
+        return 'LazyVector(%s)' % self.to_list()
+
+
 class Vector:
     def __init__(self, value):
         if isinstance(value, str):
@@ -61,26 +156,96 @@ class Vector:
         return cls(np.frombuffer(value, dtype='>f4', count=dim, offset=4))
 
     @classmethod
-    def _to_db(cls, value, dim=None):
-        if value is None:
+    def _to_db(cls, value, dim=None, normalize=False):
+        if value is None or isinstance(value, VectorText):
+            return value
+
+        if isinstance(value, LazyVector) and not value.is_decoded:
+            # still the text fetched from the database
+            value = value._text
+            if dim is not None and value.count(',') + 1 != dim:
+                raise ValueError('expected %d dimensions, not %d' % (dim, value.count(',') + 1))
             return value
 
-        if not isinstance(value, cls):
+        if isinstance(value, (bytes, bytearray)):
+            # a row encoded by _to_db_binary_rows
+            value = cls.from_binary(cls._check_binary(value))
+        elif not isinstance(value, cls):
             value = cls(value)
 
         if dim is not None and value.dimensions() != dim:
             raise ValueError('expected %d dimensions, not %d' % (dim, value.dimensions()))
 
+        if normalize:
+            return cls._to_db_rows(value.to_numpy()[np.newaxis], normalize=True)[0]
         return value.to_text()
 
     @classmethod
-    def _to_db_binary(cls, value):
+    def _to_db_rows(cls, value, dim=None, normalize=False):
+        """Encode the rows of a (n, dim) array, or of a float32 buffer, to
+        text in one pass, with the dimensions checked once and the rows
+        L2-normalized if ``normalize``.
+        """
+        value = _as_rows(value, dim)
+        if normalize:
+            value = _normalize_rows(value)
+        # 9 significant digits round-trip float32 and format faster than repr
+        fmt = '[' + ','.join(['%.9g'] * value.shape[1]) + ']'
+        return [VectorText(fmt % tuple(row)) for row in value.tolist()]
+
+    @classmethod
+    def _to_db_binary_rows(cls, value, dim=None, normalize=False):
+        """Encode the rows of a (n, dim) array, or of a float32 buffer, to
+        the binary format in one pass, with the dimensions checked once and
+        the rows L2-normalized if ``normalize``.
+        """
+        value = _as_rows(value, dim)
+        if normalize:
+            value = _normalize_rows(value)
+        n, dim = value.shape
+        width = 4 + 4 * dim
+        buf = np.empty((n, width), dtype=np.uint8)
+        buf[:, :4] = np.frombuffer(pack('>HH', dim, 0), dtype=np.uint8)
+        buf[:, 4:] = value.astype('>f4').view(np.uint8).reshape(n, -1)
+        data = memoryview(buf.tobytes())
+        return [VectorBinary(data[i:i + width]) for i in range(0, n * width, width)]
+
+    @classmethod
+    def _check_binary(cls, value, dim=None):
+        if len(value) < 4:
+            raise ValueError('expected a binary vector of at least 4 bytes, not %d' % len(value))
+        size, unused = unpack_from('>HH', value)
+        if len(value) != 4 + 4 * size:
+            raise ValueError('expected %d bytes for %d dimensions, not %d' % (4 + 4 * size, size, len(value)))
+        if dim is not None and size != dim:
+            raise ValueError('expected %d dimensions, not %d' % (dim, size))
+        return value
+
+    @classmethod
+    def _to_db_binary(cls, value, dim=None, normalize=False):
         if value is None:
             return value
 
-        if not isinstance(value, cls):
+        if isinstance(value, (bytes, bytearray)):
+            cls._check_binary(value, dim)
+            if isinstance(value, VectorBinary):
+                return value
+            if not normalize:
+                return bytes(value)
+            value = cls.from_binary(value)
+        elif isinstance(value, str):
+            # the text form, e.g. of the rows encoded by _to_db_rows
+            value = cls.from_text(value)
+        elif isinstance(value, LazyVector) and not value.is_decoded:
+            value = cls.from_text(value._text)
+        elif not isinstance(value, cls):
             value = cls(value)
 
+        if dim is not None and value.dimensions() != dim:
+            raise ValueError('expected %d dimensions, not %d' % (dim, value.dimensions()))
+
+        if normalize:
+            return cls._to_db_binary_rows(value.to_numpy()[np.newaxis], normalize=True)[0]
         return value.to_binary()
 
     @classmethod
@@ -90,6 +255,26 @@ class Vector:
 
         return cls.from_text(value).to_numpy().astype(np.float32)
 
+    @classmethod
+    def _from_db_rows(cls, values, dim=None):
+        """Decode the texts of vectors to one (n, dim) float32 matrix, NULLs
+        being rows of NaN.
+        """
+        if dim is None:
+            dim = next((value.count(',') + 1 for value in values if value is not None), 0)
+        for value in values:
+            if value is not None and value.count(',') != dim - 1:
+                raise ValueError('expected %d dimensions, not %d' % (dim, value.count(',') + 1))
+        null = ','.join(['nan'] * dim)
+        text = ','.join(null if value is None else value[1:-1] for value in values)
+        if not text:
+            return np.empty((len(values), dim), dtype=np.float32)
+        try:
+            matrix = np.fromiter(map(float, text.split(',')), dtype=np.float32, count=len(values) * dim)
+        except ValueError as error:
+            raise ValueError('invalid vector text: %s' % error)
+        return matrix.reshape(len(values), dim)
+
     @classmethod
     def _from_db_binary(cls, value):
         if value is None or isinstance(value, np.ndarray):
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2005-2022 the SQLAlchemy authors and contributors
+# <see AUTHORS file>
+#
+# Copyright (C) 2025-2025 Huawei Technologies Co.,Ltd.
+#
+# This module is part of SQLAlchemy and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+from sqlalchemy import Column, Integer, MetaData, select, Table
+from sqlalchemy.testing import fixtures
+from sqlalchemy.testing.assertions import assert_raises_message, eq_
+
+from opengauss_sqlalchemy import asyncpg
+from opengauss_sqlalchemy.usertype import BIT, HALFVEC, SPARSEVEC, VECTOR, vector_rows
+from opengauss_sqlalchemy.utils import Bit, HalfVector, LazyVector, SparseVector, Vector
+from opengauss_sqlalchemy.utils.vector import VectorText
+
+items = Table("items", MetaData(), Column("id", Integer, primary_key=True), Column("embedding", VECTOR(3)))
+
+
+class VectorCodecTest(fixtures.TestBase):
+    def _connection(self, types):
+        asyncpg_connection = mock.Mock()
+        oids = {"vector": 16385, "halfvec": 16390, "sparsevec": 16395}
+        asyncpg_connection.fetch = mock.AsyncMock(return_value=[(t, oids.get(t, t)) for t in types])
+        asyncpg_connection.set_type_codec = mock.AsyncMock()
+        return mock.Mock(_connection=asyncpg_connection)
+
+    def test_setup_vector_codecs(self):
+        dialect = asyncpg.dialect()
+        conn = self._connection(["sparsevec", "vector"])
+        asyncio.run(dialect.setup_asyncpg_vector_codecs(conn))
+        calls = conn._connection.set_type_codec.mock_calls
+        eq_([c.args[0] for c in calls], ["vector", "sparsevec", "bit"])
+        eq_(calls[0].kwargs, {
+            "schema": "pg_catalog",
+            "encoder": Vector._to_db_binary,
+            "decoder": Vector._from_db_binary,
+            "format": "binary",
+        })
+        eq_(calls[1].kwargs["decoder"], SparseVector._from_db_binary)
+        eq_(calls[2].kwargs["encoder"], Bit._to_db_binary)
+
+        # the types of the shared cache are checked against the OIDs of the
+        # server: sparsevec was dropped, vector created again
+        dialect._type_cache.update({
+            ("vector", "pg_catalog"): {"oid": 16000},
+            ("sparsevec", "pg_catalog"): {"oid": 16395},
+            ("bit", "pg_catalog"): {"oid": 1560},
+        })
+        other = self._connection(["vector"])
+        asyncio.run(dialect.setup_asyncpg_vector_codecs(other))
+        eq_(other._connection.fetch.call_count, 1)
+        eq_([c.args[0] for c in other._connection.set_type_codec.mock_calls], ["vector", "bit"])
+        eq_(dialect._type_cache, {("bit", "pg_catalog"): {"oid": 1560}})
+
+        dialect._type_cache[("vector", "pg_catalog")] = {"oid": 16385}
+        asyncio.run(dialect.setup_asyncpg_vector_codecs(self._connection(["vector"])))
+        eq_(dialect._type_cache[("vector", "pg_catalog")], {"oid": 16385})
+
+    def _codecs(self, dialect):
+        conn = self._connection(["vector", "halfvec", "sparsevec"])
+        asyncio.run(dialect.setup_asyncpg_vector_codecs(conn))
+        return {c.args[0]: c.kwargs for c in conn._connection.set_type_codec.mock_calls}
+
+    def _round_trip(self, dialect, codecs, typename, type_, value):
+        # bind processor -> asyncpg encoder -> wire -> asyncpg decoder -> result processor
+        data = codecs[typename]["encoder"](type_.bind_processor(dialect)(value))
+        assert isinstance(data, bytes)
+        return type_.result_processor(dialect, None)(codecs[typename]["decoder"](data))
+
+    def test_round_trip_through_codecs(self):
+        dialect = asyncpg.dialect()
+        codecs = self._codecs(dialect)
+
+        for value in ([1.5, 2, 3], np.array([1.5, 2, 3]), Vector([1.5, 2, 3]), VectorText("[1.5,2,3]")):
+            result = self._round_trip(dialect, codecs, "vector", VECTOR(3), value)
+            eq_(result.dtype, np.float32)
+            eq_(result.tolist(), [1.5, 2, 3])
+        row = Vector._to_db_binary_rows([[1.5, 2, 3]])[0]
+        eq_(self._round_trip(dialect, codecs, "vector", VECTOR(3), row).tolist(), [1.5, 2, 3])
+        assert np.allclose(self._round_trip(dialect, codecs, "vector", VECTOR(2, normalized=True), [3, 4]), [0.6, 0.8])
+        eq_(self._round_trip(dialect, codecs, "vector", VECTOR(3, lazy=True), LazyVector("[1,2,3]")).tolist(), [1, 2, 3])
+        assert_raises_message(
+            ValueError, "expected 4 dimensions, not 3", VECTOR(4).bind_processor(dialect), [1, 2, 3]
+        )
+
+        for value in ([1.5, 2, 3], np.array([1.5, 2, 3], dtype=np.float16), HalfVector([1.5, 2, 3])):
+            result = self._round_trip(dialect, codecs, "halfvec", HALFVEC(3), value)
+            eq_(result.dtype, np.float16)
+            eq_(result.tolist(), [1.5, 2, 3])
+        assert_raises_message(
+            ValueError, "expected 4 dimensions, not 3", HALFVEC(4).bind_processor(dialect), [1, 2, 3]
+        )
+
+        for value in ([1.5, 0, 3], SparseVector({0: 1.5, 2: 3}, 3)):
+            eq_(self._round_trip(dialect, codecs, "sparsevec", SPARSEVEC(3), value), SparseVector({0: 1.5, 2: 3}, 3))
+        assert_raises_message(
+            ValueError, "expected 4 dimensions, not 3", SPARSEVEC(4).bind_processor(dialect), [1, 0, 3]
+        )
+
+        for value in ("101", [True, False, True], Bit("101")):
+            eq_(self._round_trip(dialect, codecs, "bit", BIT(3), value).to_text(), "101")
+
+    def test_vector_rows_binary(self):
+        dialect = asyncpg.dialect()
+        codecs = self._codecs(dialect)
+        connection = mock.Mock(dialect=dialect)
+        params = vector_rows(items.c.embedding, np.array([[1.5, 2, 3], [4, 5, 6]]), connection, id=[7, 8])
+        eq_([p["id"] for p in params], [7, 8])
+        process = VECTOR(3).bind_processor(dialect)
+        with mock.patch.object(Vector, "from_text") as from_text, mock.patch.object(Vector, "from_binary") as from_binary:
+            data = [process(p["embedding"]) for p in params]
+        # the rows are passed through as encoded, not parsed again
+        eq_(from_text.call_count + from_binary.call_count, 0)
+        eq_([Vector._from_db_binary(codecs["vector"]["encoder"](d)).tolist() for d in data], [[1.5, 2, 3], [4, 5, 6]])
+
+        rows = VECTOR(2, normalized=True).bind_rows([[3, 4]], dialect)
+        assert VECTOR(2, normalized=True).bind_processor(dialect)(rows[0]) is rows[0]
+        assert np.allclose(Vector._from_db_binary(rows[0]), [0.6, 0.8])
+        eq_(VECTOR(3).bind_rows([[1, 2, 3]], asyncpg.dialect(register_vector_codecs=False)), ["[1,2,3]"])
+
+    def test_encoders_accept_text(self):
+        # values bound as text, e.g. with register_vector_codecs=False and
+        # opengauss_sqlalchemy.register_async.register_vector
+        eq_(Vector._from_db_binary(Vector._to_db_binary("[1.5,2,3]")).tolist(), [1.5, 2, 3])
+        eq_(HalfVector._from_db_binary(HalfVector._to_db_binary("[1.0,2.0,3.0]")).tolist(), [1, 2, 3])
+        eq_(SparseVector._from_db_binary(SparseVector._to_db_binary("{1:1.0,3:3.0}/3")), SparseVector({0: 1, 2: 3}, 3))
+
+    def test_text_binds_without_codecs(self):
+        dialect = asyncpg.dialect(register_vector_codecs=False)
+        eq_(VECTOR(3).bind_processor(dialect)([1.5, 2, 3]), "[1.5,2.0,3.0]")
+        eq_(HALFVEC(3).bind_processor(dialect)([1.5, 2, 3]), "[1.5,2.0,3.0]")
+        eq_(SPARSEVEC(3).bind_processor(dialect)([1.5, 0, 3]), "{1:1.5,3:3.0}/3")
+
+    def test_type_cache_connection_class(self):
+        introspected = []
+
+        class Connection:
+            async def _introspect_type(self, typename, schema):
+                introspected.append((typename, schema))
+                return {"oid": len(introspected)}
+
+        type_cache = {}
+        cls = asyncpg._type_cache_connection_class(mock.Mock(Connection=Connection), type_cache)
+
+        async def introspect():
+            return [
+                await cls()._introspect_type("vector", "pg_catalog"),
+                await cls()._introspect_type("vector", "pg_catalog"),
+                await cls()._introspect_type("bit", "pg_catalog"),
+            ]
+
+        eq_(asyncio.run(introspect()), [{"oid": 1}, {"oid": 1}, {"oid": 2}])
+        eq_(introspected, [("vector", "pg_catalog"), ("bit", "pg_catalog")])
+        eq_(type_cache, {("vector", "pg_catalog"): {"oid": 1}, ("bit", "pg_catalog"): {"oid": 2}})
+
+    def test_connect_connection_class(self):
+        dialect = asyncpg.dialect()
+        dialect.dbapi = mock.Mock()
+        dialect.dbapi.asyncpg.Connection = type("Connection", (), {"_introspect_type": None})
+        dialect.connect(host="localhost")
+        dialect.connect(host="localhost")
+        first, second = dialect.dbapi.connect.mock_calls
+        connection_class = first.kwargs["connection_class"]
+        assert issubclass(connection_class, dialect.dbapi.asyncpg.Connection)
+        assert second.kwargs["connection_class"] is connection_class
+
+        dialect.connect(async_creator_fn=mock.Mock())
+        assert "connection_class" not in dialect.dbapi.connect.mock_calls[-1].kwargs
+
+    def test_connection_class_without_introspect_type(self):
+        # asyncpg without the private method: no cache, the default class
+        dialect = asyncpg.dialect()
+        dialect.dbapi = mock.Mock()
+        dialect.dbapi.asyncpg.Connection = type("Connection", (), {})
+        dialect.connect(host="localhost")
+        assert "connection_class" not in dialect.dbapi.connect.mock_calls[0].kwargs
+
+    def test_disabled(self):
+        dialect = asyncpg.dialect(register_vector_codecs=False)
+        dialect.dbapi = mock.Mock()
+        dialect.connect(host="localhost")
+        assert "connection_class" not in dialect.dbapi.connect.mock_calls[0].kwargs
+        super_connect = mock.Mock()
+        with mock.patch.object(asyncpg.PGDialect_asyncpg, "on_connect", return_value=super_connect):
+            assert dialect.on_connect() is super_connect
+
+
+class FakeStreamResult(object):
+    def __init__(self, rows, fail_after=None):
+        self.rows = rows
+        self.fail_after = fail_after
+        self.fetched = 0
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+
+    async def partitions(self, size):
+        for start in range(0, len(self.rows), size):
+            if self.fail_after is not None and self.fetched >= self.fail_after:
+                raise RuntimeError("connection lost")
+            self.fetched += 1
+            await asyncio.sleep(0)
+            yield self.rows[start:start + size]
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super(CountingExecutor, self).submit(*args, **kwargs)
+
+
+class StreamVectorsTest(fixtures.TestBase):
+    def _connection(self, rows, **kw):
+        self.result = FakeStreamResult(rows, **kw)
+        connection = mock.Mock()
+        connection.stream = mock.Mock(return_value=self.result)
+        return connection
+
+    def _rows(self, n):
+        return [(i, "[%d,%d,%d]" % (i, i + 1, i + 2)) for i in range(n)]
+
+    def test_batches(self):
+        connection = self._connection(self._rows(5) + [(5, None)])
+        executor = CountingExecutor(2)
+
+        async def run():
+            return [batch async for batch in asyncpg.stream_vectors(
+                connection, select(items.c.id, items.c.embedding), batch_size=4, executor=executor
+            )]
+
+        batches = asyncio.run(run())
+        executor.shutdown()
+        eq_([ids.tolist() for ids, _ in batches], [[0, 1, 2, 3], [4, 5]])
+        eq_(batches[0][1].dtype, np.float32)
+        eq_(batches[0][1].tolist(), [[0, 1, 2], [1, 2, 3], [2, 3, 4], [3, 4, 5]])
+        assert np.isnan(batches[1][1][1]).all()
+        eq_(executor.submitted, 2)
+
+        statement, = connection.stream.mock_calls[0].args
+        eq_(str(statement), "SELECT items.id, CAST(items.embedding AS TEXT) AS embedding \nFROM items")
+        eq_(statement.get_execution_options()["yield_per"], 4)
+
+    def test_backpressure(self):
+        connection = self._connection(self._rows(100))
+
+        async def run():
+            stream = asyncpg.stream_vectors(
+                connection, select(items.c.id, items.c.embedding), batch_size=10, max_buffered=2
+            )
+            await stream.__anext__()
+            # a slow consumer
+            for _ in range(50):
+                await asyncio.sleep(0)
+            fetched = self.result.fetched
+            await stream.aclose()
+            return fetched
+
+        # the batch consumed, 2 waiting in the queue and 1 waiting to be put
+        eq_(asyncio.run(run()), 4)
+        assert self.result.closed
+
+    def test_consumer_stops_early(self):
+        connection = self._connection(self._rows(100))
+        executor = CountingExecutor(1)
+
+        async def run():
+            async for ids, matrix in asyncpg.stream_vectors(
+                connection, select(items.c.id, items.c.embedding), batch_size=10, executor=executor
+            ):
+                for _ in range(50):
+                    await asyncio.sleep(0)
+                break
+
+        asyncio.run(run())
+        executor.shutdown()
+        assert self.result.closed
+        eq_(self.result.fetched, 4)
+
+    def test_error(self):
+        connection = self._connection(self._rows(30), fail_after=1)
+
+        async def run():
+            return [batch async for batch in asyncpg.stream_vectors(
+                connection, select(items.c.id, items.c.embedding), batch_size=10
+            )]
+
+        assert_raises_message(RuntimeError, "connection lost", asyncio.run, run())
+        assert self.result.closed
@@ -7,14 +7,19 @@
 # This module is part of SQLAlchemy and is released under
 # the MIT License: https://www.opensource.org/licenses/mit-license.php
 
+import datetime
+
 from sqlalchemy import (
-    and_, Column, exc, Float, func, Index, Integer, MetaData, Numeric, schema, String, Table, text
+    and_, Column, Date, exc, Float, func, Index, Integer, MetaData, Numeric, schema, String, Table, text
 )
 from sqlalchemy.testing import config
 from sqlalchemy.testing import fixtures
 from sqlalchemy.testing.assertions import assert_raises_message, AssertsCompiledSQL
 
 from opengauss_sqlalchemy import dc_psycopg2, psycopg2
+from opengauss_sqlalchemy.distribution import (
+    DEFAULT, DistributeByHash, DistributeByList, DistributeByRange, DistributeByReplication, MAXVALUE
+)
 
 
 class DDLCompilerTest(fixtures.TestBase, AssertsCompiledSQL):
@@ -594,6 +599,62 @@ class DDLCompilerTest_dc_psycopg2(DDLCompilerTest):
             "DISTRIBUTE BY LIST(distri_col) (SLICE s1 VALUES ('D1'), SLICE s2 VALUES (DEFAULT))",
         )
 
+    def test_create_table_distribute_by_typed_hash(self):
+        m = MetaData()
+        tbl = Table(
+            "atable",
+            m,
+            Column("id", Integer),
+            Column("User", Integer),
+            opengauss_distribute_by=DistributeByHash("id", "User"),
+        )
+        self.assert_compile(
+            schema.CreateTable(tbl),
+            'CREATE TABLE atable (id INTEGER, "User" INTEGER) '
+            'DISTRIBUTE BY HASH(id, "User")',
+        )
+        tbl = Table("btable", m, Column("undistributable_col", Float),
+                    opengauss_distribute_by=DistributeByReplication())
+        self.assert_compile(
+            schema.CreateTable(tbl),
+            "CREATE TABLE btable (undistributable_col FLOAT) DISTRIBUTE BY REPLICATION",
+        )
+
+    def test_create_table_distribute_by_typed_range(self):
+        m = MetaData()
+        tbl = Table(
+            "atable",
+            m,
+            Column("id", Integer),
+            Column("distri_col", Date),
+            opengauss_distribute_by=DistributeByRange(
+                "distri_col", slices=[("s1", datetime.date(2025, 1, 1)), ("s2", MAXVALUE)]
+            ),
+        )
+        self.assert_compile(
+            schema.CreateTable(tbl),
+            "CREATE TABLE atable (id INTEGER, distri_col DATE) "
+            "DISTRIBUTE BY RANGE(distri_col) (SLICE s1 VALUES LESS THAN ('2025-01-01'), "
+            "SLICE s2 VALUES LESS THAN (MAXVALUE))",
+        )
+
+    def test_create_table_distribute_by_typed_list(self):
+        m = MetaData()
+        tbl = Table(
+            "atable",
+            m,
+            Column("id", Integer),
+            Column("distri_col", String(16)),
+            opengauss_distribute_by=DistributeByList(
+                "distri_col", slices=[("s1", ["D1", "D'2"]), ("s2", DEFAULT)]
+            ),
+        )
+        self.assert_compile(
+            schema.CreateTable(tbl),
+            "CREATE TABLE atable (id INTEGER, distri_col VARCHAR(16)) "
+            "DISTRIBUTE BY LIST(distri_col) (SLICE s1 VALUES ('D1', 'D''2'), SLICE s2 VALUES (DEFAULT))",
+        )
+
     def test_create_table_without_distributable_column_float(self):
         m = MetaData()
         tbl = Table(
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2005-2022 the SQLAlchemy authors and contributors
+# <see AUTHORS file>
+#
+# Copyright (C) 2025-2025 Huawei Technologies Co.,Ltd.
+#
+# This module is part of SQLAlchemy and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+import threading
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.testing import fixtures, mock
+from sqlalchemy.testing.util import gc_collect
+from sqlalchemy.testing.assertions import assert_raises, eq_
+
+from opengauss_sqlalchemy.dc_psycopg2 import OpenGaussDialect_dc_psycopg2
+from opengauss_sqlalchemy.distribution import DistributeByHash, DistributeByReplication
+
+
+class Error(Exception):
+    pass
+
+
+class OperationalError(Error):
+    pass
+
+
+class CoordinatorLoadBalanceTest(fixtures.TestBase):
+    def _engine(self, url="opengauss+dc_psycopg2://scott:tiger@/test?host=a:1&host=b:2&host=c:3", **kw):
+        self.dbapi = mock.MagicMock(paramstyle="pyformat", Error=Error, OperationalError=OperationalError)
+        self.down = set()
+
+        def connect(*args, **kwargs):
+            if kwargs["host"] in self.down:
+                raise OperationalError("could not connect to server")
+            conn = mock.MagicMock()
+            conn.autocommit = False
+            conn.host = kwargs["host"]
+            return conn
+
+        self.dbapi.connect.side_effect = connect
+        return create_engine(url, module=self.dbapi, _initialize=False, load_balance=True, **kw)
+
+    def _hosts(self):
+        return [c.kwargs["host"] for c in self.dbapi.connect.mock_calls]
+
+    def _stats(self, engine, key):
+        return dict((s["host"], s[key]) for s in engine.dialect.coordinator_stats())
+
+    def test_spread_connections(self):
+        engine = self._engine(pool_size=6)
+        conns = [engine.connect() for _ in range(6)]
+        eq_(self._hosts(), ["a", "b", "c", "a", "b", "c"])
+        eq_([c.kwargs["port"] for c in self.dbapi.connect.mock_calls[:3]], ["1", "2", "3"])
+        eq_(self._stats(engine, "connections"), {"a": 2, "b": 2, "c": 2})
+
+        # the pool closes the connections it doesn't keep
+        conns[0].invalidate()
+        conns[1].invalidate()
+        eq_(self._stats(engine, "connections"), {"a": 1, "b": 1, "c": 2})
+        conns.extend([engine.connect(), engine.connect()])
+        eq_(self._hosts()[6:], ["a", "b"])
+
+    def test_failed_coordinator_backoff(self):
+        engine = self._engine(pool_size=4, coordinator_backoff=30)
+        self.down.add("a")
+        conns = [engine.connect() for _ in range(3)]
+        eq_(self._hosts(), ["a", "b", "c", "b"])
+        stats = engine.dialect.coordinator_stats()
+        eq_([(s["host"], s["failures"], s["available"]) for s in stats],
+            [("a", 1, False), ("b", 0, True), ("c", 0, True)])
+
+        # tried again once the backoff is over
+        self.down.clear()
+        for coordinator in engine.dialect._coordinators:
+            coordinator.available_at = 0.0
+        conns.append(engine.connect())
+        eq_(self._hosts()[-1], "a")
+        eq_(self._stats(engine, "failures"), {"a": 0, "b": 0, "c": 0})
+
+    def test_backoff_doubles(self):
+        engine = self._engine(coordinator_backoff=1, coordinator_max_backoff=3)
+        engine.connect()
+        coordinator = engine.dialect._coordinators[0]
+        with mock.patch("opengauss_sqlalchemy.dc_psycopg2.time.monotonic", return_value=100.0):
+            for expected in (101.0, 102.0, 103.0, 103.0):
+                engine.dialect._coordinator_failed(coordinator)
+                eq_(coordinator.available_at, expected)
+
+    def test_all_coordinators_down(self):
+        engine = self._engine()
+        self.down.update(["a", "b", "c"])
+        assert_raises(exc.OperationalError, engine.connect)
+        eq_(self._stats(engine, "failures"), {"a": 1, "b": 1, "c": 1})
+
+    def test_disconnect_marks_coordinator(self):
+        engine = self._engine()
+        conn = engine.connect()
+        dbapi_connection = conn.connection.dbapi_connection
+        with mock.patch(
+            "opengauss_sqlalchemy.psycopg2.OpenGaussDialect_psycopg2.is_disconnect", return_value=True
+        ):
+            assert engine.dialect.is_disconnect(Exception(), dbapi_connection, None)
+        eq_(self._stats(engine, "failures"), {"a": 1, "b": 0, "c": 0})
+
+    def test_check_coordinators(self):
+        engine = self._engine(coordinator_backoff=30)
+        engine.connect()
+        self.down.add("b")
+        stats = engine.dialect.check_coordinators()
+        eq_([(s["host"], s["failures"], s["available"]) for s in stats],
+            [("a", 0, True), ("b", 1, False), ("c", 0, True)])
+        eq_(self._hosts()[1:], ["a", "b", "c"])
+        eq_([c.kwargs["connect_timeout"] for c in self.dbapi.connect.mock_calls[1:]], [5, 5, 5])
+
+        # back before the end of its backoff
+        self.down.clear()
+        engine.dialect.check_coordinators()
+        eq_(self._stats(engine, "available"), {"a": True, "b": True, "c": True})
+        # the probe connections aren't counted
+        eq_(self._stats(engine, "connections"), {"a": 1, "b": 0, "c": 0})
+
+    def test_check_coordinators_interval(self):
+        engine = self._engine(coordinator_check_interval=0.01)
+        checked = threading.Event()
+        failed = []
+
+        def check_coordinators():
+            # a failed check is warned about and the next ones still run
+            if not failed:
+                failed.append(True)
+                raise RuntimeError("boom")
+            checked.set()
+
+        with mock.patch.object(OpenGaussDialect_dc_psycopg2, "check_coordinators", side_effect=check_coordinators), \
+                mock.patch("opengauss_sqlalchemy.dc_psycopg2.util.warn") as warn:
+            conn = engine.connect()
+            checker = engine.dialect._checker
+            assert checked.wait(5)
+            eq_(warn.mock_calls, [mock.call("Checking the coordinators failed: boom")])
+
+            # stopped once the engine is disposed of, started by the next connect
+            conn.close()
+            engine.dispose()
+            checker.join(5)
+            assert not checker.is_alive()
+            eq_(engine.dialect._checker, None)
+            conn = engine.connect()
+            assert engine.dialect._checker.is_alive()
+            conn.close()
+            engine.dispose()
+            engine.dialect._checker.join(5)
+
+    def test_connections_tracked_weakly(self):
+        engine = self._engine()
+        dialect = engine.dialect
+        dbapi_connection = dialect.connect(host="a,b,c", port="1,2,3")
+        eq_(list(dialect._coordinator_of.values()), [dialect._coordinators[0]])
+        del dbapi_connection
+        self.dbapi.connect.reset_mock()
+        gc_collect()
+        eq_(len(dialect._coordinator_of), 0)
+
+    def test_single_host(self):
+        engine = self._engine("opengauss+dc_psycopg2://scott:tiger@a:1/test")
+        conns = [engine.connect(), engine.connect()]
+        eq_(self._hosts(), ["a", "a"])
+        eq_(engine.dialect.coordinator_stats(), [])
+        for conn in conns:
+            conn.close()
+
+
+class DistributionReflectionTest(fixtures.TestBase):
+    def test_table_options(self):
+        dialect = OpenGaussDialect_dc_psycopg2()
+        dialect.default_schema_name = "public"
+        connection = mock.Mock()
+        connection.execute.return_value = [
+            ("orders", "H", ["customer_id"]),
+            ("regions", "R", []),
+            ("events", "G", ["created"]),
+            ("other", "H", ["id"]),
+        ]
+        with mock.patch(
+            "opengauss_sqlalchemy.psycopg2.OpenGaussDialect_psycopg2.get_multi_table_options",
+            return_value=[((None, name), {}) for name in ("orders", "regions", "events")],
+        ):
+            options = dict(dialect.get_multi_table_options(connection, None, None, None, None))
+        eq_(connection.execute.mock_calls[0].args[1], {"schema": "public"})
+        eq_(sorted(options), [(None, "events"), (None, "orders"), (None, "regions")])
+        distribute_by = options[(None, "orders")]["opengauss_distribute_by"]
+        assert isinstance(distribute_by, DistributeByHash)
+        eq_(distribute_by.columns, ("customer_id",))
+        assert isinstance(options[(None, "regions")]["opengauss_distribute_by"], DistributeByReplication)
+        eq_(options[(None, "events")], {})
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2005-2022 the SQLAlchemy authors and contributors
+# <see AUTHORS file>
+#
+# Copyright (C) 2025-2025 Huawei Technologies Co.,Ltd.
+#
+# This module is part of SQLAlchemy and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+from sqlalchemy import Column, exc, exists, Float, ForeignKey, Integer, MetaData, select, String, Table
+from sqlalchemy.testing import fixtures, mock
+from sqlalchemy.testing.assertions import assert_raises_message, eq_, expect_warnings
+
+from opengauss_sqlalchemy import distribution
+from opengauss_sqlalchemy.dc_psycopg2 import OpenGaussDialect_dc_psycopg2
+from opengauss_sqlalchemy.distribution import (
+    advise_distribution, analyze_colocation, check_skew, DistributeByHash, DistributeByReplication
+)
+
+m = MetaData()
+customers = Table(
+    "customers",
+    m,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(32)),
+)
+orders = Table(
+    "orders",
+    m,
+    Column("id", Integer, primary_key=True),
+    Column("customer_id", Integer, ForeignKey("customers.id")),
+    Column("status", String(8)),
+    Column("amount", Float),
+)
+
+
+class AdviseDistributionTest(fixtures.TestBase):
+    def test_distribute_by_is_abstract(self):
+        assert_raises_message(TypeError, "abstract", distribution.DistributeBy, "id")
+
+    def _distinct_ratio(self, reltuples, sample_rows):
+        connection = mock.Mock(dialect=OpenGaussDialect_dc_psycopg2())
+        connection.execute.return_value.scalar.return_value = reltuples
+        connection.execute.return_value.one.return_value = (50, 200)
+        eq_(distribution._distinct_ratio(connection, orders.c.status, sample_rows), 0.25)
+        estimate, statement = [c.args for c in connection.execute.mock_calls if c.args]
+        eq_(estimate[1], {"table": "orders"})
+        compiled = statement[0].compile(dialect=connection.dialect)
+        return str(compiled).replace("\n", ""), compiled.params
+
+    def test_distinct_ratio_random_sample(self):
+        sql, params = self._distinct_ratio(1000000.0, 200)
+        eq_(
+            sql,
+            "SELECT count(DISTINCT anon_1.value) AS count_1, count(*) AS count_2 FROM "
+            "(SELECT sample.status AS value FROM orders AS sample TABLESAMPLE bernoulli(%(bernoulli_1)s)  "
+            "LIMIT %(param_1)s) AS anon_1",
+        )
+        eq_(params, {"bernoulli_1": 0.02, "param_1": 200})
+
+    def test_distinct_ratio_small_table(self):
+        # tables smaller than the sample, or never analyzed, are read whole
+        for reltuples in (100.0, 0.0, None):
+            sql, params = self._distinct_ratio(reltuples, 200)
+            eq_(
+                sql,
+                "SELECT count(DISTINCT anon_1.value) AS count_1, count(*) AS count_2 FROM "
+                "(SELECT orders.status AS value FROM orders  LIMIT %(param_1)s) AS anon_1",
+            )
+
+    def _advise(self, table, distributions, distinct_ratios, **kw):
+        with mock.patch.object(distribution, "_datanode_count", return_value=4), \
+                mock.patch.object(distribution, "_hash_distribution",
+                                  side_effect=lambda conn, t, col, n: distributions[col.name]) as hash_distribution, \
+                mock.patch.object(distribution, "_distinct_ratio",
+                                  side_effect=lambda conn, col, n: distinct_ratios[col.name]):
+            result = advise_distribution(mock.Mock(), table, **kw)
+        self.sampled = [c.args[2].name for c in hash_distribution.mock_calls]
+        return result
+
+    def test_advise(self):
+        candidates, distribute_by = self._advise(
+            orders,
+            {"id": [25, 25, 26, 24], "customer_id": [30, 20, 26, 24]},
+            {"id": 1.0, "customer_id": 0.6},
+        )
+        eq_(self.sampled, ["id", "customer_id"])
+        eq_([(c.column.name, c.join_column) for c in candidates], [("id", False), ("customer_id", True)])
+        assert abs(candidates[0].skew - 0.04) < 1e-9
+        assert isinstance(distribute_by, DistributeByHash)
+        eq_(distribute_by.columns, ("id",))
+
+    def test_join_column_preferred(self):
+        candidates, distribute_by = self._advise(
+            orders,
+            {"id": [25, 25, 26, 24], "customer_id": [25, 25, 25, 25]},
+            {"id": 1.0, "customer_id": 0.95},
+        )
+        eq_(distribute_by.columns, ("customer_id",))
+        # referenced by orders.customer_id
+        candidates, _ = self._advise(customers, {"id": [1, 1, 1, 1]}, {"id": 1.0})
+        eq_([(c.column.name, c.join_column) for c in candidates], [("id", True)])
+
+    def test_skewed_datanodes(self):
+        # rows hashed to 2 of 4 datanodes
+        candidates, _ = self._advise(orders, {"status": [50, 50]}, {"status": 0.001}, columns=["status"])
+        eq_(candidates[0].skew, 1.0)
+
+    def test_replication(self):
+        connection = mock.Mock()
+        connection.execute.return_value.scalar.return_value = 100
+        candidates, distribute_by = advise_distribution(connection, customers, replication_rows=1000)
+        eq_(candidates, [])
+        assert isinstance(distribute_by, DistributeByReplication)
+
+
+class CheckSkewTest(fixtures.TestBase):
+    def test_check_skew(self):
+        connection = mock.Mock()
+        connection.execute.side_effect = [
+            mock.Mock(scalar=mock.Mock(return_value=4)),
+            [(1, 100), (2, 100), (3, 100), (4, 100)],
+            [(1, 300), (2, 50), (3, 50)],
+        ]
+        reports = check_skew(connection, [customers, orders])
+        eq_(len(reports), 1)
+        eq_(reports[0].table, orders)
+        eq_(reports[0].rows, 400)
+        eq_(reports[0].skew, 2.0)
+        eq_(reports[0].datanode_rows, [300, 50, 50])
+
+
+cm = MetaData()
+c_customers = Table(
+    "customers",
+    cm,
+    Column("id", Integer, primary_key=True),
+    Column("region", String(8)),
+    opengauss_distribute_by=DistributeByHash("id"),
+)
+c_orders = Table(
+    "orders",
+    cm,
+    Column("id", Integer, primary_key=True),
+    Column("customer_id", Integer, ForeignKey("customers.id")),
+    opengauss_distribute_by="HASH(customer_id)",
+)
+c_items = Table(
+    "items",
+    cm,
+    Column("id", Integer, primary_key=True),
+    Column("order_id", Integer),
+    opengauss_distribute_by=DistributeByHash("id"),
+)
+c_regions = Table(
+    "regions",
+    cm,
+    Column("code", String(8), primary_key=True),
+    opengauss_distribute_by=DistributeByReplication(),
+)
+c_archive = Table(
+    "archive",
+    cm,
+    Column("customer_id", Integer),
+    opengauss_distribute_by=DistributeByHash("customer_id"),
+    opengauss_to="GROUP archive_group",
+)
+c_logs = Table("logs", cm, Column("customer_id", Integer))
+
+
+class ColocationTest(fixtures.TestBase):
+    def _reasons(self, stmt):
+        return [
+            (issue.left.description, issue.right.description, issue.reason)
+            for issue in analyze_colocation(stmt)
+        ]
+
+    def test_colocated(self):
+        stmt = select(c_customers.c.id).join(c_orders, c_orders.c.customer_id == c_customers.c.id)
+        eq_(self._reasons(stmt), [])
+        # join with a replicated table, or with a table without distribution
+        stmt = select(c_customers).join(c_regions, c_regions.c.code == c_customers.c.region)
+        eq_(self._reasons(stmt), [])
+        stmt = select(c_customers).join(c_logs, c_logs.c.customer_id == c_customers.c.id)
+        eq_(self._reasons(stmt), [])
+
+    def test_not_on_distribution_keys(self):
+        stmt = select(c_orders.c.id).join(c_items, c_items.c.order_id == c_orders.c.id)
+        eq_(
+            self._reasons(stmt),
+            [("items", "orders",
+              "joined on order_id = id, not on the distribution keys HASH(id) and HASH(customer_id)")],
+        )
+
+    def test_where_clause_and_aliases(self):
+        a1, a2 = c_orders.alias("o1"), c_orders.alias("o2")
+        stmt = select(a1.c.id).where(a1.c.customer_id == a2.c.customer_id)
+        eq_(self._reasons(stmt), [])
+        stmt = select(a1.c.id).where(a1.c.id == a2.c.customer_id)
+        eq_(len(self._reasons(stmt)), 1)
+        # correlated subquery
+        stmt = select(c_customers.c.id).where(
+            exists().where(c_items.c.id == c_customers.c.id, c_items.c.order_id > 0)
+        )
+        eq_(self._reasons(stmt), [])
+
+    def test_node_groups(self):
+        stmt = select(c_customers).join(c_archive, c_archive.c.customer_id == c_customers.c.id)
+        eq_(self._reasons(stmt), [("archive", "customers", "the tables are in different node groups")])
+
+    def test_compile_warns(self):
+        dialect = OpenGaussDialect_dc_psycopg2(colocation_check="warn")
+        stmt = select(c_orders.c.id).join(c_items, c_items.c.order_id == c_orders.c.id)
+        with expect_warnings("Join of items and orders is not co-located, joined on order_id = id"):
+            stmt.compile(dialect=dialect)
+
+    def test_compile_callback(self):
+        issues = []
+        dialect = OpenGaussDialect_dc_psycopg2(colocation_check=issues.append)
+        subq = select(c_items.c.order_id).subquery()
+        stmt = select(c_orders.c.id).join(subq, subq.c.order_id == c_orders.c.id).where(
+            c_orders.c.id.in_(select(c_items.c.id).where(c_items.c.order_id == c_orders.c.customer_id))
+        )
+        stmt.compile(dialect=dialect)
+        eq_([(i.left.name, i.right.name) for i in issues], [("items", "orders")])
+        assert_raises_message(
+            exc.ArgumentError,
+            "colocation_check must be 'warn' or a callable, not 'raise'",
+            OpenGaussDialect_dc_psycopg2, colocation_check="raise"
+        )
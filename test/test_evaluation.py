@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2005-2022 the SQLAlchemy authors and contributors
+# <see AUTHORS file>
+#
+# Copyright (C) 2025-2025 Huawei Technologies Co.,Ltd.
+#
+# This module is part of SQLAlchemy and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+import numpy as np
+from sqlalchemy import Column, Integer, MetaData, Table
+from sqlalchemy.testing import fixtures, mock
+from sqlalchemy.testing.assertions import assert_raises_message, eq_
+
+from opengauss_sqlalchemy.evaluation import (
+    ann_search_provider,
+    exact_top_k,
+    format_report,
+    recall_at_k,
+    sample_queries,
+    sweep,
+)
+from opengauss_sqlalchemy.usertype import VECTOR
+
+items = Table(
+    "items",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("embedding", VECTOR(3))
+)
+
+
+class ExactTopKTest(fixtures.TestBase):
+    def setup_test(self):
+        rng = np.random.default_rng(0)
+        self.data = rng.standard_normal((200, 8)).astype(np.float32)
+        self.queries = sample_queries(self.data, 10, seed=1)
+
+    def _brute_force(self, distances, k):
+        return np.argsort(distances, axis=1, kind="stable")[:, :k]
+
+    def test_l2_distance(self):
+        ids, distances = exact_top_k(self.data, self.queries, 5)
+        expected = np.linalg.norm(self.queries[:, np.newaxis] - self.data[np.newaxis], axis=2)
+        eq_(ids.tolist(), self._brute_force(expected, 5).tolist())
+        assert np.allclose(distances[:, 0], 0, atol=1e-3)
+
+    def test_cosine_distance(self):
+        ids, _ = exact_top_k(self.data, self.queries, 5, distance="cosine_distance")
+        normalized = self.data / np.linalg.norm(self.data, axis=1)[:, np.newaxis]
+        queries = self.queries / np.linalg.norm(self.queries, axis=1)[:, np.newaxis]
+        eq_(ids.tolist(), self._brute_force(1 - queries @ normalized.T, 5).tolist())
+
+    def test_max_inner_product_blocks(self):
+        with mock.patch("opengauss_sqlalchemy.evaluation._BLOCK_BYTES", 4 * 200 * 3):
+            ids, distances = exact_top_k(self.data, self.queries, 5, distance="max_inner_product")
+        eq_(ids.tolist(), self._brute_force(-self.queries @ self.data.T, 5).tolist())
+        eq_(distances.shape, (10, 5))
+
+    def test_ids(self):
+        ids, _ = exact_top_k(self.data, self.data[:2], 1, ids=np.arange(200) + 1000)
+        eq_(ids.tolist(), [[1000], [1001]])
+
+    def test_unsupported_distance(self):
+        assert_raises_message(
+            ValueError, "unsupported distance 'jaccard_distance'",
+            exact_top_k, self.data, self.queries, 5, distance="jaccard_distance"
+        )
+
+
+class SweepTest(fixtures.TestBase):
+    def test_recall_at_k(self):
+        eq_(recall_at_k([[1, 2, 3], [4, 5, 9]], np.array([[1, 2, 3], [4, 5, 6]]), 3), 5 / 6.0)
+        eq_(recall_at_k([[3, 1]], np.array([[1, 2, 3]]), 2), 0.5)
+        eq_(recall_at_k([], np.empty((0, 2)), 2), 0.0)
+
+    def test_sweep(self):
+        rng = np.random.default_rng(0)
+        data = rng.standard_normal((100, 4))
+        queries = sample_queries(data, 5, seed=0)
+        ground_truth, _ = exact_top_k(data, queries, 10)
+
+        # a stand-in for an approximate index, exact from ef_search = 10
+        def search(query, k, ef_search=1):
+            ids, _ = exact_top_k(data, query, k)
+            return ids[0][:ef_search]
+
+        results = sweep(search, queries, ground_truth, 10, [{"ef_search": 5}, {"ef_search": 10}], label="hnsw")
+        eq_([r.recall for r in results], [0.5, 1.0])
+        eq_([r.settings for r in results], [{"ef_search": 5}, {"ef_search": 10}])
+        for r in results:
+            eq_(r.label, "hnsw")
+            assert 0 <= r.p50 <= r.p99
+            assert r.qps > 0
+
+        report = format_report(results).splitlines()
+        eq_(len(report), 3)
+        assert report[0].startswith("label  settings")
+        assert report[2].startswith("hnsw   ef_search=10  1.0000")
+
+    def test_ann_search_provider(self):
+        connection = mock.Mock()
+        connection.execute.return_value = [(3,), (1,)]
+        search = ann_search_provider(connection, items.c.embedding, distance="cosine_distance")
+        eq_(search([1, 2, 3], 2, ef_search=40), [3, 1])
+        stmt, = connection.execute.call_args.args
+        eq_(stmt.get_execution_options(), {"opengauss_ef_search": 40})
+        eq_([c.name for c in stmt.selected_columns], ["id", "distance"])
+
+    def test_sweep_setting_transactions(self):
+        connection = mock.Mock()
+        connection.in_transaction.return_value = False
+        settings = []
+
+        def execute(stmt):
+            settings.append((stmt.get_execution_options(), connection.begin.call_count,
+                             connection.begin.return_value.rollback.call_count))
+            return [(1,)]
+
+        connection.execute.side_effect = execute
+        search = ann_search_provider(connection, items.c.embedding)
+        sweep(search, [[1, 2, 3]], [[1]], 1, [{"ef_search": 100}, {}])
+        # the setting without ef_search runs after the first one is rolled back
+        eq_(settings, [({"opengauss_ef_search": 100}, 1, 0), ({}, 2, 1)])
+        eq_(connection.begin.return_value.rollback.call_count, 2)
+
+        # a savepoint in a transaction, e.g. of index_sweep
+        connection.in_transaction.return_value = True
+        sweep(search, [[1, 2, 3]], [[1]], 1, [{"ef_search": 100}])
+        eq_(connection.begin_nested.return_value.rollback.call_count, 1)
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2005-2022 the SQLAlchemy authors and contributors
+# <see AUTHORS file>
+#
+# Copyright (C) 2021-2022 Huawei Technologies Co.,Ltd.
+#
+# This module is part of SQLAlchemy and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+from sqlalchemy import Column, create_engine, exc, Integer, MetaData, Table, text
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.testing import fixtures, mock
+from sqlalchemy.testing.assertions import assert_raises_message, eq_, expect_warnings
+
+from opengauss_sqlalchemy.usertype import HnswIndex, VECTOR
+
+
+def mock_dbapi():
+    dbapi = mock.MagicMock(paramstyle="pyformat")
+    dbapi.connect.return_value.autocommit = False
+    return dbapi
+
+
+class SettingsExecutionOptionTest(fixtures.TestBase):
+    def _engine(self):
+        self.dbapi = mock_dbapi()
+        return create_engine("opengauss://", module=self.dbapi, _initialize=False)
+
+    def _executed(self):
+        cursor = self.dbapi.connect.return_value.cursor.return_value
+        return [c.args[0] for c in cursor.execute.mock_calls]
+
+    def test_set_local(self):
+        with self._engine().connect() as conn:
+            conn.execute(
+                text("select 1").execution_options(
+                    opengauss_settings={"query_dop": 4, "enable_seqscan": False, "search_path": "a'b"}
+                )
+            )
+        eq_(
+            self._executed(),
+            [
+                "SET LOCAL query_dop = 4",
+                "SET LOCAL enable_seqscan = off",
+                "SET LOCAL search_path = 'a''b'",
+                "select 1",
+            ],
+        )
+
+    def test_redundant_set_skipped_within_transaction(self):
+        with self._engine().connect() as conn:
+            conn.execute(text("select 1").execution_options(opengauss_settings={"work_mem": "64MB"}))
+            conn.execute(text("select 2").execution_options(opengauss_settings={"work_mem": "64MB"}))
+            conn.execute(text("select 3").execution_options(opengauss_settings={"work_mem": "1GB"}))
+        eq_(
+            self._executed(),
+            [
+                "SET LOCAL work_mem = '64MB'",
+                "select 1",
+                "select 2",
+                "SET LOCAL work_mem = '1GB'",
+                "select 3",
+            ],
+        )
+
+    def test_set_again_in_new_transaction(self):
+        engine = self._engine()
+        stmt = text("select 1").execution_options(opengauss_settings={"query_dop": 4})
+        with engine.connect() as conn:
+            conn.execute(stmt)
+            conn.commit()
+            conn.execute(stmt)
+            with conn.begin_nested() as savepoint:
+                conn.execute(stmt)
+                savepoint.rollback()
+            conn.execute(stmt)
+        with engine.connect() as conn:
+            conn.execute(stmt)
+        eq_(self._executed().count("SET LOCAL query_dop = 4"), 5)
+
+    def test_search_options(self):
+        with self._engine().connect() as conn:
+            conn.execute(
+                text("select 1").execution_options(
+                    opengauss_settings={"hnsw_ef_search": 40}, opengauss_ef_search=100, opengauss_probes=10
+                )
+            )
+        eq_(
+            self._executed(),
+            ["SET LOCAL hnsw_ef_search = 100", "SET LOCAL ivfflat_probes = 10", "select 1"],
+        )
+
+    def test_invalid_setting_name(self):
+        with self._engine().connect() as conn:
+            assert_raises_message(
+                exc.ArgumentError,
+                "Invalid setting name",
+                conn.execute,
+                text("select 1").execution_options(opengauss_settings={"work_mem; drop": 1}),
+            )
+
+    def test_autocommit_warns(self):
+        engine = self._engine()
+        self.dbapi.connect.return_value.autocommit = True
+        with engine.connect() as conn:
+            with expect_warnings("opengauss settings are ignored in AUTOCOMMIT mode"):
+                conn.execute(text("select 1").execution_options(opengauss_settings={"query_dop": 4}))
+        eq_(self._executed(), ["select 1"])
+
+    def test_index_build_settings(self):
+        t = Table("t", MetaData(), Column("id", Integer), Column("embedding", VECTOR(3)))
+        idx = HnswIndex(
+            "t_idx", t.c.embedding, m=16,
+            build_settings={"maintenance_work_mem": "8GB", "query_dop": 8},
+        )
+        engine = self._engine()
+        cursor = self.dbapi.connect.return_value.cursor.return_value
+        cursor.fetchone.return_value = ("2GB",)
+        with engine.connect() as conn:
+            conn.execute(text("select 1").execution_options(opengauss_settings={"query_dop": 2}))
+            conn.execute(CreateIndex(idx))
+            conn.execute(text("select 2").execution_options(opengauss_settings={"query_dop": 2}))
+        eq_(
+            self._executed(),
+            [
+                "SET LOCAL query_dop = 2",
+                "select 1",
+                "SELECT current_setting('maintenance_work_mem')",
+                "SET LOCAL maintenance_work_mem = '8GB'",
+                "SET LOCAL query_dop = 8",
+                "CREATE INDEX t_idx ON t USING hnsw (embedding) WITH (m = 16)",
+                "SELECT set_config('maintenance_work_mem', '2GB', true)",
+                "SET LOCAL query_dop = 2",
+                "select 2",
+            ],
+        )
+
+    def test_index_build_settings_restore_session_value(self):
+        t = Table("t", MetaData(), Column("id", Integer), Column("embedding", VECTOR(3)))
+        idx = HnswIndex("t_idx", t.c.embedding, build_settings={"search_path": "tmp"})
+        engine = self._engine()
+        cursor = self.dbapi.connect.return_value.cursor.return_value
+        cursor.fetchone.return_value = ('"$user", public',)
+        with engine.connect() as conn:
+            conn.execute(CreateIndex(idx))
+            conn.execute(text("select 1").execution_options(opengauss_settings={"search_path": "tmp"}))
+        eq_(
+            self._executed(),
+            [
+                "SELECT current_setting('search_path')",
+                "SET LOCAL search_path = 'tmp'",
+                "CREATE INDEX t_idx ON t USING hnsw (embedding)",
+                "SELECT set_config('search_path', '\"$user\", public', true)",
+                "SET LOCAL search_path = 'tmp'",
+                "select 1",
+            ],
+        )
+
+class StreamingCursor(object):
+    def __init__(self, connection, rows):
+        self.connection = connection
+        self.rows = list(rows)
+        self.description = None
+        self.rowcount = -1
+        self.fetches = []
+
+    def execute(self, statement, parameters=None):
+        self.description = [("id", 23, None, None, None, None, None), ("data", 25, None, None, None, None, None)]
+
+    def fetchmany(self, size):
+        self.fetches.append(size)
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def fetchall(self):
+        return self.fetchmany(len(self.rows))
+
+    def close(self):
+        pass
+
+
+class AdaptiveFetchTest(fixtures.TestBase):
+    def _engine(self, rows):
+        self.dbapi = mock_dbapi()
+        connection = self.dbapi.connect.return_value
+        connection.notices = []
+        self.cursors = []
+
+        def cursor(*args, **kwargs):
+            self.cursors.append(StreamingCursor(connection, rows))
+            return self.cursors[-1]
+
+        connection.cursor.side_effect = cursor
+        return create_engine("opengauss://", module=self.dbapi, _initialize=False)
+
+    def _fetch(self, rows, **options):
+        with self._engine(rows).connect() as conn:
+            result = conn.execution_options(stream_results=True, **options).execute(text("select id, data from t"))
+            fetched = [row.id for row in result]
+        eq_(fetched, [row[0] for row in rows])
+        return self.cursors[-1].fetches
+
+    def test_sized_to_budget(self):
+        # rows of 16 + 8 + 84 bytes
+        eq_(self._fetch([(i, "x" * 84) for i in range(500)], max_buffer_bytes=10800), [1, 100, 100, 100, 100, 100, 100])
+        eq_(self._fetch([(i, "x" * 10776) for i in range(5)], max_buffer_bytes=10800), [1, 1, 1, 1, 1, 1])
+
+    def test_adapts_to_row_size(self):
+        rows = [(i, "x" * 84) for i in range(101)] + [(i, "x" * 1084) for i in range(101, 300)]
+        fetches = self._fetch(rows, max_buffer_bytes=10800)
+        # averaged over the batches
+        eq_(fetches[:4], [1, 100, 100, 17])
+
+    def test_max_row_buffer(self):
+        eq_(self._fetch([(i, "") for i in range(100)], max_buffer_bytes=10000, max_row_buffer=40), [1, 40, 40, 40, 40])
+
+    def test_yield_per(self):
+        eq_(self._fetch([(i, "") for i in range(100)], max_buffer_bytes=10000, yield_per=30)[1:], [30, 30, 30, 30, 30])
+
+    def test_fixed_without_budget(self):
+        eq_(self._fetch([(i, "") for i in range(100)]), [1, 5, 25, 125, 625])
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2005-2022 the SQLAlchemy authors and contributors
+# <see AUTHORS file>
+#
+# Copyright (C) 2025-2025 Huawei Technologies Co.,Ltd.
+#
+# This module is part of SQLAlchemy and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import datetime
+from multiprocessing import shared_memory
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+from sqlalchemy import Column, create_engine, event, exc, Integer, MetaData, Numeric, select, String, Table
+from sqlalchemy.testing import fixtures, mock
+from sqlalchemy.testing.assertions import assert_raises, assert_raises_message, eq_
+
+from opengauss_sqlalchemy.dc_psycopg2 import OpenGaussDialect_dc_psycopg2
+from opengauss_sqlalchemy.parallel import (
+    _range_bounds, _split_statements, datanode_scan, fetch_vectors_shared, parallel_select
+)
+from opengauss_sqlalchemy.usertype import VECTOR
+
+items = Table(
+    "items",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("name", String(32)),
+    Column("price", Numeric(10, 2, asdecimal=False)),
+)
+
+
+class Error(Exception):
+    pass
+
+
+class FakeCursor(object):
+    def __init__(self, server, connection):
+        self.server = server
+        self.connection = connection
+        self.description = None
+        self.rows = []
+        self.rowcount = -1
+
+    def execute(self, statement, parameters=None):
+        self.rows, columns = self.server.execute(statement)
+        self.description = [(name, type_code, None, None, None, None, None) for name, type_code in columns]
+        self.rowcount = len(self.rows)
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def fetchall(self):
+        return self.fetchmany(len(self.rows))
+
+    def fetchone(self):
+        batch = self.fetchmany(1)
+        return batch[0] if batch else None
+
+    def close(self):
+        pass
+
+
+class FakeServer(object):
+    """Answers the queries of a fake DBAPI from the rows of each datanode."""
+
+    def __init__(self, datanodes):
+        self.datanodes = datanodes
+        self.statements = []
+        self.threads = set()
+        self.fail = None
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        self.threads.add(threading.current_thread().name)
+        if "pgxc_node" in statement:
+            return [(name,) for name in sorted(self.datanodes)], [("node_name", 19)]
+        datanode = re.match(r"EXECUTE DIRECT ON \((\w+)\)", statement).group(1)
+        if datanode == self.fail:
+            raise Error("could not connect to %s" % datanode)
+        rows = self.datanodes[datanode]
+        # NULLs last, as the server does
+        if "ORDER BY items.id DESC" in statement:
+            rows = sorted(rows, key=lambda r: (r[0] is None, r[0] or 0), reverse=True)
+        elif "ORDER BY items.id" in statement:
+            rows = sorted(rows, key=lambda r: (r[0] is None, r[0] or 0))
+        elif 'ORDER BY items.name COLLATE "C"' in statement:
+            rows = sorted(rows, key=lambda r: r[1])
+        return rows, [("id", 23), ("name", 1043), ("price", 1700)]
+
+    def engine(self):
+        dbapi = mock.MagicMock(paramstyle="pyformat", Error=Error)
+
+        def connect(*args, **kwargs):
+            conn = mock.MagicMock(autocommit=False, notices=[])
+            conn.cursor.side_effect = lambda *a, **kw: FakeCursor(self, conn)
+            return conn
+
+        dbapi.connect.side_effect = connect
+        return create_engine("opengauss+dc_psycopg2://scott:tiger@/test", module=dbapi, _initialize=False)
+
+
+class DatanodeScanTest(fixtures.TestBase):
+    def _server(self):
+        return FakeServer({
+            "dn1": [(1, "a", 1.5), (4, "d", 4.5), (7, "g", 7.5)],
+            "dn2": [(2, "b", 2.5), (5, "e", 5.5)],
+            "dn3": [(3, "c", 3.5), (6, "f", 6.5), (8, "h", 8.5), (9, "i", 9.5)],
+        })
+
+    def test_scan(self):
+        server = self._server()
+        stmt = select(items).where(items.c.name.like("%:x'%"))
+        rows = list(datanode_scan(server.engine(), stmt, batch_size=2, max_buffered=1))
+        eq_(sorted(r.id for r in rows), list(range(1, 10)))
+        eq_(rows[0]._fields, ("id", "name", "price"))
+        directs = sorted(s for s in server.statements if s.startswith("EXECUTE"))
+        eq_(
+            directs[0],
+            "EXECUTE DIRECT ON (dn1) 'SELECT items.id, items.name, items.price \nFROM items \n"
+            "WHERE items.name LIKE ''%%:x''''%%'''"
+        )
+        # a connection per datanode, next to the one listing them
+        assert len(server.threads) >= 3
+
+    def test_ordered(self):
+        server = self._server()
+        rows = datanode_scan(server.engine(), select(items), datanodes=["dn1", "dn3"], order_by="id", batch_size=1)
+        eq_([r.id for r in rows], [1, 3, 4, 6, 7, 8, 9])
+        rows = datanode_scan(server.engine(), select(items), order_by=["id"], descending=True)
+        eq_([r.id for r in rows], [9, 8, 7, 6, 5, 4, 3, 2, 1])
+
+    def test_ordered_nulls_and_strings(self):
+        server = FakeServer({
+            "dn1": [(1, "b", 1.5), (None, "a", 2.5)],
+            "dn2": [(None, "B", 3.5), (2, "a", 4.5)],
+        })
+        rows = datanode_scan(server.engine(), select(items), order_by="id")
+        eq_([r.id for r in rows], [1, 2, None, None])
+        rows = datanode_scan(server.engine(), select(items), order_by="id", descending=True)
+        eq_([r.id for r in rows], [None, None, 2, 1])
+        server = FakeServer({"dn1": [(1, "B", 1.5), (2, "a", 2.5)], "dn2": [(3, "A", 3.5), (4, "b", 4.5)]})
+        rows = datanode_scan(server.engine(), select(items), order_by="name")
+        eq_([r.name for r in rows], ["A", "B", "a", "b"])
+        assert any('ORDER BY items.name COLLATE "C"' in s for s in server.statements)
+
+    def test_stop_early(self):
+        server = self._server()
+        rows = datanode_scan(server.engine(), select(items), batch_size=1, max_buffered=1)
+        next(rows)
+        rows.close()
+
+    def test_datanode_error(self):
+        server = self._server()
+        server.fail = "dn2"
+        assert_raises(exc.DBAPIError, list, datanode_scan(server.engine(), select(items)))
+
+    def test_requires_dc_dialect(self):
+        engine = create_engine(
+            "opengauss+psycopg2://scott:tiger@/test", module=mock.MagicMock(paramstyle="pyformat"), _initialize=False
+        )
+        assert_raises_message(
+            exc.ArgumentError,
+            r"EXECUTE DIRECT requires distributed openGauss \(opengauss\+dc_psycopg2\)",
+            datanode_scan, engine, select(items)
+        )
+
+
+class ParallelSelectTest(fixtures.TestBase):
+    def setup_test(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.engine = create_engine("sqlite:///%s" % os.path.join(self.tmpdir, "test.db"))
+        self.table = Table(
+            "scores",
+            MetaData(),
+            Column("id", Integer, primary_key=True),
+            Column("score", Integer),
+        )
+        self.table.create(self.engine)
+        with self.engine.begin() as conn:
+            conn.execute(self.table.insert(), [
+                {"id": i, "score": None if i % 7 == 0 else i % 50} for i in range(1, 1001)
+            ])
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *arg: self.statements.append(statement))
+
+    def teardown_test(self):
+        self.engine.dispose()
+        shutil.rmtree(self.tmpdir)
+
+    def test_range_split(self):
+        batches = list(parallel_select(self.engine, select(self.table), self.table.c.id, workers=3, batch_size=64))
+        eq_(sorted(r.id for batch in batches for r in batch), list(range(1, 1001)))
+        assert max(len(batch) for batch in batches) <= 64
+        # min / max, then 12 ranges
+        eq_(len(self.statements), 13)
+
+    def test_nullable_column(self):
+        stmt = select(self.table.c.id).where(self.table.c.id > 100)
+        batches = parallel_select(self.engine, stmt, self.table.c.score, workers=2, splits=3)
+        eq_(sorted(r.id for batch in batches for r in batch), list(range(101, 1001)))
+        # 3 ranges and IS NULL
+        eq_(len(self.statements), 5)
+        assert self.statements[-1].endswith("scores.score IS NULL")
+
+    def test_empty(self):
+        stmt = select(self.table).where(self.table.c.id > 2000)
+        eq_(list(parallel_select(self.engine, stmt, self.table.c.id)), [])
+
+    def test_stop_early(self):
+        batches = parallel_select(self.engine, select(self.table), self.table.c.id, batch_size=10, max_buffered=1)
+        eq_(len(next(batches)), 10)
+        batches.close()
+
+    def test_range_bounds(self):
+        eq_(_range_bounds(1, 10, 4), [3, 5, 7])
+        eq_(_range_bounds(1, 2, 4), [])
+        eq_(_range_bounds(0.0, 1.0, 4), [0.25, 0.5, 0.75])
+        eq_(
+            _range_bounds(datetime.date(2025, 1, 1), datetime.date(2025, 1, 3), 4),
+            [datetime.date(2025, 1, 2)],
+        )
+
+    def test_partitions(self):
+        dialect = OpenGaussDialect_dc_psycopg2()
+        connection = mock.Mock(dialect=dialect)
+        statements = _split_statements(connection, select(items.c.id), ["p1", "P2"], 4)
+        eq_(
+            [str(s.compile(dialect=dialect)) for s in statements],
+            ["SELECT items.id \nFROM items PARTITION (p1)", 'SELECT items.id \nFROM items PARTITION ("P2")'],
+        )
+        connection.execute.return_value.scalars.return_value.all.return_value = ["p1"]
+        statements = _split_statements(connection, select(items.c.id), "partitions", 4)
+        eq_(connection.execute.mock_calls[0].args[1], {"table": "items"})
+        eq_([str(s.compile(dialect=dialect)) for s in statements], ["SELECT items.id \nFROM items PARTITION (p1)"])
+
+    def test_invalid_split(self):
+        connection = mock.Mock(dialect=OpenGaussDialect_dc_psycopg2())
+        assert_raises_message(
+            exc.ArgumentError,
+            "parallel_select can't split a statement with LIMIT or OFFSET",
+            _split_statements, connection, select(items).limit(10), items.c.id, 4
+        )
+        other = Table("other", MetaData(), Column("id", Integer))
+        assert_raises_message(
+            exc.ArgumentError,
+            "parallel_select splits by partitions the statements of one table",
+            _split_statements, connection, select(items, other), ["p1"], 4
+        )
+        assert_raises_message(
+            exc.ArgumentError,
+            "split_by must be a column, partition names or 'partitions', not 'id'",
+            _split_statements, connection, select(items), "id", 4
+        )
+
+
+class FetchVectorsSharedTest(fixtures.TestBase):
+    def setup_test(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.engine = create_engine("sqlite:///%s" % os.path.join(self.tmpdir, "test.db"))
+        self.table = Table(
+            "embeddings",
+            MetaData(),
+            Column("id", Integer, primary_key=True),
+            Column("embedding", VECTOR(3)),
+        )
+        self.table.create(self.engine)
+        self.data = np.arange(30, dtype=np.float32).reshape(10, 3) / 4
+        with self.engine.begin() as conn:
+            conn.execute(self.table.insert(), [
+                {"id": i, "embedding": None if i == 7 else self.data[i]} for i in range(10)
+            ])
+
+    def teardown_test(self):
+        self.engine.dispose()
+        shutil.rmtree(self.tmpdir)
+
+    def _fetch(self, **kw):
+        stmt = select(self.table.c.id, self.table.c.embedding).order_by(self.table.c.id)
+        with self.engine.connect() as conn:
+            return fetch_vectors_shared(conn, stmt, **kw)
+
+    def _check(self, ids, matrix):
+        eq_(ids.tolist(), list(range(10)))
+        eq_(matrix.array.dtype, np.float32)
+        eq_(matrix.array.shape, (10, 3))
+        assert np.isnan(matrix.array[7]).all()
+        rows = [i for i in range(10) if i != 7]
+        assert np.array_equal(matrix.array[rows], self.data[rows])
+
+    def test_process_pool(self):
+        ids, matrix = self._fetch(chunk_rows=3, workers=2)
+        with matrix:
+            self._check(ids, matrix)
+            # mapped by another process
+            shm = shared_memory.SharedMemory(name=matrix.name)
+            eq_(bytes(shm.buf[:12]), self.data[0].tobytes())
+            shm.close()
+        assert matrix.array is None
+
+    def test_executor(self):
+        with ProcessPoolExecutor(2) as executor:
+            ids, matrix = self._fetch(chunk_rows=4, executor=executor)
+        with matrix:
+            self._check(ids, matrix)
+
+    def test_decoded_while_fetching(self):
+        class Executor(ThreadPoolExecutor):
+            def __init__(self, *args, **kwargs):
+                super(Executor, self).__init__(*args, **kwargs)
+                self.futures = []
+                self.outstanding = []
+
+            def submit(self, *args, **kwargs):
+                self.outstanding.append(sum(1 for f in self.futures if not f.done()))
+                future = super(Executor, self).submit(*args, **kwargs)
+                self.futures.append(future)
+                return future
+
+        with Executor(1) as executor:
+            ids, matrix = self._fetch(chunk_rows=2, workers=1, executor=executor)
+        with matrix:
+            self._check(ids, matrix)
+        # one decoding per chunk, the first two together, at most
+        # 2 * workers waiting
+        eq_(len(executor.futures), 5)
+        assert max(executor.outstanding) <= 2
+
+    def test_single_chunk(self):
+        ids, matrix = self._fetch()
+        with matrix:
+            self._check(ids, matrix)
+
+    def test_empty(self):
+        stmt = select(self.table.c.id, self.table.c.embedding).where(self.table.c.id > 100)
+        with self.engine.connect() as conn:
+            ids, matrix = fetch_vectors_shared(conn, stmt)
+        with matrix:
+            eq_(ids.tolist(), [])
+            eq_(matrix.array.shape, (0, 3))
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2005-2022 the SQLAlchemy authors and contributors
+# <see AUTHORS file>
+#
+# Copyright (C) 2025-2025 Huawei Technologies Co.,Ltd.
+#
+# This module is part of SQLAlchemy and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+import threading
+
+from sqlalchemy import Column, exc, insert, Integer, MetaData, select, Table, text
+from sqlalchemy.testing import fixtures, mock
+from sqlalchemy.testing.assertions import assert_raises_message, eq_
+
+from opengauss_sqlalchemy.routing import HostRouter, PRIMARY, RoutingSession, split_hosts, STANDBY
+
+items = Table("items", MetaData(), Column("id", Integer, primary_key=True))
+
+
+class SplitHostsTest(fixtures.TestBase):
+    def test_host_list(self):
+        urls = split_hosts("opengauss://scott:tiger@/test?host=a,b,c&port=5432&sslmode=disable")
+        eq_(
+            [u.render_as_string(hide_password=False) for u in urls],
+            [
+                "opengauss://scott:tiger@a:5432/test?sslmode=disable",
+                "opengauss://scott:tiger@b:5432/test?sslmode=disable",
+                "opengauss://scott:tiger@c:5432/test?sslmode=disable",
+            ]
+        )
+
+    def test_host_ports(self):
+        urls = split_hosts("opengauss://scott:tiger@/test?host=a:5432&host=b:5433&host=c")
+        eq_([(u.host, u.port) for u in urls], [("a", 5432), ("b", 5433), ("c", None)])
+        urls = split_hosts("opengauss://scott:tiger@/test?host=a,b&port=5432,5433")
+        eq_([(u.host, u.port) for u in urls], [("a", 5432), ("b", 5433)])
+
+    def test_single_host(self):
+        eq_([u.host for u in split_hosts("opengauss://scott:tiger@a:5432/test")], ["a"])
+
+
+class HostRouterTest(fixtures.TestBase):
+    def _router(self, roles, **kw):
+        router = HostRouter(
+            "opengauss://scott:tiger@/test?host=a,b,c", module=mock.MagicMock(paramstyle="pyformat"),
+            _initialize=False, **kw
+        )
+        self.roles = dict(roles)
+        self.detected = []
+
+        def detect_role(engine):
+            self.detected.append(engine.url.host)
+            role = self.roles[engine.url.host]
+            if role is None:
+                raise exc.OperationalError("select", {}, Exception("could not connect"))
+            return role
+
+        router._detect_role = detect_role
+        return router
+
+    def _hosts(self, router, route, count):
+        return [router.get_engine(route).url.host for _ in range(count)]
+
+    def test_routes(self):
+        router = self._router({"a": STANDBY, "b": PRIMARY, "c": STANDBY})
+        eq_(self._hosts(router, None, 2), ["b", "b"])
+        eq_(self._hosts(router, PRIMARY, 1), ["b"])
+        eq_(self._hosts(router, STANDBY, 4), ["a", "c", "a", "c"])
+        # the roles are detected once per check interval
+        eq_(self.detected, ["a", "b", "c"])
+
+    def test_least_latency(self):
+        router = self._router({"a": STANDBY, "b": PRIMARY, "c": STANDBY}, policy="least_latency")
+        router.refresh()
+        router._latencies = {router.engines[0]: 0.002, router.engines[1]: 0.001, router.engines[2]: 0.001}
+        eq_(self._hosts(router, STANDBY, 2), ["c", "c"])
+
+    def test_standby_fallback(self):
+        router = self._router({"a": None, "b": PRIMARY, "c": None})
+        eq_(self._hosts(router, STANDBY, 1), ["b"])
+        eq_(router.roles, dict(zip(router.engines, [None, PRIMARY, None])))
+
+    def test_failover(self):
+        router = self._router({"a": PRIMARY, "b": STANDBY, "c": STANDBY})
+        eq_(self._hosts(router, None, 1), ["a"])
+        self.roles.update(a=STANDBY, b=PRIMARY)
+        eq_(self._hosts(router, None, 1), ["a"])
+
+        # a write rejected by the former primary
+        context = mock.Mock(is_disconnect=False, original_exception=mock.Mock(pgcode="25006"))
+        with mock.patch.object(router.engines[0], "dispose") as dispose:
+            router._handle_error(context)
+            eq_(self._hosts(router, None, 1), ["b"])
+        eq_(dispose.call_count, 1)
+        eq_(self.detected, ["a", "b", "c", "a", "b", "c"])
+
+    def test_hosts_checked_at_once(self):
+        router = self._router({"a": STANDBY, "b": PRIMARY, "c": STANDBY})
+        detect_role = router._detect_role
+        barrier = threading.Barrier(3, timeout=5)
+
+        def blocking_detect_role(engine):
+            # fails unless the three hosts are checked concurrently
+            barrier.wait()
+            return detect_role(engine)
+
+        router._detect_role = blocking_detect_role
+        eq_(router.refresh(), dict(zip(router.engines, [STANDBY, PRIMARY, STANDBY])))
+
+    def test_background_refresh(self):
+        router = self._router({"a": PRIMARY, "b": STANDBY, "c": STANDBY}, check_interval=0)
+        eq_(self._hosts(router, None, 1), ["a"])
+        detect_role = router._detect_role
+        checking = threading.Event()
+
+        def slow_detect_role(engine):
+            checking.wait(5)
+            return detect_role(engine)
+
+        router._detect_role = slow_detect_role
+        self.roles.update(a=STANDBY, b=PRIMARY)
+        # the last known roles are used while the hosts are checked
+        eq_(self._hosts(router, None, 2), ["a", "a"])
+        checking.set()
+        with router._lock:
+            pass
+        eq_(self._hosts(router, None, 1), ["b"])
+
+    def test_no_primary(self):
+        router = self._router({"a": STANDBY, "b": None, "c": STANDBY})
+        assert_raises_message(
+            exc.DisconnectionError,
+            "No primary host available among a, b, c",
+            router.get_engine
+        )
+
+    def test_invalid_arguments(self):
+        assert_raises_message(
+            exc.ArgumentError,
+            "policy must be 'round_robin' or 'least_latency', not 'random'",
+            HostRouter, "opengauss://", policy="random"
+        )
+        router = self._router({"a": PRIMARY, "b": STANDBY, "c": STANDBY})
+        assert_raises_message(
+            exc.ArgumentError,
+            "opengauss_route must be 'primary' or 'standby', not 'replica'",
+            router.get_engine, "replica"
+        )
+
+    def test_detect_role(self):
+        router = HostRouter(
+            "opengauss://scott:tiger@/test?host=a", module=mock.MagicMock(paramstyle="pyformat"), _initialize=False
+        )
+        engine = router.engines[0]
+        cursor = engine.dialect.dbapi.connect.return_value.cursor.return_value
+        cursor.description = [("local_role", 25, None, None, None, None, None)]
+        for local_role, role in (("Primary", PRIMARY), ("Normal", PRIMARY), ("Standby", STANDBY),
+                                 ("Cascade Standby", STANDBY), ("Pending", None)):
+            cursor.fetchone.return_value = (local_role,)
+            eq_(HostRouter._detect_role(router, engine), role)
+        eq_(cursor.execute.mock_calls[0].args[0], "SELECT local_role FROM pg_stat_get_stream_replications()")
+        eq_(engine.dialect.dbapi.connect.mock_calls[0].kwargs["connect_timeout"], 5)
+
+        # a pending host is left out like an unreachable one
+        router._detect_role = lambda engine: None
+        eq_(router.refresh(), {engine: None})
+        eq_(router._latencies, {})
+
+    def test_session_get_bind(self):
+        router = self._router({"a": STANDBY, "b": PRIMARY, "c": STANDBY})
+        session = RoutingSession(router)
+        eq_(session.get_bind(clause=select(items)).url.host, "b")
+        eq_(session.get_bind(clause=select(items).execution_options(opengauss_route="standby")).url.host, "a")
+        eq_(session.get_bind(clause=select(items).execution_options(postgresql_readonly=True)).url.host, "c")
+        eq_(session.get_bind(clause=insert(items)).url.host, "b")
+
+        session = RoutingSession(router, route=STANDBY)
+        eq_(session.get_bind(clause=select(items)).url.host, "a")
+        eq_(session.get_bind(clause=text("select 1")).url.host, "c")
+        eq_(session.get_bind(clause=select(items).with_for_update()).url.host, "b")
+        eq_(session.get_bind(clause=insert(items)).url.host, "b")
+
+    def test_session_transaction_reads_from_one_host(self):
+        router = self._router({"a": STANDBY, "b": PRIMARY, "c": STANDBY})
+        session = RoutingSession(router, route=STANDBY)
+
+        def host(clause):
+            return session.connection(bind_arguments={"clause": clause}).engine.url.host
+
+        eq_(host(select(items)), "a")
+        eq_(host(text("select 1")), "a")
+        eq_(host(select(items).execution_options(opengauss_route="primary")), "a")
+        session.rollback()
+
+        eq_(host(select(items)), "c")
+        eq_(host(insert(items)), "b")
+        # the transaction reads its own writes
+        eq_(host(select(items)), "b")
+        session.commit()
+
+        eq_(host(select(items)), "a")
+        session.close()
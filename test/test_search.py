@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+# Copyright (C) 2005-2022 the SQLAlchemy authors and contributors
+# <see AUTHORS file>
+#
+# Copyright (C) 2025-2025 Huawei Technologies Co.,Ltd.
+#
+# This module is part of SQLAlchemy and is released under
+# the MIT License: https://www.opensource.org/licenses/mit-license.php
+
+import numpy as np
+from sqlalchemy import Column, exc, Integer, MetaData, Table, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.testing import fixtures, mock
+from sqlalchemy.testing.assertions import assert_raises_message, AssertsCompiledSQL, eq_
+
+from opengauss_sqlalchemy import asyncpg, psycopg2
+from opengauss_sqlalchemy.search import ann_select, batch_ann_search, batch_ann_select, hybrid_select, rescore_select
+from opengauss_sqlalchemy.usertype import BIT, VECTOR
+from opengauss_sqlalchemy.utils import Bit
+
+m = MetaData()
+tbl = Table(
+    "items",
+    m,
+    Column("id", Integer),
+    Column("category", Integer),
+    Column("embedding", VECTOR(3)),
+    Column("embedding_bits", BIT(3))
+)
+items = Table(
+    "items_pk",
+    m,
+    Column("id", Integer, primary_key=True),
+    Column("embedding", VECTOR(3))
+)
+docs = Table(
+    "docs",
+    m,
+    Column("id", Integer, primary_key=True),
+    Column("body", Text),
+    Column("body_tsv", TSVECTOR),
+    Column("embedding", VECTOR(3))
+)
+
+
+class AnnSelectTest(fixtures.TestBase, AssertsCompiledSQL):
+    __dialect__ = psycopg2.dialect()
+
+    def test_ann_select(self):
+        stmt = ann_select(tbl.c.embedding, [1, 2, 3], 10, distance="cosine_distance")
+        self.assert_compile(
+            stmt,
+            "SELECT items.id, items.category, items.embedding, items.embedding_bits, "
+            "items.embedding <=> %(embedding_1)s AS distance "
+            "FROM items ORDER BY distance  LIMIT %(param_1)s",
+            checkparams={"embedding_1": [1, 2, 3], "param_1": 10}
+        )
+        eq_(stmt.get_execution_options(), {})
+
+    def test_ann_select_where(self):
+        stmt = ann_select(
+            tbl.c.embedding, [1, 2, 3], 10, columns=[tbl.c.id], where=tbl.c.category == 5, ef_search=100, probes=4
+        )
+        self.assert_compile(
+            stmt,
+            "SELECT items.id, items.embedding <-> %(embedding_1)s AS distance "
+            "FROM items WHERE items.category = %(category_1)s ORDER BY distance  LIMIT %(param_1)s",
+        )
+        eq_(stmt.get_execution_options(), {"opengauss_ef_search": 100, "opengauss_probes": 4})
+
+    def test_ann_select_overfetch(self):
+        stmt = ann_select(tbl.c.embedding, [1, 2, 3], 10, columns=[tbl.c.id], where=tbl.c.category == 5, overfetch=8)
+        self.assert_compile(
+            stmt,
+            "SELECT candidates.id, candidates.distance FROM "
+            "(SELECT items.id AS id, items.category AS category, items.embedding AS embedding, "
+            "items.embedding_bits AS embedding_bits, items.embedding <-> %(embedding_1)s AS distance "
+            "FROM items ORDER BY distance  LIMIT %(param_1)s) AS candidates "
+            "WHERE candidates.category = %(category_1)s ORDER BY candidates.distance  LIMIT %(param_2)s",
+            checkparams={"embedding_1": [1, 2, 3], "param_1": 80, "category_1": 5, "param_2": 10}
+        )
+        eq_(stmt.get_execution_options(), {"opengauss_ef_search": 80})
+
+    def test_ann_select_overfetch_ef_search_capped(self):
+        stmt = ann_select(tbl.c.embedding, [1, 2, 3], 100, where=tbl.c.category == 5, overfetch=20)
+        eq_(stmt.get_execution_options(), {"opengauss_ef_search": 1000})
+
+
+class RescoreSelectTest(fixtures.TestBase, AssertsCompiledSQL):
+    __dialect__ = psycopg2.dialect()
+
+    def test_rescore_select(self):
+        stmt = rescore_select(
+            tbl.c.embedding_bits, tbl.c.embedding, [1, -2, 3], 10, columns=[tbl.c.id], where=tbl.c.category == 5
+        )
+        self.assert_compile(
+            stmt,
+            "SELECT candidates.id, candidates.embedding <=> %(embedding_1)s AS distance FROM "
+            "(SELECT items.id AS id, items.category AS category, items.embedding AS embedding, "
+            "items.embedding_bits AS embedding_bits FROM items "
+            "WHERE items.category = %(category_1)s ORDER BY items.embedding_bits <~> %(embedding_bits_1)s "
+            " LIMIT %(param_1)s) AS candidates ORDER BY distance  LIMIT %(param_2)s",
+            checkparams={
+                "embedding_1": [1, -2, 3], "category_1": 5, "embedding_bits_1": Bit("101"), "param_1": 100, "param_2": 10
+            }
+        )
+        eq_(stmt.get_execution_options(), {"opengauss_ef_search": 100})
+
+
+class BatchAnnSearchTest(fixtures.TestBase, AssertsCompiledSQL):
+    __dialect__ = psycopg2.dialect()
+
+    def test_batch_ann_select(self):
+        stmt = batch_ann_select(items.c.embedding, [[1, 2, 3], [4, 5, 6]], 5, distance="cosine_distance", ef_search=64)
+        self.assert_compile(
+            stmt,
+            "SELECT queries.query_index, nearest.id, nearest.distance "
+            "FROM (VALUES (%(param_1)s, CAST(%(param_2)s AS VECTOR(3))), "
+            "(%(param_3)s, CAST(%(param_4)s AS VECTOR(3)))) AS queries (query_index, query) "
+            "JOIN LATERAL (SELECT items_pk.id AS id, "
+            "items_pk.embedding <=> queries.query AS distance "
+            "FROM items_pk ORDER BY distance  LIMIT %(param_5)s) AS nearest ON true "
+            "ORDER BY queries.query_index, nearest.distance",
+            checkparams={"param_1": 0, "param_2": [1, 2, 3], "param_3": 1, "param_4": [4, 5, 6], "param_5": 5}
+        )
+        eq_(stmt.get_execution_options(), {"opengauss_ef_search": 64})
+
+    def test_batch_ann_select_id_column(self):
+        assert_raises_message(
+            exc.ArgumentError,
+            "id_column is required for table items",
+            batch_ann_select, tbl.c.embedding, [[1, 2, 3]], 5
+        )
+        self.assert_compile(
+            batch_ann_select(tbl.c.embedding, [[1, 2, 3]], 5, id_column=tbl.c.id),
+            "SELECT queries.query_index, nearest.id, nearest.distance "
+            "FROM (VALUES (%(param_1)s, CAST(%(param_2)s AS VECTOR(3)))) AS queries (query_index, query) "
+            "JOIN LATERAL (SELECT items.id AS id, "
+            "items.embedding <-> queries.query AS distance "
+            "FROM items ORDER BY distance  LIMIT %(param_3)s) AS nearest ON true "
+            "ORDER BY queries.query_index, nearest.distance",
+        )
+
+    def test_batch_ann_select_asyncpg(self):
+        dialect = asyncpg.dialect()
+        stmt = batch_ann_select(items.c.embedding, [[1, 2, 3]], 5)
+        self.assert_compile(
+            stmt,
+            "SELECT queries.query_index, nearest.id, nearest.distance "
+            "FROM (VALUES ($1::INTEGER, CAST($2 AS VECTOR(3)))) AS queries (query_index, query) "
+            "JOIN LATERAL (SELECT items_pk.id AS id, "
+            "items_pk.embedding <-> queries.query AS distance "
+            "FROM items_pk ORDER BY distance  LIMIT $3::INTEGER) AS nearest ON true "
+            "ORDER BY queries.query_index, nearest.distance",
+            dialect=dialect,
+        )
+        # the query is bound with the binary codec
+        bind = stmt.compile(dialect=dialect).binds["param_2"]
+        assert isinstance(bind.type._cached_bind_processor(dialect)([1, 2, 3]), bytes)
+
+    def test_batch_ann_search(self):
+        batches = [
+            [(0, 10, 0.5), (0, 11, 0.75), (2, 12, 0.25)],
+            [],
+        ]
+        connection = mock.Mock()
+        connection.execute.return_value.all.side_effect = batches
+        results = batch_ann_search(connection, items.c.embedding, np.zeros((4, 3)), 2, batch_size=3)
+        eq_(connection.execute.call_count, 2)
+        eq_([ids.tolist() for ids, _ in results], [[10, 11], [], [12], []])
+        eq_([distances.tolist() for _, distances in results], [[0.5, 0.75], [], [0.25], []])
+
+
+class HybridSelectTest(fixtures.TestBase, AssertsCompiledSQL):
+    __dialect__ = psycopg2.dialect()
+
+    def test_hybrid_select_rrf(self):
+        stmt = hybrid_select(docs.c.id, docs.c.body, "vector search", docs.c.embedding, [1, 2, 3], 10, ef_search=80)
+        self.assert_compile(
+            stmt,
+            "SELECT coalesce(text_search.id, vector_search.id) AS id, "
+            "coalesce(%(param_1)s / CAST((%(rank_1)s + text_search.rank) AS NUMERIC), %(coalesce_1)s) + "
+            "coalesce(%(param_2)s / CAST((%(rank_2)s + vector_search.rank) AS NUMERIC), %(coalesce_2)s) AS score "
+            "FROM (SELECT anon_1.id AS id, anon_1.score AS score, "
+            "row_number() OVER (ORDER BY anon_1.score DESC) AS rank "
+            "FROM (SELECT docs.id AS id, ts_rank(to_tsvector('english', docs.body), "
+            "plainto_tsquery('english', %(plainto_tsquery_1)s)) AS score FROM docs "
+            "WHERE to_tsvector('english', docs.body) @@ plainto_tsquery('english', %(plainto_tsquery_1)s) "
+            "ORDER BY ts_rank(to_tsvector('english', docs.body), plainto_tsquery('english', %(plainto_tsquery_1)s)) "
+            "DESC  LIMIT %(param_3)s) AS anon_1) AS text_search "
+            "FULL OUTER JOIN (SELECT anon_2.id AS id, anon_2.score AS score, "
+            "row_number() OVER (ORDER BY anon_2.score) AS rank "
+            "FROM (SELECT docs.id AS id, docs.embedding <=> %(embedding_1)s AS score FROM docs "
+            "ORDER BY docs.embedding <=> %(embedding_1)s  LIMIT %(param_4)s) AS anon_2) AS vector_search "
+            "ON text_search.id = vector_search.id ORDER BY score DESC  LIMIT %(param_5)s",
+            checkparams={
+                "param_1": 1.0, "rank_1": 60, "coalesce_1": 0, "param_2": 1.0, "rank_2": 60, "coalesce_2": 0,
+                "plainto_tsquery_1": "vector search", "param_3": 40, "embedding_1": [1, 2, 3], "param_4": 40,
+                "param_5": 10,
+            }
+        )
+        eq_(stmt.get_execution_options(), {"opengauss_ef_search": 80})
+
+    def test_hybrid_select_weighted(self):
+        stmt = hybrid_select(
+            docs.c.id, docs.c.body_tsv, "vector search", docs.c.embedding, [1, 2, 3], 10,
+            candidates=100, fusion="weighted", weights=(0.3, 0.7), language="simple",
+        )
+        compiled = str(stmt.compile(dialect=psycopg2.dialect()))
+        assert (
+            "coalesce(%(score_1)s * text_search.score, %(coalesce_1)s) + "
+            "coalesce(%(param_1)s * (%(score_2)s - vector_search.score), %(coalesce_2)s) AS score"
+        ) in compiled
+        assert "WHERE docs.body_tsv @@ plainto_tsquery('simple', %(plainto_tsquery_1)s)" in compiled
+        assert "to_tsvector" not in compiled
+
+    def test_hybrid_select_weighted_normalized(self):
+        normalized = Table("normalized", MetaData(), Column("id", Integer), Column("body", Text),
+                           Column("embedding", VECTOR(3, normalized=True)))
+        stmt = hybrid_select(normalized.c.id, normalized.c.body, "q", normalized.c.embedding, [1, 2, 3], 10,
+                             fusion="weighted")
+        compiled = str(stmt.compile(dialect=psycopg2.dialect()))
+        assert "coalesce(%(param_1)s * (-vector_search.score), %(coalesce_2)s) AS score" in compiled
+        assert "normalized.embedding <#> %(embedding_1)s AS score" in compiled
+
+    def test_hybrid_select_fusion(self):
+        assert_raises_message(
+            exc.ArgumentError,
+            "fusion must be 'rrf' or 'weighted', not 'max'",
+            hybrid_select, docs.c.id, docs.c.body, "q", docs.c.embedding, [1, 2, 3], 10, fusion="max"
+        )
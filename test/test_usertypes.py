@@ -1,11 +1,19 @@
-from sqlalchemy import Column, Integer, MetaData, Table
+import operator
+
+import numpy as np
+import pytest
+from sqlalchemy import Column, Float, func, Index, insert, Integer, MetaData, Table
+from sqlalchemy.dialects.postgresql.base import PGDialect, ischema_names
+from sqlalchemy.orm import declarative_base, deferred, undefer
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.sql import select
-from sqlalchemy.testing import fixtures
+from sqlalchemy.testing import fixtures, mock
 from sqlalchemy.testing.assertions import AssertsCompiledSQL
 
 from opengauss_sqlalchemy import dc_psycopg2, psycopg2
-from opengauss_sqlalchemy.utils import Vector, Bit, SparseVector
-from opengauss_sqlalchemy.usertype import BIT, SPARSEVEC, VECTOR
+from opengauss_sqlalchemy.utils import LazyVector, Vector, Bit, SparseVector
+from opengauss_sqlalchemy.usertype import BIT, HALFVEC, SPARSEVEC, VECTOR, HnswIndex, IvfflatIndex, vector_rows
+from opengauss_sqlalchemy.usertype import l2_normalize, subvector, vector_avg, vector_dims, vector_norm, vector_sum
 
 m = MetaData()
 tbl = Table(
@@ -13,6 +21,7 @@ tbl = Table(
     m,
     Column("id", Integer),
     Column("bit_embedding", BIT(3)),
+    Column("halfvec_embedding", HALFVEC(3)),
     Column("sparsevec_embedding", SPARSEVEC(3)),
     Column("vector_embedding", VECTOR(3))
 )
@@ -41,6 +50,62 @@ class TestBit(fixtures.TestBase, AssertsCompiledSQL):
             checkparams = {"bit_embedding_1" : '110'}
         )
 
+    def test_bit_literal_binds(self):
+        sql = select(tbl.c.id).order_by(tbl.c.bit_embedding.hamming_distance(Bit('110')))\
+            .compile(compile_kwargs = {'literal_binds' : True})
+        assert "bit_embedding <~> '110'" in str(sql)
+
+    def test_bit_bind_processor(self):
+        process = BIT(3).bind_processor(psycopg2.dialect())
+        assert process(Bit('110')) == '110'
+        assert process('110') == '110'
+        assert process([True, True, False]) == '110'
+        assert process(None) is None
+        with pytest.raises(ValueError) as error:
+            process(Bit('1100'))
+        assert str(error.value) == 'expected 3 bits, not 4'
+        assert BIT().bind_processor(psycopg2.dialect())('1100') == '1100'
+
+    def test_bit_result_processor(self):
+        process = BIT(3).result_processor(psycopg2.dialect(), None)
+        assert process('110') == Bit('110')
+        assert process(None) is None
+
+class TestHalfVec(fixtures.TestBase, AssertsCompiledSQL):
+    __dialect__ = psycopg2.dialect()
+
+    def test_halfvec_get_col_spec(self):
+        halfvec = HALFVEC()
+        assert halfvec.get_col_spec() == 'HALFVEC'
+        halfvec_with_dim = HALFVEC(5)
+        assert halfvec_with_dim.get_col_spec() == 'HALFVEC(5)'
+
+    def test_halfvec_distance(self):
+        for method, op in (
+            ("l2_distance", "<->"), ("max_inner_product", "<#>"), ("cosine_distance", "<=>"), ("l1_distance", "<+>")
+        ):
+            stmt = select(tbl.c.id).order_by(getattr(tbl.c.halfvec_embedding, method)([1, 2, 3]))
+            self.assert_compile(
+                stmt,
+                "SELECT test.id FROM test ORDER BY test.halfvec_embedding %s %%(halfvec_embedding_1)s" % op,
+                checkparams = {"halfvec_embedding_1" : [1, 2, 3]}
+            )
+
+    def test_halfvec_literal_binds(self):
+        sql = select(tbl.c.id).order_by(tbl.c.halfvec_embedding.l2_distance([1, 2, 3]))\
+            .compile(compile_kwargs = {'literal_binds' : True})
+        assert "embedding <-> '[1.0,2.0,3.0]'" in str(sql)
+
+    def test_halfvec_processors(self):
+        dialect = psycopg2.dialect()
+        assert HALFVEC(3).bind_processor(dialect)([1, 2, 3]) == '[1.0,2.0,3.0]'
+        result = HALFVEC(3).result_processor(dialect, None)('[1.5,2,3]')
+        assert result.dtype == np.float16
+        assert result.tolist() == [1.5, 2, 3]
+
+    def test_halfvec_reflection(self):
+        assert ischema_names['halfvec'] is HALFVEC
+
 class TestSparseVec(fixtures.TestBase, AssertsCompiledSQL):
     __dialect__ = psycopg2.dialect()
 
@@ -123,7 +188,237 @@ class TestVector(fixtures.TestBase, AssertsCompiledSQL):
             checkparams = {"vector_embedding_1" : [1,2,3]}
         )
 
+    def test_vector_bind_rows(self):
+        rows = VECTOR(3).bind_rows(np.array([[1, 2, 3], [4, 5, 6]], dtype=np.float32))
+        assert rows == ['[1,2,3]', '[4,5,6]']
+        assert VECTOR(3).bind_processor(psycopg2.dialect())(rows[0]) is rows[0]
+        with pytest.raises(ValueError) as error:
+            VECTOR(4).bind_rows(np.zeros((2, 3)))
+        assert str(error.value) == 'expected 4 dimensions, not 3'
+
+    def test_vector_rows(self):
+        params = vector_rows(tbl.c.vector_embedding, np.array([[1, 2, 3], [4, 5, 6]]), id=[7, 8])
+        assert params == [
+            {"id": 7, "vector_embedding": "[1,2,3]"},
+            {"id": 8, "vector_embedding": "[4,5,6]"},
+        ]
+        assert vector_rows(tbl.c.vector_embedding, [[1, 2, 3]]) == [{"vector_embedding": "[1,2,3]"}]
+        stmt = insert(tbl).values(vector_rows(tbl.c.vector_embedding, np.array([[1, 2, 3], [4, 5, 6]]), id=[7, 8]))
+        assert stmt.compile(dialect=psycopg2.dialect()).construct_params() == {
+            "id_m0": 7, "vector_embedding_m0": "[1,2,3]", "id_m1": 8, "vector_embedding_m1": "[4,5,6]",
+        }
+        connection = mock.Mock(dialect=psycopg2.dialect())
+        assert vector_rows(tbl.c.vector_embedding, [[1, 2, 3]], connection) == [{"vector_embedding": "[1,2,3]"}]
+
+    def test_vector_deferred(self):
+        Base = declarative_base()
+
+        class Item(Base):
+            __tablename__ = "item"
+            id = Column(Integer, primary_key=True)
+            embedding = deferred(Column(VECTOR(3)))
+            embedding2 = Column(VECTOR(3))
+
+        self.assert_compile(select(Item), "SELECT item.id, item.embedding2 FROM item")
+        self.assert_compile(
+            select(Item).options(undefer(Item.embedding)),
+            "SELECT item.id, item.embedding, item.embedding2 FROM item"
+        )
+        self.assert_compile(select(Item.embedding), "SELECT item.embedding FROM item")
+
+    def test_vector_lazy(self):
+        process = VECTOR(3, lazy=True).result_processor(psycopg2.dialect(), None)
+        vec = process('[1,2,3]')
+        assert isinstance(vec, LazyVector)
+        assert not vec.is_decoded
+        assert vec.to_list() == [1, 2, 3]
+        assert process(None) is None
+        value = np.array([1, 2, 3], dtype=np.float32)
+        assert process(value) is value
+
+    def test_vector_normalized_cosine_distance(self):
+        col = Column("embedding", VECTOR(2, normalized=True))
+        Table("normalized", MetaData(), Column("id", Integer), col)
+        distance = col.cosine_distance([3, 4])
+        stmt = select(distance).where(distance < 0.2).order_by(distance)
+        self.assert_compile(
+            stmt,
+            "SELECT normalized.embedding <#> %(embedding_1)s AS anon_1 FROM normalized "
+            "WHERE (normalized.embedding <#> %(embedding_1)s) < %(param_1)s "
+            "ORDER BY normalized.embedding <#> %(embedding_1)s"
+        )
+        dialect = psycopg2.dialect()
+        binds = stmt.compile(dialect=dialect).binds
+        assert binds['embedding_1'].type._cached_bind_processor(dialect)([3, 4]) == '[0.600000024,0.800000012]'
+        assert binds['param_1'].type._cached_bind_processor(dialect)(0.25) == -0.75
+        assert distance.type.process_result_value(-0.75, dialect) == 0.25
+        assert isinstance((1 - distance).type, Float)
+
+    def test_vector_normalized_arithmetic(self):
+        t = Table("normalized", MetaData(), Column("e", VECTOR(2, normalized=True)), Column("f", VECTOR(2, normalized=True)))
+        for op, sql in ((operator.add, "+"), (operator.sub, "-"), (operator.mul, "*")):
+            expr = op(t.c.e, t.c.f)
+            self.assert_compile(
+                expr.cosine_distance([3, 4]),
+                "normalized.e %s normalized.f <=> %%(param_1)s" % sql
+            )
+            assert not expr.type.normalized
+
+    def test_vector_normalized_bind_rows(self):
+        rows = VECTOR(2, normalized=True).bind_rows(np.array([[3, 4], [0, 0]]))
+        assert rows == ['[0.600000024,0.800000012]', '[0,0]']
+
     def test_vector_literal_binds(self):
         sql = select(tbl.c.id).order_by(tbl.c.vector_embedding.l2_distance([1, 2, 3]))\
             .compile(compile_kwargs = {'literal_binds' : True})
-        assert "embedding <-> '[1.0,2.0,3.0]'" in str(sql)
\ No newline at end of file
+        assert "embedding <-> '[1.0,2.0,3.0]'" in str(sql)
+
+
+class TestVectorIndex(fixtures.TestBase, AssertsCompiledSQL):
+    __dialect__ = psycopg2.dialect()
+
+    def test_hnsw_index(self):
+        idx = HnswIndex("test_idx1", tbl.c.vector_embedding, m=16, ef_construction=64, ops="vector_cosine_ops")
+        self.assert_compile(
+            CreateIndex(idx),
+            "CREATE INDEX test_idx1 ON test USING hnsw (vector_embedding vector_cosine_ops) "
+            "WITH (m = 16, ef_construction = 64)"
+        )
+
+    def test_hnsw_index_defaults(self):
+        idx = HnswIndex("test_idx1", tbl.c.bit_embedding, ops={"bit_embedding": "bit_hamming_ops"})
+        self.assert_compile(
+            CreateIndex(idx),
+            "CREATE INDEX test_idx1 ON test USING hnsw (bit_embedding bit_hamming_ops)"
+        )
+
+    def test_ivfflat_index(self):
+        idx = IvfflatIndex("test_idx1", tbl.c.vector_embedding, lists=100, ops="vector_l2_ops")
+        self.assert_compile(
+            CreateIndex(idx),
+            "CREATE INDEX test_idx1 ON test USING ivfflat (vector_embedding vector_l2_ops) WITH (lists = 100)"
+        )
+
+    def test_build_settings(self):
+        idx = HnswIndex("test_idx1", tbl.c.vector_embedding, build_settings={"maintenance_work_mem": "8GB"})
+        assert idx.dialect_options["opengauss"]["build_settings"] == {"maintenance_work_mem": "8GB"}
+
+    def test_to_metadata(self):
+        t = Table("t", MetaData(), Column("vector_embedding", VECTOR(3)))
+        HnswIndex("test_idx1", t.c.vector_embedding, m=16, ops="vector_l2_ops")
+        idx, = t.to_metadata(MetaData()).indexes
+        self.assert_compile(
+            CreateIndex(idx),
+            "CREATE INDEX test_idx1 ON t USING hnsw (vector_embedding vector_l2_ops) WITH (m = 16)"
+        )
+
+    def test_reflected_index_options(self):
+        reflected = [(
+            (None, "test"),
+            [{
+                "name": "test_idx1",
+                "column_names": ["vector_embedding"],
+                "unique": False,
+                "dialect_options": {
+                    "postgresql_using": "hnsw",
+                    "postgresql_ops": {"vector_embedding": "vector_cosine_ops"},
+                    "postgresql_with": {"m": "16", "ef_construction": "64"},
+                    "postgresql_include": [],
+                },
+            }],
+        )]
+        with mock.patch.object(PGDialect, "get_multi_indexes", return_value=reflected):
+            (_, (index,)), = self.__dialect__.get_multi_indexes(None)
+        assert index["dialect_options"] == {
+            "opengauss_using": "hnsw",
+            "opengauss_ops": {"vector_embedding": "vector_cosine_ops"},
+            "opengauss_with": {"m": "16", "ef_construction": "64"},
+            "postgresql_include": [],
+        }
+
+        t = Table("t", MetaData(), Column("vector_embedding", VECTOR(3)))
+        idx = Index(index["name"], t.c.vector_embedding, **index["dialect_options"])
+        self.assert_compile(
+            CreateIndex(idx),
+            "CREATE INDEX test_idx1 ON t USING hnsw (vector_embedding vector_cosine_ops) "
+            "WITH (m = 16, ef_construction = 64)"
+        )
+
+    def test_normalized_ops(self):
+        t = Table("normalized", MetaData(), Column("embedding", VECTOR(3, normalized=True)))
+        self.assert_compile(
+            CreateIndex(HnswIndex("idx", t.c.embedding, m=16)),
+            "CREATE INDEX idx ON normalized USING hnsw (embedding vector_ip_ops) WITH (m = 16)"
+        )
+        self.assert_compile(
+            CreateIndex(IvfflatIndex("idx", t.c.embedding, ops="vector_l2_ops")),
+            "CREATE INDEX idx ON normalized USING ivfflat (embedding vector_l2_ops)"
+        )
+
+
+class TestVectorFunctions(fixtures.TestBase, AssertsCompiledSQL):
+    __dialect__ = psycopg2.dialect()
+
+    def test_aggregates(self):
+        for fn, name in ((vector_avg, "avg"), (vector_sum, "sum")):
+            expr = fn(tbl.c.vector_embedding)
+            self.assert_compile(select(expr), "SELECT %s(test.vector_embedding) AS %s_1 FROM test" % (name, name))
+            assert isinstance(expr.type, VECTOR)
+            assert isinstance(getattr(func.opengauss, name)(tbl.c.halfvec_embedding).type, HALFVEC)
+
+    def test_aggregates_of_normalized(self):
+        t = Table("normalized", MetaData(), Column("e", VECTOR(2, normalized=True)))
+        for fn, name in ((vector_avg, "avg"), (vector_sum, "sum")):
+            expr = fn(t.c.e)
+            self.assert_compile(
+                expr.cosine_distance([3, 4]),
+                "%s(normalized.e) <=> %%(%s_1)s" % (name, name)
+            )
+            assert expr.type.dim == 2
+            assert not expr.type.normalized
+        self.assert_compile(
+            l2_normalize(t.c.e).cosine_distance([3, 4]),
+            "l2_normalize(normalized.e) <#> %(l2_normalize_1)s"
+        )
+
+    def test_star_import_keeps_builtins(self):
+        namespace = {}
+        exec("from opengauss_sqlalchemy.usertype import *", namespace)
+        assert not {"sum", "avg", "binary_quantize"} & set(namespace)
+
+    def test_l2_normalize(self):
+        expr = l2_normalize(tbl.c.vector_embedding)
+        self.assert_compile(expr, "l2_normalize(test.vector_embedding)")
+        assert isinstance(expr.type, VECTOR)
+        result = expr.type.result_processor(psycopg2.dialect(), None)('[1,0,0]')
+        assert result.tolist() == [1, 0, 0]
+
+    def test_subvector(self):
+        expr = subvector(tbl.c.vector_embedding, 1, 2)
+        self.assert_compile(
+            expr,
+            "subvector(test.vector_embedding, %(subvector_1)s, %(subvector_2)s)",
+            checkparams={"subvector_1": 1, "subvector_2": 2}
+        )
+        assert isinstance(expr.type, VECTOR)
+        assert expr.type.dim is None
+
+    def test_scalar_functions(self):
+        self.assert_compile(vector_dims(tbl.c.vector_embedding), "vector_dims(test.vector_embedding)")
+        assert isinstance(vector_dims(tbl.c.vector_embedding).type, Integer)
+        self.assert_compile(vector_norm(tbl.c.vector_embedding), "vector_norm(test.vector_embedding)")
+        assert isinstance(vector_norm(tbl.c.vector_embedding).type, Float)
+
+    def test_binary_quantize(self):
+        expr = func.opengauss.binary_quantize(tbl.c.vector_embedding)
+        self.assert_compile(
+            select(tbl.c.id).order_by(expr.hamming_distance(Bit('101'))),
+            "SELECT test.id FROM test ORDER BY binary_quantize(test.vector_embedding) <~> %(binary_quantize_1)s",
+        )
+        assert isinstance(expr.type, BIT)
+
+    def test_elementwise_operators(self):
+        for op, sql in ((operator.add, "+"), (operator.sub, "-"), (operator.mul, "*")):
+            expr = op(tbl.c.vector_embedding, [1, 2, 3])
+            self.assert_compile(expr, "test.vector_embedding %s %%(vector_embedding_1)s" % sql)
+            assert isinstance(expr.type, VECTOR)
@@ -11,8 +11,12 @@ import numpy as np
 from struct import pack
 from scipy.sparse import coo_array
 import pytest
+import warnings
 
-from opengauss_sqlalchemy.utils import Bit, Vector, SparseVector
+from opengauss_sqlalchemy.utils import Bit, HalfVector, LazyVector, Vector, SparseVector
+from opengauss_sqlalchemy.utils import binary_quantize, scalar_quantize, scalar_dequantize
+from opengauss_sqlalchemy.utils import hamming_distance, jaccard_distance, pack_bits, top_k
+from opengauss_sqlalchemy.utils import distance
 
 class TestBit:
     def test_list(self):
@@ -34,10 +38,19 @@ class TestBit:
             Bit(arr)
         assert str(error.value) == 'expected dtype to be bool or uint8'
 
-    def test_ndarray_same_object(self):
+    def test_ndarray_bool(self):
         arr = np.array([True, False, True])
         assert Bit(arr).to_list() == [True, False, True]
-        assert Bit(arr).to_numpy() is arr
+        assert np.array_equal(Bit(arr).to_numpy(), arr)
+
+    def test_ndarray_uint8_same_object(self):
+        arr = np.array([254, 7, 0], dtype=np.uint8)
+        assert Bit(arr)._data is arr
+
+    def test_ndarray_uint8_ndim_two(self):
+        with pytest.raises(ValueError) as error:
+            Bit(np.array([[254, 7]], dtype=np.uint8))
+        assert str(error.value) == 'expected ndim to be 1'
 
     def test_ndim_two(self):
         with pytest.raises(ValueError) as error:
@@ -56,6 +69,82 @@ class TestBit:
     def test_equality(self):
         assert Bit([True, False, True]) == Bit([True, False, True])
         assert Bit([True, False, True]) != Bit([True, False, False])
+        assert Bit([True, False, True]) != Bit([True, False, True, False])
+
+    def test_slots(self):
+        with pytest.raises(AttributeError):
+            Bit('101').value = None
+
+    def test_from_text(self):
+        bit = Bit.from_text('1010000011')
+        assert bit.to_text() == '1010000011'
+        assert bit.to_list() == [True, False, True, False, False, False, False, False, True, True]
+        assert Bit.from_text('').to_text() == ''
+
+    def test_from_binary(self):
+        data = pack('>i', 10) + bytes([0b10100000, 0b11000000])
+        bit = Bit.from_binary(data)
+        assert bit.to_text() == '1010000011'
+        assert bit.to_binary() == data
+        assert bit == Bit('1010000011')
+
+    def test_to_db(self):
+        assert Bit._to_db(Bit('101')) == '101'
+        assert Bit._to_db('101', 3) == '101'
+        assert Bit._to_db(None) is None
+        assert Bit._to_db_binary(Bit('101')) == pack('>i', 3) + bytes([0b10100000])
+        assert Bit._to_db_binary([True, False, True]) == pack('>i', 3) + bytes([0b10100000])
+
+    def test_from_db(self):
+        assert Bit._from_db('101') == Bit('101')
+        assert Bit._from_db_binary(pack('>i', 3) + bytes([0b10100000])) == Bit('101')
+        assert Bit._from_db(None) is None
+
+class TestHalfVector:
+    def test_list(self):
+        assert HalfVector([1, 2, 3]).to_list() == [1, 2, 3]
+
+    def test_ndarray(self):
+        arr = np.array([1, 2, 3])
+        assert HalfVector(arr).to_list() == [1, 2, 3]
+        assert HalfVector(arr).to_numpy() is not arr
+
+    def test_ndarray_same_object(self):
+        arr = np.array([1, 2, 3], dtype='>f2')
+        assert HalfVector(arr).to_numpy() is arr
+
+    def test_ndim_two(self):
+        with pytest.raises(ValueError) as error:
+            HalfVector([[1, 2], [3, 4]])
+        assert str(error.value) == 'expected ndim to be 1'
+
+    def test_repr(self):
+        assert repr(HalfVector([1, 2, 3])) == 'HalfVector([1.0, 2.0, 3.0])'
+
+    def test_equality(self):
+        assert HalfVector([1, 2, 3]) == HalfVector([1, 2, 3])
+        assert HalfVector([1, 2, 3]) != HalfVector([1, 2, 4])
+
+    def test_dimensions(self):
+        assert HalfVector([1, 2, 3]).dimensions() == 3
+
+    def test_from_text(self):
+        vec = HalfVector.from_text('[1.5,2,3]')
+        assert vec.to_list() == [1.5, 2, 3]
+        assert HalfVector._from_db('[1.5,2,3]').dtype == np.float16
+
+    def test_from_binary(self):
+        data = pack('>HH3e', 3, 0, 1.5, 2, 3)
+        vec = HalfVector.from_binary(data)
+        assert vec.to_list() == [1.5, 2, 3]
+        assert vec.to_binary() == data
+        assert HalfVector._to_db_binary([1.5, 2, 3]) == data
+
+    def test_to_db(self):
+        assert HalfVector._to_db([1.5, 2, 3], 3) == '[1.5,2.0,3.0]'
+        with pytest.raises(ValueError) as error:
+            HalfVector._to_db([1.5, 2, 3], 4)
+        assert str(error.value) == 'expected 4 dimensions, not 3'
 
 class TestSparseVector:
     def test_list(self):
@@ -197,4 +286,179 @@ class TestVector:
         vec = Vector.from_binary(data)
         assert vec.to_list() == [1.5, 2, 3]
         assert np.array_equal(vec.to_numpy(), [1.5, 2, 3])
-        assert vec.to_binary() == data
\ No newline at end of file
+        assert vec.to_binary() == data
+
+    def test_to_db_rows(self):
+        rows = Vector._to_db_rows(np.array([[1.5, 2, 3], [4, 5, 0.1]], dtype=np.float32), 3)
+        assert rows == ['[1.5,2,3]', '[4,5,0.100000001]']
+        assert Vector._to_db(rows[0], 3) is rows[0]
+        assert np.array_equal(Vector.from_text(rows[1]).to_numpy(), np.array([4, 5, 0.1], dtype=np.float32))
+
+    def test_to_db_normalize(self):
+        assert Vector._to_db([3, 4], 2, normalize=True) == '[0.600000024,0.800000012]'
+        rows = Vector._to_db_rows(np.array([[0, 2], [0, 0]]), 2, normalize=True)
+        assert rows == ['[0,1]', '[0,0]']
+
+    def test_to_db_rows_buffer(self):
+        data = np.array([1, 2, 3, 4, 5, 6], dtype=np.float32).tobytes()
+        assert Vector._to_db_rows(data, 3) == ['[1,2,3]', '[4,5,6]']
+        with pytest.raises(ValueError) as error:
+            Vector._to_db_rows(data)
+        assert str(error.value) == 'expected dimensions for a buffer'
+        with pytest.raises(ValueError) as error:
+            Vector._to_db_rows(data, 4)
+        assert str(error.value) == 'expected a multiple of 4 values, not 6'
+
+    def test_to_db_rows_dimensions(self):
+        with pytest.raises(ValueError) as error:
+            Vector._to_db_rows([[1, 2, 3]], 4)
+        assert str(error.value) == 'expected 4 dimensions, not 3'
+        with pytest.raises(ValueError) as error:
+            Vector._to_db_rows([1, 2, 3])
+        assert str(error.value) == 'expected ndim to be 2'
+
+    def test_to_db_binary_rows(self):
+        embeddings = np.array([[1.5, 2, 3], [4, 5, 6]], dtype=np.float32)
+        rows = Vector._to_db_binary_rows(embeddings)
+        assert rows == [Vector._to_db_binary(embeddings[0]), Vector._to_db_binary(embeddings[1])]
+        assert Vector._to_db_binary(rows[0]) is rows[0]
+        assert Vector.from_binary(rows[1]).to_list() == [4, 5, 6]
+
+    def test_binary_rows_validated(self):
+        row = Vector._to_db_binary_rows([[1.5, 2, 3]])[0]
+        assert Vector._to_db(row, 3) == '[1.5,2.0,3.0]'
+        with pytest.raises(ValueError) as error:
+            Vector._to_db_binary(row[:-1])
+        assert str(error.value) == 'expected 16 bytes for 3 dimensions, not 15'
+        with pytest.raises(ValueError) as error:
+            Vector._to_db_binary(row, 4)
+        assert str(error.value) == 'expected 4 dimensions, not 3'
+        with pytest.raises(ValueError) as error:
+            Vector._to_db(b'\x00', 3)
+        assert str(error.value) == 'expected a binary vector of at least 4 bytes, not 1'
+
+    def test_from_db_rows(self):
+        matrix = Vector._from_db_rows(['[1.5,2,3]', None, '[4,5,6]'])
+        assert matrix.dtype == np.float32
+        assert matrix.shape == (3, 3)
+        assert np.array_equal(matrix[[0, 2]], [[1.5, 2, 3], [4, 5, 6]])
+        assert np.isnan(matrix[1]).all()
+        assert Vector._from_db_rows([], 3).shape == (0, 3)
+        with pytest.raises(ValueError) as error:
+            Vector._from_db_rows(['[1,2,3]', '[4,5]'])
+        assert str(error.value) == 'expected 3 dimensions, not 2'
+        with pytest.raises(ValueError) as error:
+            Vector._from_db_rows(['[1,2,3,4]', '[5,6]'], 3)
+        assert str(error.value) == 'expected 3 dimensions, not 4'
+
+    def test_from_db_rows_malformed(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            with pytest.raises(ValueError) as error:
+                Vector._from_db_rows(['[1,2,x]'])
+        assert str(error.value).startswith('invalid vector text: ')
+
+
+class TestLazyVector:
+    def test_decoded_on_access(self):
+        vec = LazyVector('[1,2,3]')
+        assert not vec.is_decoded
+        assert repr(vec) == 'LazyVector(<not decoded>)'
+        assert vec.to_numpy().dtype == np.float32
+        assert vec.is_decoded
+        assert vec.to_list() == [1, 2, 3]
+        assert vec.to_numpy() is vec.to_numpy()
+
+    def test_sequence(self):
+        vec = LazyVector('[1,2,3]')
+        assert len(vec) == 3
+        assert vec[1] == 2
+        assert list(vec) == [1, 2, 3]
+        assert np.asarray(vec).tolist() == [1, 2, 3]
+        assert vec == np.array([1, 2, 3])
+        assert vec == LazyVector('[1,2,3]')
+        assert vec != [1, 2, 3]
+
+    def test_to_db(self):
+        assert Vector._to_db(LazyVector('[1,2,3]'), 3) == '[1,2,3]'
+        vec = LazyVector('[1,2,3]')
+        vec.to_numpy()
+        assert Vector._to_db(vec, 3) == '[1.0,2.0,3.0]'
+        with pytest.raises(ValueError) as error:
+            Vector._to_db(LazyVector('[1,2,3]'), 4)
+        assert str(error.value) == 'expected 4 dimensions, not 3'
+
+
+class TestQuantize:
+    def test_binary_quantize(self):
+        bits = binary_quantize(np.array([[1, -2, 0.5], [-1, 0, 3]], dtype=np.float32))
+        assert bits == [Bit('101'), Bit('001')]
+
+    def test_binary_quantize_ndim(self):
+        with pytest.raises(ValueError) as error:
+            binary_quantize([1, 2, 3])
+        assert str(error.value) == 'expected ndim to be 2'
+
+    def test_scalar_quantize(self):
+        embeddings = np.array([[0, -1, 5], [1, 1, 5], [0.5, 0, 5]], dtype=np.float32)
+        codes, low, high = scalar_quantize(embeddings)
+        assert codes.dtype == np.int8
+        assert codes[:2].tolist() == [[-128, -128, -128], [127, 127, -128]]
+        assert np.allclose(scalar_dequantize(codes, low, high), embeddings, atol=(high - low).max() / 255)
+
+    def test_scalar_quantize_range(self):
+        codes, low, high = scalar_quantize([[-2, 0.5, 2]], low=[-1, -1, -1], high=[1, 1, 1])
+        assert codes.tolist() == [[-128, 63, 127]]
+
+    def test_scalar_quantize_scalar_range(self):
+        codes, low, high = scalar_quantize([[-2, 0.5, 2]], low=-1, high=1)
+        assert codes.tolist() == [[-128, 63, 127]]
+        assert np.allclose(scalar_dequantize(codes, low, high), [[-1, 0.5, 1]], atol=2 / 255)
+        codes, _, _ = scalar_quantize([[1, 1]], low=1, high=1)
+        assert codes.tolist() == [[-128, -128]]
+
+
+class TestBitDistance:
+    def test_pack_bits(self):
+        packed = pack_bits([Bit('1100'), Bit('0001')])
+        assert packed.tolist() == [[0b11000000], [0b00010000]]
+        assert np.array_equal(pack_bits(np.array([[True, True, False, False]])), [[0b11000000]])
+        assert np.array_equal(pack_bits(['1100', '0001']), packed)
+
+    def test_hamming_distance(self):
+        bits = [Bit('1100'), Bit('0001'), Bit('1101')]
+        assert hamming_distance(bits, Bit('1100')).tolist() == [0, 3, 1]
+        assert hamming_distance(bits, [Bit('1100'), Bit('0000')]).tolist() == [[0, 3, 1], [2, 1, 3]]
+
+    def test_hamming_distance_random(self, monkeypatch):
+        monkeypatch.setattr(distance, '_BLOCK_BYTES', 64)
+        rng = np.random.default_rng(0)
+        bits = rng.integers(0, 256, (50, 4), dtype=np.uint8)
+        queries = rng.integers(0, 256, (7, 4), dtype=np.uint8)
+        expected = [
+            [bin(int.from_bytes(b.tobytes(), 'big') ^ int.from_bytes(q.tobytes(), 'big')).count('1') for b in bits]
+            for q in queries
+        ]
+        assert hamming_distance(bits, queries).tolist() == expected
+
+    def test_hamming_distance_lookup_table(self, monkeypatch):
+        monkeypatch.delattr(np, 'bitwise_count', raising=False)
+        assert hamming_distance([Bit('1100'), Bit('0001')], Bit('1100')).tolist() == [0, 3]
+
+    def test_hamming_distance_length(self):
+        with pytest.raises(ValueError) as error:
+            hamming_distance([Bit('1100')], Bit('110000001'))
+        assert str(error.value) == 'expected 1 bytes, not 2'
+
+    def test_jaccard_distance(self):
+        bits = [Bit('1100'), Bit('0001'), Bit('1101'), Bit('0000')]
+        assert np.allclose(jaccard_distance(bits, Bit('1100')), [0, 1, 1 / 3, 1])
+
+    def test_top_k(self):
+        indices, distances = top_k(np.array([[5, 1, 4, 2], [0, 3, 2, 1]]), 2)
+        assert indices.tolist() == [[1, 3], [0, 3]]
+        assert distances.tolist() == [[1, 2], [0, 1]]
+
+        indices, distances = top_k(np.array([3, 1, 2]), 5)
+        assert indices.tolist() == [1, 2, 0]
+        assert distances.tolist() == [1, 2, 3]